@@ -10,20 +10,39 @@ import os
 import time
 from datetime import datetime
 from utils import (
-    transcribe_with_speechmatics,
-    extract_resume_info_using_llm,
     get_ai_greeting_message,
     get_final_thanks_message,
     speak_text,
+    speak_text_stream,
+    stream_next_question,
     analyze_candidate_response_and_generate_new_question,
     get_feedback_of_candidate_response,
     get_overall_evaluation_score,
     save_interview_data,
-    load_content_streamlit,
+)
+from utils.audio_pipeline import transcribe_answer
+from utils.denoise import DENOISE_STREAMING
+from utils.jd_analysis import prepare_job_description
+from utils.resume_cache import process_resume
+from utils.speculative import SPECULATIVE_QUESTIONS, SpeculativeQuestionEngine
+from utils.analyze_candidate import (
+    ANALYSIS_MODE,
+    DEFERRED_SCORING,
+    get_next_question,
+    is_unscored,
+    pending_feedback,
+    score_conversations,
 )
 
 MAX_QUESTIONS = 5
 
+# Speak the next question sentence by sentence while the LLM is still generating it.
+# Streaming uses its own next-question prompt, so ANALYSIS_MODE=combined takes precedence.
+STREAM_NEXT_QUESTION = (
+    os.environ.get("STREAM_NEXT_QUESTION", "false").lower() in ("1", "true", "yes")
+    and ANALYSIS_MODE != "combined"
+)
+
 
 # Configuration and Styling
 def setup_page_config():
@@ -261,6 +280,7 @@ def initialize_session_state():
         "name": "",
         "resume_highlights": "",
         "job_description": "",
+        "job_context": "",
         "qa_index": 1,
         "conversations": [],
         "current_question": "",
@@ -346,13 +366,17 @@ def render_sidebar():
 def process_resume_submission(uploaded_resume, job_description):
     """Process resume and job description submission"""
     with st.spinner("Processing resume..."):
-        resume_content = load_content_streamlit(uploaded_resume)
-        name, resume_highlights = extract_resume_info_using_llm(resume_content)
+        # Repeat uploads of the same file are served from the resume cache.
+        _, name, resume_highlights = process_resume(uploaded_resume)
+    with st.spinner("Analyzing job description..."):
+        job_context = prepare_job_description(job_description)
 
     # Store in session state
     st.session_state["name"] = name
     st.session_state["resume_highlights"] = resume_highlights
     st.session_state["job_description"] = job_description
+    # What prompts embed: the shared JD summary when JD analysis is enabled.
+    st.session_state["job_context"] = job_context
 
     # Reset interview state
     reset_interview_state()
@@ -440,26 +464,98 @@ def speak_current_question():
             )
         st.session_state["question_spoken"] = True
         st.session_state["awaiting_response"] = True
+        start_speculation()
         st.rerun()
 
 
-def generate_next_question():
-    """Generate and prepare the next question"""
-    if st.session_state["conversations"]:
-        last_conv = st.session_state["conversations"][-1]
-        next_question, _ = asyncio.run(analyze_candidate_response_and_generate_new_question(
-            last_conv["Question"],
-            last_conv["Candidate Answer"],
-            st.session_state["job_description"],
-            st.session_state["resume_highlights"],
-        ))
-    else:
-        next_question = "Tell me about yourself and your experience."
+def start_speculation():
+    """Pre-generate likely follow-ups while the candidate answers the current question"""
+    if not SPECULATIVE_QUESTIONS:
+        return
+    if "speculative_engine" not in st.session_state:
+        st.session_state["speculative_engine"] = SpeculativeQuestionEngine()
+    st.session_state["speculative_engine"].start(
+        st.session_state["current_question"],
+        st.session_state["resume_highlights"],
+        st.session_state["job_context"],
+    )
+
+
+def asked_questions():
+    """Everything the interviewer has said this session, so the bank never repeats it"""
+    return [m["content"] for m in st.session_state["messages"] if m["role"] == "assistant"]
+
+
+def take_speculative_question(transcript):
+    """Return a pre-generated follow-up that fits the transcript, if any"""
+    engine = st.session_state.get("speculative_engine")
+    if not SPECULATIVE_QUESTIONS or engine is None:
+        return None
+    return engine.take(st.session_state["current_question"], transcript)
+
+
+def generate_next_question(next_question=None, spoken=False):
+    """Prepare the next question (generating it if not supplied)"""
+    if next_question is None:
+        if st.session_state["conversations"]:
+            last_conv = st.session_state["conversations"][-1]
+            next_question, _ = asyncio.run(analyze_candidate_response_and_generate_new_question(
+                last_conv["Question"],
+                last_conv["Candidate Answer"],
+                st.session_state["job_context"],
+                st.session_state["resume_highlights"],
+                asked_questions=asked_questions(),
+            ))
+        else:
+            next_question = "Tell me about yourself and your experience."
 
     st.session_state["current_question"] = next_question
     st.session_state["messages"].append({"role": "assistant", "content": next_question})
-    st.session_state["question_spoken"] = False
-    st.session_state["awaiting_response"] = False
+    st.session_state["question_spoken"] = spoken
+    st.session_state["awaiting_response"] = spoken
+
+
+async def stream_and_speak_next_question(question, transcript):
+    """
+    Score the answer while streaming the next question straight into TTS.
+    Returns (next_question, feedback) once both are done.
+    """
+    ai_voice_details = get_ai_voice_details()
+    sentences = stream_next_question(
+        question,
+        transcript,
+        st.session_state["resume_highlights"],
+        st.session_state["job_context"],
+        asked_questions=asked_questions(),
+    )
+    speaking = speak_text_stream(
+        sentences, voice=ai_voice_details[st.session_state["ai_voice"]]["code"]
+    )
+    if DEFERRED_SCORING:
+        return await speaking, pending_feedback()
+
+    feedback, next_question = await asyncio.gather(
+        get_feedback_of_candidate_response(
+            question,
+            transcript,
+            st.session_state["job_context"],
+            st.session_state["resume_highlights"],
+        ),
+        speaking,
+    )
+    return next_question, feedback
+
+
+def score_answer(transcript):
+    """Feedback for the current answer, or a placeholder when scoring is deferred"""
+    if DEFERRED_SCORING:
+        return pending_feedback()
+    return asyncio.run(get_feedback_of_candidate_response(
+        st.session_state["current_question"],
+        transcript,
+        st.session_state["job_context"],
+        st.session_state["resume_highlights"],
+    ))
 
 
 def process_candidate_response(transcript):
@@ -467,23 +563,43 @@ def process_candidate_response(transcript):
     # Add candidate's answer to chat
     st.session_state["messages"].append({"role": "user", "content": transcript})
 
+    needs_next_question = st.session_state["qa_index"] < st.session_state["max_questions"]
+    next_question = take_speculative_question(transcript) if needs_next_question else None
+    spoken = False
+
     # Generate feedback for this response
-    if st.session_state["qa_index"] < st.session_state["max_questions"] - 1:
-        # Not the last question - generate next question and feedback
-        next_question, feedback = asyncio.run(analyze_candidate_response_and_generate_new_question(
+    if next_question:
+        # Speculative follow-up matched the answer - only feedback is needed
+        feedback = score_answer(transcript)
+    elif needs_next_question and STREAM_NEXT_QUESTION:
+        # Next question is spoken as it streams in
+        with st.spinner("AI Interviewer is speaking..."):
+            next_question, feedback = asyncio.run(stream_and_speak_next_question(
+                st.session_state["current_question"], transcript
+            ))
+        spoken = True
+    elif needs_next_question and DEFERRED_SCORING:
+        # Scoring happens at the end - only the next question is on the critical path
+        next_question = asyncio.run(get_next_question(
             st.session_state["current_question"],
             transcript,
-            st.session_state["job_description"],
             st.session_state["resume_highlights"],
+            st.session_state["job_context"],
+            asked_questions=asked_questions(),
         ))
-    else:
-        # Last question - only generate feedback
-        feedback = asyncio.run(get_feedback_of_candidate_response(
+        feedback = pending_feedback()
+    elif needs_next_question:
+        # Not the last question - generate next question and feedback
+        next_question, feedback = asyncio.run(analyze_candidate_response_and_generate_new_question(
             st.session_state["current_question"],
             transcript,
-            st.session_state["job_description"],
+            st.session_state["job_context"],
             st.session_state["resume_highlights"],
+            asked_questions=asked_questions(),
         ))
+    else:
+        # Last question - only generate feedback
+        feedback = score_answer(transcript)
 
     # Store conversation
     st.session_state["conversations"].append(
@@ -502,7 +618,9 @@ def process_candidate_response(transcript):
 
     if st.session_state["qa_index"] <= st.session_state["max_questions"]:
         # Prepare next question
-        generate_next_question()
+        generate_next_question(next_question, spoken=spoken)
+        if spoken:
+            start_speculation()
         st.success("✅ Answer recorded! Preparing next question...")
     else:
         # Interview completed - prepare thanks message
@@ -534,10 +652,11 @@ def speak_thanks_message():
 
         with st.spinner("AI Interviewer is giving final remarks..."):
             ai_voice_details = get_ai_voice_details()
-            speak_text(
-                thanks_message,
-                voice=ai_voice_details[st.session_state["ai_voice"]]["code"],
-            )
+            voice = ai_voice_details[st.session_state["ai_voice"]]["code"]
+            if DEFERRED_SCORING:
+                asyncio.run(speak_and_score_answers(thanks_message, voice))
+            else:
+                speak_text(thanks_message, voice=voice)
 
         st.session_state["thanks_message_spoken"] = True
         st.success("🎉 Interview completed! Thank you for your time.")
@@ -547,6 +666,18 @@ def speak_thanks_message():
         st.rerun()
 
 
+async def speak_and_score_answers(message, voice):
+    """Speak the closing message while all deferred answers are scored"""
+    await asyncio.gather(
+        asyncio.to_thread(speak_text, message, voice=voice),
+        score_conversations(
+            st.session_state["conversations"],
+            st.session_state["job_context"],
+            st.session_state["resume_highlights"],
+        ),
+    )
+
+
 def handle_audio_recording():
     """Handle audio recording and processing"""
     if not (
@@ -565,20 +696,25 @@ def handle_audio_recording():
         st.session_state["processing_audio"] = True
 
         with st.spinner("Processing your answer..."):
-            # Save audio file
             name = st.session_state["name"]
             filename = f"audio/{name}/{name}_{st.session_state['qa_index'] + 1}.wav"
-            os.makedirs(os.path.dirname(filename), exist_ok=True)
 
-            with open(filename, "wb") as f:
-                f.write(audio_data.read())
-
-            # Transcribe audio
-            transcript = transcribe_with_speechmatics(filename)
+            # Decoded once, validated (and trimmed with VAD) and transcribed in
+            # memory; the WAV is saved in the background. Web recordings are
+            # only denoised with the cheap per-candidate stationary profile.
+            result = transcribe_answer(
+                audio_data.getvalue(),
+                filename=filename,
+                denoise=DENOISE_STREAMING,
+                noise_key=name,
+            )
 
-            if transcript and transcript.strip():
-                process_candidate_response(transcript)
+            if result.ok:
+                process_candidate_response(result.text)
                 st.rerun()
+            elif result.error is not None:
+                st.error(f"Transcription failed: {result.message}. Please try recording again.")
+                st.session_state["processing_audio"] = False
             else:
                 st.error("No speech detected in audio. Please try recording again.")
                 st.session_state["processing_audio"] = False
@@ -595,6 +731,12 @@ def display_final_results():
         return
 
     with st.spinner("Calculating final score..."):
+        if any(is_unscored(conv) for conv in st.session_state["conversations"]):
+            asyncio.run(score_conversations(
+                st.session_state["conversations"],
+                st.session_state["job_context"],
+                st.session_state["resume_highlights"],
+            ))
         final_score = get_overall_evaluation_score(st.session_state["conversations"])
 
         # Save interview data
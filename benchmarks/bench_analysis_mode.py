@@ -0,0 +1,126 @@
+"""
+Compare the "split" (two prompts) and "combined" (one prompt) analysis modes.
+
+Runs the same candidate turns through both modes against the configured
+LLM_MODEL with the response cache disabled, and reports prompt/completion
+tokens and wall time per turn. Set LLM_BACKEND=fake to run offline.
+
+Usage:
+    python benchmarks/bench_analysis_mode.py --turns 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import llm_call  # noqa: E402
+from utils.analyze_candidate import (  # noqa: E402
+    analyze_candidate_response_and_generate_new_question,
+)
+
+SAMPLE_JOB_DESCRIPTION = """
+Senior Backend Engineer. Design and operate Python microservices on AWS,
+own PostgreSQL schema design and query tuning, build event pipelines with
+Kafka, mentor junior engineers and drive incident reviews. 5+ years of
+experience with distributed systems, observability and CI/CD required.
+"""
+
+SAMPLE_RESUME_HIGHLIGHTS = [
+    "Led migration of a monolith to 14 Python microservices, cutting p95 latency by 40%",
+    "Designed Kafka-based ingestion pipeline processing 2B events/day",
+    "Reduced AWS spend by $380k/year through right-sizing and spot instances",
+    "Mentored 6 engineers; introduced blameless post-mortems",
+    "AWS Certified Solutions Architect – Professional",
+]
+
+SAMPLE_TURNS = [
+    (
+        "Can you tell me a bit about yourself and what you're looking for in a job?",
+        "I'm a backend engineer with seven years of experience, mostly Python on AWS. "
+        "Recently I led a migration from a monolith to microservices and I'm looking "
+        "for a role where I can own the platform end to end.",
+    ),
+    (
+        "How did you decide where to draw the service boundaries during the migration?",
+        "We started from the data. We mapped which tables were written by which "
+        "features and split along those seams, then used Kafka events to keep the "
+        "read models in sync while we strangled the old code paths.",
+    ),
+    (
+        "Tell me about an incident you handled in production.",
+        "A consumer lag spike took our billing pipeline down for an hour. I ran the "
+        "incident, we scaled the consumers, and afterwards we added lag-based alerting "
+        "and back-pressure so it could not silently pile up again.",
+    ),
+]
+
+
+class UsageMeter:
+    """Wraps the backend's acompletion to accumulate token usage per call."""
+
+    def __init__(self, acompletion):
+        self._acompletion = acompletion
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    async def __call__(self, *args, **kwargs):
+        response = await self._acompletion(*args, **kwargs)
+        usage = getattr(response, "usage", None)
+        self.calls += 1
+        if usage is not None:
+            self.prompt_tokens += usage.prompt_tokens or 0
+            self.completion_tokens += usage.completion_tokens or 0
+        return response
+
+
+async def run_mode(mode, turns):
+    backend = llm_call.llm_backend
+    meter = UsageMeter(backend.acompletion)
+    backend.acompletion = meter
+    wall_times = []
+    try:
+        for i in range(turns):
+            question, answer = SAMPLE_TURNS[i % len(SAMPLE_TURNS)]
+            start = time.perf_counter()
+            await analyze_candidate_response_and_generate_new_question(
+                question,
+                answer,
+                SAMPLE_JOB_DESCRIPTION,
+                SAMPLE_RESUME_HIGHLIGHTS,
+                mode=mode,
+            )
+            wall_times.append(time.perf_counter() - start)
+    finally:
+        del backend.acompletion
+    return meter, wall_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=5, help="turns per mode")
+    args = parser.parse_args()
+
+    # Every turn must reach the provider for the comparison to be meaningful.
+    llm_call.LLM_CACHE_ENABLED = False
+
+    print(f"Model: {llm_call.LLM_MODEL}  Turns per mode: {args.turns}\n")
+    print(f"{'mode':<10}{'calls':>7}{'prompt tok':>12}{'compl tok':>11}{'p50 s':>8}{'mean s':>8}")
+    for mode in ("split", "combined"):
+        meter, wall_times = asyncio.run(run_mode(mode, args.turns))
+        print(
+            f"{mode:<10}{meter.calls:>7}"
+            f"{meter.prompt_tokens / args.turns:>12.0f}"
+            f"{meter.completion_tokens / args.turns:>11.0f}"
+            f"{statistics.median(wall_times):>8.2f}"
+            f"{statistics.mean(wall_times):>8.2f}"
+        )
+    print("\nToken columns are per turn.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Compare the file-based answer pipeline with the in-memory one, up to the
+point where audio is handed to the ASR backend.
+
+File-based (previous ``main.record_and_transcribe``): write WAV → read to
+validate → read, denoise, rewrite → read to validate → read for upload.
+In-memory (``utils.audio_pipeline``): validate → denoise → validate → encode,
+with the WAV written on the background writer. Also times how long the
+Speechmatics client takes to read the upload from a file (one thread pool
+per chunk) versus from ``BytesAudioStream``.
+
+Usage:
+    python benchmarks/bench_audio_pipeline.py --seconds 15 60 --repeat 5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+from scipy.io.wavfile import read, write
+from speechmatics.helpers import read_in_chunks
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.audio_pipeline import (  # noqa: E402
+    denoise_audio,
+    encode_wav,
+    save_audio_async,
+    validate_audio_data,
+    wait_for_saves,
+)
+from utils.transcript_audio import BytesAudioStream  # noqa: E402
+
+FS = 16000
+
+
+def file_pipeline(data, filename, denoise):
+    write(filename, FS, data)
+    rate, audio = read(filename)
+    if not validate_audio_data(audio, rate):
+        return None
+    if denoise:
+        rate, audio = read(filename)
+        write(filename, FS, denoise_audio(audio, rate))
+    rate, audio = read(filename)
+    if not validate_audio_data(audio, rate):
+        return None
+    with open(filename, "rb") as f:
+        return f.read()
+
+
+def memory_pipeline(data, filename, denoise):
+    if not validate_audio_data(data, FS):
+        return None
+    if denoise:
+        data = denoise_audio(data, FS)
+        if not validate_audio_data(data, FS):
+            return None
+    wav_bytes = encode_wav(data, FS)
+    save_audio_async(filename, wav_bytes)
+    return wav_bytes
+
+
+async def drain(stream, chunk_size=4096):
+    """Read ``stream`` the way the Speechmatics client does when uploading."""
+    async for _ in read_in_chunks(stream, chunk_size):
+        pass
+
+
+def upload_read_times(wav_bytes, filename, repeat):
+    with open(filename, "wb") as f:
+        f.write(wav_bytes)
+    times = {"file": [], "memory": []}
+    for _ in range(repeat):
+        with open(filename, "rb") as f:
+            start = time.perf_counter()
+            asyncio.run(drain(f))
+            times["file"].append(time.perf_counter() - start)
+        start = time.perf_counter()
+        asyncio.run(drain(BytesAudioStream(wav_bytes)))
+        times["memory"].append(time.perf_counter() - start)
+    return {name: statistics.median(values) for name, values in times.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, nargs="+", default=[15, 60])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    directory = tempfile.mkdtemp(prefix="bench_audio_")
+    print(f"{'answer':>7}{'denoise':>9}{'file ms':>10}{'memory ms':>11}{'saved':>8}")
+    for seconds in args.seconds:
+        data = (rng.standard_normal((int(seconds * FS), 1)) * 3000).astype(np.int16)
+        for denoise in (False, True):
+            results = {}
+            for name, pipeline in (("file", file_pipeline), ("memory", memory_pipeline)):
+                times = []
+                for i in range(args.repeat):
+                    filename = os.path.join(directory, f"{name}_{i}.wav")
+                    start = time.perf_counter()
+                    pipeline(data, filename, denoise)
+                    times.append(time.perf_counter() - start)
+                    wait_for_saves()
+                results[name] = statistics.median(times)
+            print(f"{seconds:>6.0f}s{'yes' if denoise else 'no':>9}{results['file'] * 1e3:>10.1f}"
+                  f"{results['memory'] * 1e3:>11.1f}{1 - results['memory'] / results['file']:>8.0%}")
+
+    print(f"\n{'answer':>7}{'upload read':>13}{'file ms':>10}{'memory ms':>11}")
+    for seconds in args.seconds:
+        data = (rng.standard_normal((int(seconds * FS), 1)) * 3000).astype(np.int16)
+        results = upload_read_times(encode_wav(data, FS), os.path.join(directory, "upload.wav"), args.repeat)
+        print(f"{seconds:>6.0f}s{'':>13}{results['file'] * 1e3:>10.1f}{results['memory'] * 1e3:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Measure how much BM25 context retrieval shrinks per-turn prompts.
+
+Builds next-question and feedback prompts for each sample turn twice, with
+the full job description and resume highlights in the session prefix and
+with only the retrieved excerpts, and reports prompt tokens (chars / 4) per
+layout plus the cost of building the session index and of each lookup.
+
+Usage:
+    python benchmarks/bench_context_retrieval.py --budget 400
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import prompts, retrieval  # noqa: E402
+from utils.prompts import (  # noqa: E402
+    build_session_messages,
+    feedback_generation,
+    next_question_generation,
+)
+from benchmarks.bench_analysis_mode import SAMPLE_RESUME_HIGHLIGHTS, SAMPLE_TURNS  # noqa: E402
+
+# A full-length posting; the short sample in bench_analysis_mode fits any budget.
+LONG_JOB_DESCRIPTION = """
+Senior Backend Engineer, Payments Platform
+
+About the team
+The Payments Platform team owns the services that authorize, capture and settle every
+transaction on the marketplace. We process tens of millions of payments a day across
+forty currencies and are on call for systems where minutes of downtime cost real money.
+
+What you will do
+- Design, build and operate Python microservices on AWS (ECS, Lambda, DynamoDB, SQS).
+- Own PostgreSQL schema design, migrations and query tuning for high-write ledgers.
+- Build and evolve event pipelines on Kafka, including exactly-once consumers and replay tooling.
+- Drive reliability: SLOs, error budgets, capacity planning, load testing and chaos drills.
+- Lead incident response and run blameless post-incident reviews with clear follow-ups.
+- Improve observability with structured logging, tracing (OpenTelemetry) and Prometheus metrics.
+- Partner with fraud, risk and finance teams on reconciliation and reporting requirements.
+- Mentor junior and mid-level engineers through pairing, design reviews and code reviews.
+- Contribute to architecture decisions and write design documents for cross-team changes.
+
+What we are looking for
+- 5+ years building distributed backend systems in production, ideally in Python or Go.
+- Deep experience with relational databases: indexing, isolation levels, partitioning, replication.
+- Hands-on experience with message brokers (Kafka, Kinesis or RabbitMQ) and idempotent processing.
+- Comfort with infrastructure as code (Terraform or CloudFormation) and CI/CD pipelines.
+- A track record of reducing latency or cost in a measurable way.
+- Clear written communication and the ability to explain trade-offs to non-engineers.
+
+Nice to have
+- Payments, banking or ledger experience (PCI DSS, ISO 20022, card networks).
+- Kubernetes operations experience and service mesh familiarity.
+- Experience leading a migration from a monolith to services.
+- AWS certifications.
+
+Benefits
+Competitive salary and equity, remote-friendly with quarterly offsites, learning budget,
+parental leave, and a four-day on-call rotation with paid time off after incidents.
+"""
+
+EXTRA_HIGHLIGHTS = [
+    "Built a double-entry ledger on PostgreSQL handling 12k writes/s with serializable isolation",
+    "Introduced OpenTelemetry tracing across 30 services; cut MTTR from 70 to 25 minutes",
+    "Authored Terraform modules used by 9 teams for ECS and RDS provisioning",
+    "Speaker at PyCon on idempotent Kafka consumers",
+]
+
+
+def prompt_tokens(messages):
+    return sum(retrieval.count_tokens(m["content"]) for m in messages)
+
+
+def build_prompts(question, answer, highlights):
+    return [
+        build_session_messages(
+            next_question_generation.format(previous_question=question, candidate_response=answer),
+            LONG_JOB_DESCRIPTION,
+            highlights,
+            query=f"{question}\n{answer}",
+        ),
+        build_session_messages(
+            feedback_generation.format(question=question, candidate_response=answer),
+            LONG_JOB_DESCRIPTION,
+            highlights,
+            query=f"{question}\n{answer}",
+        ),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget", type=int, default=retrieval.CONTEXT_TOKEN_BUDGET)
+    parser.add_argument("--top-k", type=int, default=retrieval.CONTEXT_TOP_K)
+    args = parser.parse_args()
+
+    retrieval.CONTEXT_TOKEN_BUDGET = args.budget
+    retrieval.CONTEXT_TOP_K = args.top_k
+    highlights = SAMPLE_RESUME_HIGHLIGHTS + EXTRA_HIGHLIGHTS
+
+    start = time.perf_counter()
+    index = retrieval.SessionContextIndex(LONG_JOB_DESCRIPTION, highlights)
+    build_ms = (time.perf_counter() - start) * 1000
+    lookups = []
+    for question, answer in SAMPLE_TURNS * 20:
+        start = time.perf_counter()
+        index.select(f"{question}\n{answer}")
+        lookups.append((time.perf_counter() - start) * 1e6)
+
+    totals = {}
+    for layout, enabled in (("full", False), ("retrieval", True)):
+        prompts.CONTEXT_RETRIEVAL = enabled
+        totals[layout] = [
+            prompt_tokens(messages)
+            for question, answer in SAMPLE_TURNS
+            for messages in build_prompts(question, answer, highlights)
+        ]
+
+    print(f"Session context: {len(index.chunks)} chunks, ~{index.total_tokens} tokens  "
+          f"(budget {args.budget}, top-k {args.top_k})")
+    print(f"Index build {build_ms:.2f} ms  lookup p50 {statistics.median(lookups):.0f} µs\n")
+    print(f"{'layout':<11}{'prompts':>8}{'tokens p50':>12}{'tokens mean':>13}")
+    for layout, tokens in totals.items():
+        print(f"{layout:<11}{len(tokens):>8}{statistics.median(tokens):>12.0f}"
+              f"{statistics.mean(tokens):>13.0f}")
+    saved = 1 - statistics.mean(totals["retrieval"]) / statistics.mean(totals["full"])
+    print(f"\nPrompt tokens saved per turn: {saved:.0%}")
+
+
+if __name__ == "__main__":
+    main()
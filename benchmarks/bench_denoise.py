@@ -0,0 +1,77 @@
+"""
+CPU cost and post-answer latency of noise reduction: the current
+``noisereduce.reduce_noise`` call over the whole answer versus
+``StreamingDenoiser`` fed in recorder-sized blocks.
+
+"cold" estimates the candidate's noise profile from the start of the answer;
+"cached" reuses it (every answer after the first). Post-answer latency is the
+time left to spend once recording stops: the whole call for noisereduce,
+the last block plus ``flush()`` for the streaming denoiser.
+
+Usage:
+    python benchmarks/bench_denoise.py --seconds 15 60 120 --blocksize 512
+"""
+import argparse
+import os
+import sys
+import time
+
+import noisereduce as nr
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.denoise import StreamingDenoiser, get_noise_profile  # noqa: E402
+
+FS = 16000
+
+
+def make_answer(rng, seconds):
+    """Room noise, then a voiced harmonic signal over the same noise."""
+    t = np.arange(int(seconds * FS)) / FS
+    voice = sum(np.sin(2 * np.pi * 140 * k * t) / k for k in range(1, 6))
+    voice *= 0.6 + 0.4 * np.sin(2 * np.pi * 3 * t)
+    voice[: FS] = 0  # one second before the candidate starts talking
+    voice = voice / np.sqrt(np.mean(voice ** 2)) * 0.1
+    noise = rng.standard_normal(len(t)) * 0.01
+    return (np.clip(voice + noise, -1, 1) * 32767).astype(np.int16)
+
+
+def run_streaming(samples, blocksize, key):
+    denoiser = StreamingDenoiser(FS, get_noise_profile(key), key)
+    start_cpu = time.process_time()
+    last_block = 0.0
+    for i in range(0, len(samples), blocksize):
+        start = time.perf_counter()
+        denoiser.process(samples[i:i + blocksize])
+        last_block = time.perf_counter() - start
+    start = time.perf_counter()
+    denoiser.flush()
+    tail = last_block + time.perf_counter() - start
+    return time.process_time() - start_cpu, tail
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, nargs="+", default=[15, 60, 120])
+    parser.add_argument("--blocksize", type=int, default=512)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'answer':>7}  {'method':<22}{'cpu ms / audio s':>17}{'post-answer ms':>16}")
+    for n, seconds in enumerate(args.seconds):
+        samples = make_answer(rng, seconds)
+
+        start_cpu, start = time.process_time(), time.perf_counter()
+        nr.reduce_noise(y=samples, sr=FS)
+        cpu, wall = time.process_time() - start_cpu, time.perf_counter() - start
+        print(f"{seconds:>6.0f}s  {'noisereduce (current)':<22}{cpu / seconds * 1e3:>17.2f}{wall * 1e3:>16.1f}")
+
+        key = f"bench-{n}"
+        for label in ("streaming (cold)", "streaming (cached)"):
+            cpu, tail = run_streaming(samples, args.blocksize, key)
+            print(f"{'':>7}  {label:<22}{cpu / seconds * 1e3:>17.2f}{tail * 1e3:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+End-to-end load test of the interview pipeline (resume extraction, then
+per-turn feedback + next question) with many concurrent simulated interviews.
+With --scoring batch|fanout, turns only generate the next question and all
+answers are scored at the end (deferred scoring).
+
+Runs against the fake backend by default (no network, no API quota); pass
+--live to use the configured provider instead. With --check it exits
+non-zero if any turn fell back to a canned question or lost its score,
+which makes it usable as an offline regression test.
+
+Usage:
+    python benchmarks/bench_interview_pipeline.py --interviews 20 --turns 5
+    python benchmarks/bench_interview_pipeline.py --scoring batch
+    FAKE_LLM_ERROR_RATE=0.1 python benchmarks/bench_interview_pipeline.py --check
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if "--live" not in sys.argv:
+    os.environ["LLM_BACKEND"] = "fake"
+os.environ.setdefault("LLM_TELEMETRY_JSONL", "")
+
+from utils import llm_call  # noqa: E402
+from utils.analyze_candidate import (  # noqa: E402
+    analyze_candidate_response_and_generate_new_question,
+    get_next_question,
+    pending_feedback,
+    score_conversations,
+)
+from utils.basic_details import extract_resume_info_using_llm_async  # noqa: E402
+from utils.telemetry import format_report, get_llm_telemetry_stats  # noqa: E402
+from benchmarks.bench_analysis_mode import (  # noqa: E402
+    SAMPLE_JOB_DESCRIPTION,
+    SAMPLE_RESUME_HIGHLIGHTS,
+    SAMPLE_TURNS,
+)
+
+FALLBACK_QUESTIONS = {
+    "Can you tell me more about your problem-solving approach?",
+    "What motivates you to take on challenging projects?",
+    "Could you describe a challenging situation you faced at work and how you handled it?",
+}
+
+
+async def run_interview(index, turns, scoring, problems, end_latencies):
+    resume = f"Candidate {index}\n" + "\n".join(SAMPLE_RESUME_HIGHLIGHTS)
+    name, highlights = await extract_resume_info_using_llm_async(resume)
+    if name == "Candidate" and not highlights:
+        problems.append(f"interview {index}: resume extraction fell back")
+
+    question = SAMPLE_TURNS[0][0]
+    turn_latencies, conversations = [], []
+    for turn in range(turns):
+        answer = SAMPLE_TURNS[(index + turn) % len(SAMPLE_TURNS)][1]
+        start = time.perf_counter()
+        if scoring == "inline":
+            next_question, feedback = await analyze_candidate_response_and_generate_new_question(
+                question, answer, SAMPLE_JOB_DESCRIPTION, highlights
+            )
+        else:
+            next_question = await get_next_question(
+                question, answer, highlights, SAMPLE_JOB_DESCRIPTION
+            )
+            feedback = pending_feedback()
+        turn_latencies.append(time.perf_counter() - start)
+        conversations.append({
+            "Question": question,
+            "Candidate Answer": answer,
+            "Evaluation": feedback["score"],
+            "Feedback": feedback["feedback"],
+        })
+        question = next_question
+        if question in FALLBACK_QUESTIONS:
+            problems.append(f"interview {index} turn {turn}: fallback question")
+
+    if scoring != "inline":
+        start = time.perf_counter()
+        await score_conversations(conversations, SAMPLE_JOB_DESCRIPTION, highlights, mode=scoring)
+        end_latencies.append(time.perf_counter() - start)
+    for turn, conv in enumerate(conversations):
+        if not 1 <= float(conv["Evaluation"] or 0) <= 10:
+            problems.append(f"interview {index} turn {turn}: score {conv['Evaluation']}")
+    return turn_latencies
+
+
+async def run(interviews, turns, scoring):
+    problems, end_latencies = [], []
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(run_interview(i, turns, scoring, problems, end_latencies) for i in range(interviews))
+    )
+    elapsed = time.perf_counter() - start
+    return [t for latencies in results for t in latencies], end_latencies, elapsed, problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--interviews", type=int, default=20)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--scoring", choices=("inline", "batch", "fanout"), default="inline")
+    parser.add_argument("--live", action="store_true", help="use the configured provider")
+    parser.add_argument("--check", action="store_true", help="exit 1 on degraded turns")
+    args = parser.parse_args()
+
+    llm_call.LLM_CACHE_ENABLED = False
+
+    latencies, end_latencies, elapsed, problems = asyncio.run(
+        run(args.interviews, args.turns, args.scoring)
+    )
+    ordered = sorted(latencies)
+    print(f"Backend: {llm_call.LLM_BACKEND}  Model: {llm_call.LLM_MODEL}")
+    print(f"{args.interviews} interviews x {args.turns} turns in {elapsed:.2f}s "
+          f"({len(latencies) / elapsed:.1f} turns/s)")
+    print(f"Turn latency p50 {statistics.median(ordered):.2f}s  "
+          f"p95 {ordered[int(0.95 * (len(ordered) - 1))]:.2f}s  max {ordered[-1]:.2f}s")
+    if end_latencies:
+        print(f"End-of-interview scoring ({args.scoring}) p50 {statistics.median(end_latencies):.2f}s  "
+              f"max {max(end_latencies):.2f}s")
+    print(f"Degraded turns: {len(problems)}\n")
+    print(format_report(get_llm_telemetry_stats()))
+
+    if args.check and problems:
+        for problem in problems[:20]:
+            print(f"⚠️ {problem}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,97 @@
+"""
+Micro-benchmark: shared JSON extractor vs. the two parsers it replaced.
+
+Builds large, noisy LLM-style responses (chatter, code fences, a nested JSON
+object with braces inside strings, trailing prose) and reports time per parse
+and whether each implementation recovered the expected object.
+
+Usage:
+    python benchmarks/bench_json_extract.py --sizes 1000 10000 100000 1000000
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.json_extract import extract_json_object  # noqa: E402
+
+
+def legacy_regex_parse(response):
+    """Former utils.analyze_candidate.parse_json_response."""
+    if not response or not response.strip():
+        return None
+    try:
+        return json.loads(response)
+    except json.JSONDecodeError:
+        matches = re.findall(r"\{[\s\S]*?\}", response)
+        for match in matches:
+            try:
+                return json.loads(match)
+            except json.JSONDecodeError:
+                continue
+        return None
+
+
+def legacy_strip_parse(response):
+    """Former utils.llm_call.parse_json_response."""
+    try:
+        response = response.strip("```json").strip("```")
+        return json.loads(response)
+    except json.JSONDecodeError:
+        return None
+
+
+IMPLEMENTATIONS = {
+    "extract_json_object": extract_json_object,
+    "legacy_regex": legacy_regex_parse,
+    "legacy_strip": legacy_strip_parse,
+}
+
+WORDS = "the candidate demonstrated strong ownership of the migration and {braces} in prose".split()
+
+
+def make_response(size, rng):
+    payload = {
+        "feedback": "Clear structure; mention metrics like {p95} and the {SLO}.",
+        "score": 8,
+        "details": {"strengths": ["ownership", "clarity"], "gaps": {"metrics": True}},
+    }
+    body = json.dumps(payload, indent=2)
+    filler = max(0, size - len(body)) // 2
+
+    def prose(n):
+        out, length = [], 0
+        while length < n:
+            word = rng.choice(WORDS)
+            out.append(word)
+            length += len(word) + 1
+        return " ".join(out)
+
+    text = f"Sure! Here is the evaluation.\n{prose(filler)}\n```json\n{body}\n```\n{prose(filler)}"
+    return text, payload
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'size':>10}  {'implementation':<22}{'ms/parse':>10}  correct")
+    for size in args.sizes:
+        text, expected = make_response(size, rng)
+        number = max(1, 200_000 // size)
+        for name, fn in IMPLEMENTATIONS.items():
+            seconds = min(timeit.repeat(lambda: fn(text), number=number, repeat=args.repeat)) / number
+            correct = fn(text) == expected
+            print(f"{len(text):>10}  {name:<22}{seconds * 1000:>10.3f}  {correct}")
+
+
+if __name__ == "__main__":
+    main()
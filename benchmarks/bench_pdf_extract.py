@@ -0,0 +1,122 @@
+"""
+Benchmark PDF text extraction on synthetic multi-page PDFs.
+
+Compares the old loop (``text += page.extract_text()`` on the calling
+thread) with ``utils.load_content.extract_pdf_text`` serially and across
+the process pool, for several page counts. Caps are lifted so every page is read.
+
+Usage:
+    python benchmarks/bench_pdf_extract.py --pages 10 50 200 --repeat 3
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pypdf import PdfReader  # noqa: E402
+
+from utils.load_content import (  # noqa: E402
+    PDF_MAX_CHARS,
+    PDF_MAX_PAGES,
+    PDF_PARALLEL_MIN_PAGES,
+    PDF_WORKERS,
+    extract_pdf_text,
+)
+
+LINE = "Led migration of {n} services to Kubernetes, cutting deploy time by {p}% and on-call load."
+
+
+def make_pdf(pages, lines_per_page=45):
+    """Minimal valid PDF with ``pages`` pages of Helvetica text."""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # page tree, filled in below
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for page in range(pages):
+        lines = [
+            f"({LINE.format(n=page * lines_per_page + i, p=(i * 7) % 90)}) Tj T*"
+            for i in range(lines_per_page)
+        ]
+        stream = ("BT /F1 10 Tf 14 TL 40 800 Td\n" + "\n".join(lines) + "\nET").encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        kids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % k for k in kids), pages
+    )
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        out.write(b"%010d 00000 n \n" % offset)
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+def legacy_extract(data):
+    text = ""
+    for page in PdfReader(io.BytesIO(data)).pages:
+        text += page.extract_text()
+    return text
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=PDF_WORKERS)
+    args = parser.parse_args()
+
+    # Warm the pool so worker start-up isn't charged to the first run.
+    extract_pdf_text(io.BytesIO(make_pdf(32)), max_pages=0, max_chars=0, workers=args.workers)
+
+    print(f"Workers: {args.workers}  (parallel from {PDF_PARALLEL_MIN_PAGES} pages)\n")
+    print(f"{'pages':>6}{'chars':>10}{'legacy s':>10}{'serial s':>10}{'pool s':>10}{'speedup':>9}")
+    for pages in args.pages:
+        data = make_pdf(pages)
+        legacy, text = timed(lambda: legacy_extract(data), args.repeat)
+        serial, _ = timed(
+            lambda: extract_pdf_text(io.BytesIO(data), max_pages=0, max_chars=0, workers=1),
+            args.repeat,
+        )
+        pooled, _ = timed(
+            lambda: extract_pdf_text(
+                io.BytesIO(data), max_pages=0, max_chars=0, workers=args.workers
+            ),
+            args.repeat,
+        )
+        print(f"{pages:>6}{len(text):>10}{legacy:>10.3f}{serial:>10.3f}{pooled:>10.3f}"
+              f"{legacy / pooled:>8.1f}x")
+
+    capped, _ = timed(lambda: extract_pdf_text(io.BytesIO(make_pdf(200))), 1)
+    print(f"\n200 pages with default caps ({PDF_MAX_PAGES} pages / "
+          f"{PDF_MAX_CHARS} chars): {capped:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Measure the effect of the stable session prefix on time-to-first-token.
+
+Streams the same sequence of next-question turns twice against the
+configured LLM_MODEL with the response cache disabled:
+
+  legacy   one user message; per-turn fields come before the job
+           description and resume, so no two calls share a prefix
+  session  system message (role + job description + resume) that is
+           identical across turns, followed by the per-turn task
+
+Reports TTFT and total latency per turn, plus how many prompt tokens sit in
+the stable prefix and how many the provider reported as cached (if any).
+
+Usage:
+    python benchmarks/bench_prompt_prefix.py --turns 6
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import llm_call  # noqa: E402
+from utils.prompts import (  # noqa: E402
+    build_session_messages,
+    format_resume_highlights,
+    next_question_generation,
+)
+from benchmarks.bench_analysis_mode import (  # noqa: E402
+    SAMPLE_JOB_DESCRIPTION,
+    SAMPLE_RESUME_HIGHLIGHTS,
+    SAMPLE_TURNS,
+)
+
+
+def legacy_prompt(question, answer):
+    task = next_question_generation.format(previous_question=question, candidate_response=answer)
+    return (
+        f"{task}\n\nJob Description: {SAMPLE_JOB_DESCRIPTION.strip()}\n"
+        f"Resume Highlights: {format_resume_highlights(SAMPLE_RESUME_HIGHLIGHTS)}"
+    )
+
+
+def session_prompt(question, answer):
+    return build_session_messages(
+        next_question_generation.format(previous_question=question, candidate_response=answer),
+        SAMPLE_JOB_DESCRIPTION,
+        SAMPLE_RESUME_HIGHLIGHTS,
+    )
+
+
+async def run_layout(build, turns):
+    ttfts, totals = [], []
+    for i in range(turns):
+        question, answer = SAMPLE_TURNS[i % len(SAMPLE_TURNS)]
+        start = time.perf_counter()
+        first = None
+        async for _ in llm_call.stream_response_from_llm_async(build(question, answer)):
+            if first is None:
+                first = time.perf_counter() - start
+        totals.append(time.perf_counter() - start)
+        ttfts.append(first if first is not None else totals[-1])
+    return ttfts, totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=6, help="turns per layout")
+    args = parser.parse_args()
+
+    # Every turn must reach the provider for the comparison to be meaningful.
+    llm_call.LLM_CACHE_ENABLED = False
+
+    print(f"Model: {llm_call.LLM_MODEL}  Turns per layout: {args.turns}\n")
+    print(f"{'layout':<10}{'ttft p50':>10}{'ttft mean':>11}{'total p50':>11}")
+    for name, build in (("legacy", legacy_prompt), ("session", session_prompt)):
+        ttfts, totals = asyncio.run(run_layout(build, args.turns))
+        print(
+            f"{name:<10}{statistics.median(ttfts):>10.2f}"
+            f"{statistics.mean(ttfts):>11.2f}{statistics.median(totals):>11.2f}"
+        )
+
+    stats = llm_call.get_prompt_prefix_stats()
+    print(
+        f"\nStable prefix: {stats['prefix_tokens'] // max(stats['calls_with_prefix'], 1)} tokens/call"
+        f"  Provider-reported cached tokens: {stats['provider_cached_tokens']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
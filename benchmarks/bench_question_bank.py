@@ -0,0 +1,84 @@
+"""
+Measure question bank hit ratio and next-question latency across candidates
+interviewing for the same job description.
+
+Runs the same set of interviews sequentially through ``get_next_question``
+(fake backend, in-memory bank) with the bank off and then on for each
+similarity threshold. Candidate answers are paraphrased per interview so
+contexts are similar but not identical.
+
+Usage:
+    python benchmarks/bench_question_bank.py --interviews 30 --thresholds 0.7 0.8 0.9
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ["LLM_BACKEND"] = "fake"
+os.environ.setdefault("LLM_TELEMETRY_JSONL", "")
+
+from utils import analyze_candidate, llm_call  # noqa: E402
+from utils.question_bank import QUESTION_BANK_MAX_HIT_RATIO, QuestionBank  # noqa: E402
+from benchmarks.bench_analysis_mode import (  # noqa: E402
+    SAMPLE_JOB_DESCRIPTION,
+    SAMPLE_RESUME_HIGHLIGHTS,
+    SAMPLE_TURNS,
+)
+
+OPENERS = ["", "Sure. ", "Good question. ", "So, ", "Right, well, "]
+CLOSERS = ["", " That's the short version.", " Happy to go deeper.", " It was a great learning experience."]
+
+
+def paraphrase(rng, answer):
+    return rng.choice(OPENERS) + answer + rng.choice(CLOSERS)
+
+
+async def run(interviews, turns, bank):
+    analyze_candidate.QUESTION_BANK = bank is not None
+    if bank is not None:
+        analyze_candidate.question_bank = bank
+    latencies = []
+    for index in range(interviews):
+        rng = random.Random(index)
+        for turn in range(turns):
+            question, answer = SAMPLE_TURNS[turn % len(SAMPLE_TURNS)]
+            start = time.perf_counter()
+            await analyze_candidate.get_next_question(
+                question, paraphrase(rng, answer), SAMPLE_RESUME_HIGHLIGHTS, SAMPLE_JOB_DESCRIPTION
+            )
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--interviews", type=int, default=30)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.7, 0.8, 0.9])
+    parser.add_argument("--max-hit-ratio", type=float, default=QUESTION_BANK_MAX_HIT_RATIO)
+    args = parser.parse_args()
+
+    llm_call.LLM_CACHE_ENABLED = False
+
+    print(f"{args.interviews} interviews x {args.turns} turns, one JD, "
+          f"max hit ratio {args.max_hit_ratio:.0%}\n")
+    print(f"{'bank':<12}{'hit ratio':>10}{'banked':>8}{'p50 s':>8}{'mean s':>8}")
+    latencies = asyncio.run(run(args.interviews, args.turns, None))
+    print(f"{'off':<12}{'-':>10}{'-':>8}{statistics.median(latencies):>8.3f}"
+          f"{statistics.mean(latencies):>8.3f}")
+    for threshold in args.thresholds:
+        bank = QuestionBank(path=None, min_similarity=threshold, max_hit_ratio=args.max_hit_ratio)
+        latencies = asyncio.run(run(args.interviews, args.turns, bank))
+        stats = bank.stats()
+        print(f"{f'sim>={threshold:.2f}':<12}{stats['hit_ratio']:>10.0%}{stats['banked']:>8}"
+              f"{statistics.median(latencies):>8.3f}{statistics.mean(latencies):>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
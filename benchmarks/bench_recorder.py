@@ -0,0 +1,77 @@
+"""
+Compare the old list-of-chunks recorder with the preallocated ring buffer.
+
+Simulates sounddevice callbacks for answers of several lengths and reports
+time spent in the callback (p50 / p99 / max), time to produce the final
+array for writing, and how many bytes were copied to produce it.
+
+Usage:
+    python benchmarks/bench_recorder.py --seconds 30 120 600 --blocksize 512
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.audio_buffer import AudioRingBuffer  # noqa: E402
+
+
+class ListRecorder:
+    """The previous approach: append a copy per callback, concatenate at the end."""
+
+    def __init__(self, sample_rate):
+        self.chunks = []
+
+    def write(self, indata):
+        self.chunks.append(indata.copy())
+
+    def view(self):
+        return np.concatenate(self.chunks, axis=0)
+
+
+def simulate(recorder, blocks):
+    callback_times = []
+    for block in blocks:
+        start = time.perf_counter()
+        recorder.write(block)
+        callback_times.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    data = recorder.view()
+    finish = time.perf_counter() - start
+    # The list recorder's final array is always a fresh copy; the ring's is a view.
+    copied = data.nbytes if data.base is None else 0
+    return callback_times, finish, copied
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seconds", type=float, nargs="+", default=[30, 120, 600])
+    parser.add_argument("--blocksize", type=int, default=512)
+    parser.add_argument("--fs", type=int, default=16000)
+    args = parser.parse_args()
+
+    # sounddevice reuses one indata array per callback; so does this loop.
+    indata = (np.random.default_rng(0).standard_normal((args.blocksize, 1)) * 1000).astype(np.int16)
+
+    print(f"{'answer':>7}{'recorder':>10}{'cb p50 µs':>11}{'cb p99 µs':>11}{'cb max µs':>11}"
+          f"{'finish ms':>11}{'copied MB':>11}")
+    for seconds in args.seconds:
+        blocks = [indata] * int(seconds * args.fs / args.blocksize)
+        for name, recorder in (
+            ("list", ListRecorder(args.fs)),
+            ("ring", AudioRingBuffer(args.fs, max_seconds=max(600, seconds))),
+        ):
+            times, finish, copied = simulate(recorder, blocks)
+            ordered = sorted(times)
+            print(f"{seconds:>6.0f}s{name:>10}{statistics.median(ordered) * 1e6:>11.1f}"
+                  f"{ordered[int(0.99 * (len(ordered) - 1))] * 1e6:>11.1f}{ordered[-1] * 1e6:>11.1f}"
+                  f"{finish * 1e3:>11.2f}{copied / 1e6:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Measure how much audio voice-activity detection removes before upload and
+what it costs.
+
+Builds synthetic answers (room noise, voiced segments with short pauses,
+dead air before and after) and reports seconds uploaded with and without
+trimming, offline VAD time per answer, where ``EndOfAnswerDetector`` would
+have stopped the recording, and its per-callback cost.
+
+Usage:
+    python benchmarks/bench_vad.py --answers 20 --trailing-silence 2.0
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.audio_buffer import AudioRingBuffer  # noqa: E402
+from utils.vad import EndOfAnswerDetector, trim_silence  # noqa: E402
+
+FS = 16000
+BLOCKSIZE = 512
+
+
+def noise(rng, seconds, dbfs=-60):
+    return rng.standard_normal(int(seconds * FS)) * 10 ** (dbfs / 20)
+
+
+def voice(rng, seconds, dbfs=-25):
+    """Harmonic tone with a syllable-rate envelope; a stand-in for voiced speech."""
+    t = np.arange(int(seconds * FS)) / FS
+    f0 = rng.uniform(100, 220)
+    signal = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(1, 6))
+    signal *= 0.6 + 0.4 * np.sin(2 * np.pi * rng.uniform(2, 5) * t)
+    return signal / np.sqrt(np.mean(signal ** 2)) * 10 ** (dbfs / 20)
+
+
+def make_answer(rng, trailing):
+    """(int16 samples, time the candidate stopped talking)."""
+    parts = [noise(rng, rng.uniform(1, 4))]
+    for _ in range(rng.integers(2, 6)):
+        seconds = rng.uniform(1, 6)
+        parts.append(voice(rng, seconds) + noise(rng, seconds))
+        parts.append(noise(rng, rng.uniform(0.2, 1.0)))
+    spoke_until = sum(len(p) for p in parts[:-1]) / FS
+    parts[-1] = noise(rng, trailing)
+    samples = np.clip(np.concatenate(parts), -1, 1)
+    return (samples * 32767).astype(np.int16), spoke_until
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--answers", type=int, default=20)
+    parser.add_argument("--trailing-silence", type=float, default=2.0)
+    parser.add_argument("--dead-air", type=float, default=8.0,
+                        help="silence before the candidate presses Enter")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    raw, trimmed, vad_times, stop_delays, callback_times = [], [], [], [], []
+    for _ in range(args.answers):
+        samples, spoke_until = make_answer(rng, args.dead_air)
+        raw.append(len(samples) / FS)
+
+        start = time.perf_counter()
+        trimmed.append(len(trim_silence(samples, FS)) / FS)
+        vad_times.append(time.perf_counter() - start)
+
+        buffer = AudioRingBuffer(FS, max_seconds=len(samples) / FS + 1)
+        detector = EndOfAnswerDetector(FS, args.trailing_silence)
+        for i in range(0, len(samples), BLOCKSIZE):
+            buffer.write(samples[i:i + BLOCKSIZE, None])
+            start = time.perf_counter()
+            ended = detector.update(buffer)
+            callback_times.append(time.perf_counter() - start)
+            if ended:
+                stop_delays.append((i + BLOCKSIZE) / FS - spoke_until)
+                break
+
+    callback_times.sort()
+    print(f"{args.answers} answers, {args.dead_air:.0f}s dead air before Enter\n")
+    print(f"uploaded audio        {sum(raw):8.1f}s raw  -> {sum(trimmed):8.1f}s trimmed "
+          f"({1 - sum(trimmed) / sum(raw):.0%} less)")
+    print(f"offline VAD           {statistics.mean(vad_times) * 1e3:8.2f} ms per answer "
+          f"({statistics.mean(vad_times) / statistics.mean(raw) * 1e3:.2f} ms per audio second)")
+    print(f"auto-stop             {len(stop_delays)}/{args.answers} answers, "
+          f"{statistics.mean(stop_delays) if stop_delays else float('nan'):.2f}s after the last word "
+          f"(target {args.trailing_silence:.1f}s)")
+    print(f"detector per callback p50 {statistics.median(callback_times) * 1e6:.1f} µs, "
+          f"p99 {callback_times[int(0.99 * (len(callback_times) - 1))] * 1e6:.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,8 @@
 from dotenv import load_dotenv
+import asyncio
 import os
 from datetime import datetime
 from utils import (
-    record_audio_with_interrupt,
-    validate_audio_file,
-    reduce_noise,
-    transcribe_with_speechmatics,
-    extract_resume_info_using_llm,
     get_ai_greeting_message,
     speak_text,
     analyze_candidate_response_and_generate_new_question,
@@ -15,31 +11,124 @@ from utils import (
     get_feedback_of_candidate_response,
     get_overall_evaluation_score,
 )
+from utils.audio_pipeline import transcribe_answer, validate_audio_data, wait_for_saves
+from utils.denoise import DENOISE_STREAMING
+from utils.record_utils import record_and_transcribe_live, record_audio
+from utils.transcript_audio import ASR_STREAMING, TranscriptionResult
+from utils.jd_analysis import prepare_job_description
+from utils.question_bank import QUESTION_BANK, get_question_bank_stats
+from utils.resume_cache import extract_resume_info_cached, load_resume
+from utils.speculative import (
+    SPECULATIVE_QUESTIONS,
+    SpeculativeQuestionEngine,
+    get_speculation_stats,
+)
+from utils.telemetry import format_report, get_llm_telemetry_stats
+from utils.analyze_candidate import (
+    DEFERRED_SCORING,
+    get_next_question,
+    pending_feedback,
+    score_conversations,
+)
 
 load_dotenv()
 MAX_QUESTIONS = 5
+# Recordings per question before the turn is skipped as unanswered.
+MAX_RECORDING_ATTEMPTS = 3
 
 
 def record_and_transcribe(candidate_name, question_answer_number):
+    """Record one answer and return its ``TranscriptionResult``."""
     # Create audio directory if it doesn't exist
     os.makedirs(f"audio/{candidate_name}", exist_ok=True)
 
     filename = f"audio/{candidate_name}/{candidate_name}_{question_answer_number}.wav"
 
-    audio_file, fs = record_audio_with_interrupt(filename=filename)
+    if ASR_STREAMING:
+        return record_and_transcribe_streaming(filename, candidate_name)
+
+    # Validated, denoised and transcribed in memory; the WAV is saved in the background.
+    # With DENOISE_STREAMING the answer was already denoised while it was recorded.
+    buffer = record_audio(noise_key=candidate_name)
+    return transcribe_answer(
+        buffer.view(), buffer.sample_rate, filename=filename, denoise=not DENOISE_STREAMING
+    )
+
+
+def record_and_transcribe_streaming(filename, candidate_name):
+    """Transcribe while recording; retry on the recording if the live session fails."""
+    buffer, result = record_and_transcribe_live(filename=filename)
+
+    if not validate_audio_data(buffer.view(), buffer.sample_rate):
+        return TranscriptionResult(rejected="Audio seems invalid or too quiet")
+
+    if result.error is not None:
+        print(f"Warning: {result.message}; retrying on the recording")
+        result = transcribe_answer(
+            buffer.view(), buffer.sample_rate, streaming=False, noise_key=candidate_name
+        )
+    return result
+
+
+def record_answer(candidate_name, question_answer_number):
+    """Transcribed answer, asking again after a failed recording; None if every attempt failed."""
+    for attempt in range(1, MAX_RECORDING_ATTEMPTS + 1):
+        result = record_and_transcribe(candidate_name, question_answer_number)
+        if result.ok:
+            return result.text
+        print(f"Warning: {result.message}")
+        if attempt < MAX_RECORDING_ATTEMPTS:
+            print("Please answer the question again...")
+    print("Warning: No answer recorded, skipping this question")
+    return None
+
+
+def unanswered_feedback():
+    """Feedback for a question the candidate could not be recorded answering."""
+    return {"feedback": "No answer recorded", "score": 0.0}
+
+
+async def analyze_turn(question, candidate_response, job_description, resume_highlights,
+                       asked_questions=()):
+    """
+    Next question plus feedback, or only the next question when scoring is
+    deferred. An unanswered question (``candidate_response`` None) is not scored.
+    ``asked_questions`` are never repeated from the question bank.
+    """
+    if candidate_response is None:
+        next_question = await get_next_question(
+            question, "", resume_highlights, job_description, asked_questions=asked_questions
+        )
+        return next_question, unanswered_feedback()
+    if DEFERRED_SCORING:
+        next_question = await get_next_question(
+            question, candidate_response, resume_highlights, job_description,
+            asked_questions=asked_questions,
+        )
+        return next_question, pending_feedback()
+    return await analyze_candidate_response_and_generate_new_question(
+        question, candidate_response, job_description, resume_highlights,
+        asked_questions=asked_questions,
+    )
 
-    if not validate_audio_file(audio_file):
-        print("Warning: Audio file seems invalid or too quiet")
-        return "No valid audio recorded"
 
-    audio_file = reduce_noise(audio_file, fs)
+def score_answer(question, candidate_response, job_description, resume_highlights):
+    if candidate_response is None:
+        return unanswered_feedback()
+    if DEFERRED_SCORING:
+        return pending_feedback()
+    return asyncio.run(
+        get_feedback_of_candidate_response(
+            question, candidate_response, job_description, resume_highlights
+        )
+    )
 
-    if not validate_audio_file(audio_file):
-        print("Warning: Audio file seems invalid after noise reduction")
-        return "No valid audio after processing"
 
-    transcript = transcribe_with_speechmatics(audio_file)
-    return transcript
+async def speak_and_score(closing_message, conversations, job_description, resume_highlights):
+    await asyncio.gather(
+        asyncio.to_thread(speak_text, closing_message),
+        score_conversations(conversations, job_description, resume_highlights),
+    )
 
 
 def start_interview_with_ai(
@@ -47,6 +136,7 @@ def start_interview_with_ai(
 ):
     conversations = []
     question_answer_number = 1
+    speculative_engine = SpeculativeQuestionEngine() if SPECULATIVE_QUESTIONS else None
 
     # Step 1: AI Greeting and first question
     print("Starting AI Interview...")
@@ -55,17 +145,17 @@ def start_interview_with_ai(
 
     # Step 2: Record and transcribe first response
     print("Please answer the question...")
-    candidate_response = record_and_transcribe(name, question_answer_number)
+    candidate_response = record_answer(name, question_answer_number)
 
     # Step 3: Analyze first response and generate next question
-    next_question, feedback = analyze_candidate_response_and_generate_new_question(
-        ai_greeting_message, candidate_response, job_description, resume_highlights
+    next_question, feedback = asyncio.run(
+        analyze_turn(ai_greeting_message, candidate_response, job_description, resume_highlights)
     )
 
     # Save first conversation
     first_conversation = {
         "Question": ai_greeting_message,
-        "Candidate Answer": candidate_response,
+        "Candidate Answer": candidate_response or "",
         "Evaluation": feedback["score"],
         "Feedback": feedback["feedback"],
     }
@@ -78,42 +168,61 @@ def start_interview_with_ai(
 
         # Ask next question
         speak_text(next_question)
+        if speculative_engine and i < max_questions - 1:
+            speculative_engine.start(next_question, resume_highlights, job_description)
 
         # Record and transcribe response
         print("Please answer the question...")
-        candidate_response = record_and_transcribe(name, question_answer_number)
+        candidate_response = record_answer(name, question_answer_number)
 
         # Analyze response and generate next question (for next iteration)
         if i < max_questions - 1:  # Don't generate next question for last iteration
-            next_question_temp, feedback = (
-                analyze_candidate_response_and_generate_new_question(
-                    next_question,
-                    candidate_response,
-                    job_description,
-                    resume_highlights,
-                )
+            speculative_question = (
+                speculative_engine.take(next_question, candidate_response)
+                if speculative_engine and candidate_response is not None
+                else None
             )
-            next_question = next_question_temp
+            if speculative_question:
+                next_question_temp = speculative_question
+                feedback = score_answer(
+                    next_question, candidate_response, job_description, resume_highlights
+                )
+            else:
+                next_question_temp, feedback = asyncio.run(
+                    analyze_turn(
+                        next_question,
+                        candidate_response,
+                        job_description,
+                        resume_highlights,
+                        asked_questions=[c["Question"] for c in conversations],
+                    )
+                )
         else:
             # For last question, just get feedback
-            feedback = get_feedback_of_candidate_response(
+            feedback = score_answer(
                 next_question, candidate_response, job_description, resume_highlights
             )
 
         # Save conversation
         conversation = {
             "Question": next_question,
-            "Candidate Answer": candidate_response,
+            "Candidate Answer": candidate_response or "",
             "Evaluation": feedback["score"],
             "Feedback": feedback["feedback"],
         }
         conversations.append(conversation)
         question_answer_number += 1
+        if i < max_questions - 1:
+            next_question = next_question_temp
 
     # Step 5: Conclude interview
     closing_message = f"Thank you {name} for your time today. This concludes our interview. We will get back to you soon with the results. Have a great day!"
     print(closing_message)
-    speak_text(closing_message)
+    if DEFERRED_SCORING:
+        # Score every answer while the closing message is being spoken
+        asyncio.run(speak_and_score(closing_message, conversations, job_description, resume_highlights))
+    else:
+        speak_text(closing_message)
     print("Interview completed!")
 
     return conversations
@@ -137,7 +246,7 @@ def app():
         print(f"Error: Job description file not found at {job_desc_path}")
         return
 
-    resume_content = load_content(resume_path)
+    fingerprint, resume_content = load_resume(resume_path)
     job_description = load_content(job_desc_path)
 
     if not resume_content or not job_description:
@@ -146,7 +255,7 @@ def app():
 
     # Step 2: Extract candidate information using LLM
     print("Step 2: Extracting candidate information...")
-    name, resume_highlights = extract_resume_info_using_llm(resume_content)
+    name, resume_highlights = extract_resume_info_cached(fingerprint, resume_content)
 
     # Step 3: Get confirmation to start interview
     print(f"Step 3: Ready to interview {name}")
@@ -160,7 +269,9 @@ def app():
 
     # Step 4: Conduct the interview
     print("Step 4: Starting interview...")
-    conversations = start_interview_with_ai(name, resume_highlights, job_description)
+    # Prompts embed the shared JD summary when JD analysis is enabled.
+    job_context = prepare_job_description(job_description)
+    conversations = start_interview_with_ai(name, resume_highlights, job_context)
 
     # Step 5: Calculate overall score and prepare final data
     print("Step 5: Calculating final results...")
@@ -183,11 +294,19 @@ def app():
     # Step 7: Save results
     print("Step 6: Saving results...")
     save_interview_data(interview_data, candidate_name=name)
+    wait_for_saves()
 
     print(f"\n=== Interview Summary ===")
     print(f"Candidate: {name}")
     print(f"Total Questions: {len(conversations)}")
     print(f"Overall Score: {final_evaluation_score:.2f}/10")
+    if SPECULATIVE_QUESTIONS:
+        print(f"Speculative questions: {get_speculation_stats()}")
+    if QUESTION_BANK:
+        stats = get_question_bank_stats()
+        print(f"Question bank: {stats['hits']}/{stats['lookups']} served from the bank "
+              f"({stats['hit_ratio']:.0%}), {stats['banked']} banked")
+    print(f"\nLLM calls this session:\n{format_report(get_llm_telemetry_stats())}")
     print("Interview data saved successfully!")
 
 
@@ -0,0 +1,191 @@
+"""
+Bulk resume screening: extract name and highlights for every resume in a
+directory against one job description, writing one JSON line per resume.
+
+Text extraction runs in a process pool and the LLM calls run with bounded
+async concurrency. Results are appended to the output file as they finish,
+and the SHA-256 of every successfully screened file is appended to a
+checkpoint, so an interrupted run picks up where it stopped. Failed files
+are not checkpointed and are retried on the next run.
+
+Usage:
+    python screen_resumes.py inputs/resumes inputs/job_description.txt
+    python screen_resumes.py inputs/resumes inputs/job_description.txt \
+        --output outputs/screening.jsonl --concurrency 8 --workers 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from dotenv import load_dotenv
+
+from utils.load_content import PDF_WORKERS, extract_pdf_text, load_content
+from utils.rate_limiter import PRIORITY_BATCH
+from utils.resume_cache import extract_resume_info_cached_async, resume_fingerprint
+from utils.telemetry import format_report, get_llm_telemetry_stats
+
+load_dotenv()
+
+SCREEN_CONCURRENCY = int(os.environ.get("SCREEN_CONCURRENCY", 8))
+RESUME_EXTENSIONS = (".pdf", ".txt")
+
+
+def find_resumes(directory):
+    """Resume files under ``directory``, recursively, in a stable order."""
+    paths = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith(RESUME_EXTENSIONS):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def load_checkpoint(path):
+    """Fingerprints of files already screened successfully."""
+    if not os.path.exists(path):
+        return set()
+    with open(path, "r") as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def extract_text(path):
+    """Worker: text of one resume. Runs in a child process, so no nested pool."""
+    if path.lower().endswith(".pdf"):
+        return extract_pdf_text(path, workers=1)
+    return load_content(path)
+
+
+async def screen_resume(path, fingerprint, pool, semaphore):
+    """Screen one file and return its result record."""
+    record = {"file": path, "sha256": fingerprint, "status": "ok", "error": None}
+    start = time.perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
+        text = await loop.run_in_executor(pool, extract_text, path)
+        if not text or not text.strip():
+            raise ValueError("no text extracted")
+        async with semaphore:
+            # Batch priority: a live interview sharing the quota goes first.
+            name, resume_highlights = await extract_resume_info_cached_async(
+                fingerprint, text, priority=PRIORITY_BATCH
+            )
+        if not resume_highlights:
+            raise ValueError("LLM extraction fell back")
+        record["name"] = name
+        record["resume_highlights"] = resume_highlights
+    except Exception as e:
+        record["status"] = "failed"
+        record["error"] = str(e) or type(e).__name__
+    record["elapsed_s"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+async def screen_directory(
+    resume_dir,
+    job_description_path,
+    output_path,
+    checkpoint_path,
+    concurrency=SCREEN_CONCURRENCY,
+    workers=PDF_WORKERS,
+):
+    """Screen every resume in ``resume_dir`` and return run statistics."""
+    job_description = load_content(job_description_path)
+    if not job_description:
+        raise ValueError(f"Could not load job description from {job_description_path}")
+    job_fingerprint = resume_fingerprint(job_description.encode("utf-8"))
+
+    done = load_checkpoint(checkpoint_path)
+    pending, skipped = [], 0
+    for path in find_resumes(resume_dir):
+        with open(path, "rb") as f:
+            fingerprint = resume_fingerprint(f.read())
+        if fingerprint in done:
+            skipped += 1
+        else:
+            pending.append((path, fingerprint))
+
+    for path in (output_path, checkpoint_path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    stats = {"total": len(pending) + skipped, "skipped": skipped, "ok": 0, "failed": 0}
+    errors = Counter()
+    semaphore = asyncio.Semaphore(concurrency)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool, \
+            open(output_path, "a") as output, open(checkpoint_path, "a") as checkpoint:
+        tasks = [
+            asyncio.create_task(screen_resume(path, fingerprint, pool, semaphore))
+            for path, fingerprint in pending
+        ]
+        for finished in asyncio.as_completed(tasks):
+            record = await finished
+            record["job_description"] = job_description_path
+            record["job_description_sha256"] = job_fingerprint
+            record["screened_at"] = datetime.now().isoformat() + "Z"
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+            if record["status"] == "ok":
+                # Checkpoint only after the result line is on disk.
+                checkpoint.write(record["sha256"] + "\n")
+                checkpoint.flush()
+                stats["ok"] += 1
+            else:
+                stats["failed"] += 1
+                errors[record["error"]] += 1
+                print(f"⚠️ {record['file']}: {record['error']}")
+            processed = stats["ok"] + stats["failed"]
+            if processed % 25 == 0:
+                print(f"  {processed}/{len(pending)} screened")
+
+    stats["elapsed_s"] = round(time.perf_counter() - start, 2)
+    processed = stats["ok"] + stats["failed"]
+    stats["resumes_per_min"] = (
+        round(processed / stats["elapsed_s"] * 60, 1) if stats["elapsed_s"] else 0.0
+    )
+    stats["failure_rate"] = round(stats["failed"] / processed, 4) if processed else 0.0
+    stats["errors"] = dict(errors.most_common())
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("resume_dir")
+    parser.add_argument("job_description")
+    parser.add_argument("--output", default="outputs/screening.jsonl")
+    parser.add_argument("--checkpoint", help="defaults to <output>.done")
+    parser.add_argument("--concurrency", type=int, default=SCREEN_CONCURRENCY)
+    parser.add_argument("--workers", type=int, default=PDF_WORKERS)
+    args = parser.parse_args(argv)
+
+    stats = asyncio.run(
+        screen_directory(
+            args.resume_dir,
+            args.job_description,
+            args.output,
+            args.checkpoint or args.output + ".done",
+            concurrency=args.concurrency,
+            workers=args.workers,
+        )
+    )
+
+    print("\n=== Screening Summary ===")
+    print(f"Resumes found: {stats['total']} ({stats['skipped']} already screened)")
+    print(f"Screened: {stats['ok']} ok, {stats['failed']} failed "
+          f"({stats['failure_rate']:.1%}) in {stats['elapsed_s']:.1f}s")
+    print(f"Throughput: {stats['resumes_per_min']:.1f} resumes/min")
+    for error, count in stats["errors"].items():
+        print(f"  {count:>4}  {error}")
+    print(f"\nLLM calls this run:\n{format_report(get_llm_telemetry_stats())}")
+    print(f"Results appended to {args.output}")
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,6 +1,7 @@
 from .analyze_candidate import (
     analyze_candidate_response_and_generate_new_question,
     get_feedback_of_candidate_response,
+    stream_next_question,
 )
 from .load_content import load_content, load_content_streamlit
 from .record_utils import (
@@ -9,15 +10,23 @@ from .record_utils import (
     reduce_noise,
 )
 from .save_interview_data import save_interview_data
-from .text_to_speech import speak_text
-from .transcript_audio import transcribe_with_speechmatics
+from .text_to_speech import speak_text, speak_text_stream
+from .transcript_audio import transcribe_with_speechmatics, TranscriptionResult
 from .basic_details import (
     get_ai_greeting_message,
     extract_resume_info_using_llm,
+    extract_resume_info_using_llm_async,
     get_final_thanks_message,
 )
 from .evaluation import get_overall_evaluation_score
-from .prompts import basic_details, next_question_generation, feedback_generation
+from .prompts import (
+    basic_details,
+    next_question_generation,
+    feedback_generation,
+    response_analysis,
+    session_context,
+    build_session_messages,
+)
 
 __all__ = [
     "analyze_candidate_response_and_generate_new_question",
@@ -27,14 +36,21 @@ __all__ = [
     "reduce_noise",
     "save_interview_data",
     "speak_text",
+    "speak_text_stream",
+    "stream_next_question",
     "transcribe_with_speechmatics",
+    "TranscriptionResult",
     "get_ai_greeting_message",
     "extract_resume_info_using_llm",
+    "extract_resume_info_using_llm_async",
     "get_feedback_of_candidate_response",
     "get_overall_evaluation_score",
     "basic_details",
     "next_question_generation",
     "feedback_generation",
+    "response_analysis",
+    "session_context",
+    "build_session_messages",
     "load_content_streamlit",
     "get_final_thanks_message",
 ]
\ No newline at end of file
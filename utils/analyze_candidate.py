@@ -1,15 +1,42 @@
 import asyncio
-import json
-import re
-from typing import Dict, Any, Tuple
-from concurrent.futures import ThreadPoolExecutor
-from functools import lru_cache
-
-from utils.llm_call import get_response_from_llm
-from utils.prompts import next_question_generation, feedback_generation
-
-# Thread pool for CPU-bound tasks
-executor = ThreadPoolExecutor(max_workers=4)
+import os
+from typing import AsyncIterator, Dict, Any, List, Optional, Sequence, Tuple
+
+from utils.llm_call import (
+    get_response_from_llm_async,
+    parse_json_response,
+    stream_response_from_llm_async,
+)
+from utils.rate_limiter import PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
+from utils.resilience import BackendError
+from utils.hedging import LLM_HEDGING_ENABLED, LLM_HEDGE_MODEL, hedged_call
+from utils.streaming import JsonStringFieldStreamer, SentenceSplitter
+from utils.telemetry import start_llm_call, record_llm_call
+from utils.question_bank import QUESTION_BANK, question_bank
+from utils.prompts import (
+    next_question_generation,
+    feedback_generation,
+    response_analysis,
+    batch_feedback_generation,
+    build_session_messages,
+    format_answers_for_batch,
+)
+
+# "split": feedback and next question as two concurrent prompts (default).
+# "combined": one prompt returning both, so shared context is sent once.
+ANALYSIS_MODE = os.environ.get("ANALYSIS_MODE", "split").lower()
+
+# "inline": score each answer during its turn (default).
+# "batch" / "fanout": deferred scoring - live turns only generate the next
+# question, and all answers are scored when the interview ends, either in
+# batched calls or one call per answer with bounded concurrency.
+SCORING_MODE = os.environ.get("SCORING_MODE", "inline").lower()
+DEFERRED_SCORING = SCORING_MODE in ("batch", "fanout")
+SCORING_BATCH_SIZE = int(os.environ.get("SCORING_BATCH_SIZE", 8))
+SCORING_FANOUT_CONCURRENCY = int(os.environ.get("SCORING_FANOUT_CONCURRENCY", 3))
+
+# Extra time the hard wait_for guard allows beyond a turn's latency budget.
+_TIMEOUT_GRACE_SECONDS = 1.0
 
 
 class InterviewAnalysisError(Exception):
@@ -17,141 +44,269 @@ class InterviewAnalysisError(Exception):
     pass
 
 
-@lru_cache(maxsize=128)
-def _cache_key(prompt: str) -> str:
-    """Generate cache key for prompt (if you want to implement caching)"""
-    return str(hash(prompt))
+async def _make_llm_call_async(
+    prompt,
+    prompt_type: str = "other",
+    priority: int = PRIORITY_INTERACTIVE,
+    budget: Optional[float] = None,
+) -> Dict[str, Any]:
+    """
+    Make LLM call on the native async client.
+    Always returns a dict (may contain fallback). If the backend failed after
+    retries, the dict holds a structured "error" entry instead of content.
+
+    Interactive calls are hedged when LLM_HEDGING_ENABLED is set: a slow
+    request gets a duplicate (optionally on LLM_HEDGE_MODEL) and the first
+    parseable JSON wins. Each request is recorded in ``utils.telemetry``
+    under ``prompt_type``, together with its parse outcome.
+    """
+    async def fetch(model=None, hedge=False):
+        record = start_llm_call(prompt_type, hedge=hedge)
+        try:
+            raw_response = await get_response_from_llm_async(
+                prompt, priority=priority, budget=budget, model=model, record=record
+            )
+            return parse_json_response(raw_response, record)
+        finally:
+            record_llm_call(record)
+
+    try:
+        if LLM_HEDGING_ENABLED and priority == PRIORITY_INTERACTIVE:
+            parsed = await hedged_call(
+                fetch,
+                lambda: fetch(LLM_HEDGE_MODEL or None, hedge=True),
+                lambda result: result is not None,
+            )
+        else:
+            parsed = await fetch()
+
+        if parsed is None:
+            print(f"⚠️ No JSON object in LLM response ({prompt_type}).")
+            parsed = {}
+        return parsed
+
+    except BackendError as e:
+        print(f"⚠️ LLM backend failed after {e.attempts} attempt(s): {e}")
+        return {"error": e.to_dict()}
+    except Exception as e:
+        print(f"⚠️ LLM call failed: {e}")
+        return {}
 
 
-def parse_json_response(response: str) -> dict:
+def _next_question_from_response(response: Dict[str, Any]) -> str:
     """
-    Try to parse JSON safely from LLM response.
-    Extracts the first valid JSON object even if extra text exists.
+    Pull 'next_question' out of a parsed LLM response, with fallbacks.
     """
-    if not response or not response.strip():
-        return None
-    try:
-        return json.loads(response)
-    except json.JSONDecodeError:
-        # Find first valid JSON object inside messy text
-        matches = re.findall(r"\{[\s\S]*?\}", response)
-        for match in matches:
-            try:
-                return json.loads(match)
-            except json.JSONDecodeError:
-                continue
-        return None
+    # Fallback if invalid
+    if not response or not isinstance(response, dict):
+        print("⚠️ Invalid response from LLM, using fallback question.")
+        return "Can you tell me more about your problem-solving approach?"
+
+    next_q = str(response.get("next_question", "")).strip()
+    if not next_q:
+        print("⚠️ Missing 'next_question' in LLM response, using fallback.")
+        return "What motivates you to take on challenging projects?"
 
+    return next_q
 
-async def _make_llm_call_async(prompt: str) -> Dict[str, Any]:
+
+def _feedback_from_response(response: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Make LLM call asynchronously by running in thread pool.
-    Always returns a dict (may contain fallback).
+    Pull 'feedback' and 'score' out of a parsed LLM response, with fallbacks.
     """
-    try:
-        loop = asyncio.get_event_loop()
-        raw_response = await loop.run_in_executor(executor, get_response_from_llm, prompt)
+    if isinstance(response, dict) and "error" in response:
+        return {
+            "feedback": "Feedback unavailable: the evaluation service did not respond in time.",
+            "score": 0.0,
+            "error": response["error"],
+        }
 
-        # Debug log
-        print("\n=== RAW LLM RESPONSE START ===")
-        print(raw_response)
-        print("=== RAW LLM RESPONSE END ===\n")
+    # Try to parse JSON
+    if not response or not isinstance(response, dict):
+        print("⚠️ Could not parse feedback JSON, trying fallback extraction.")
+        # Fallback: at least give default
+        return {
+            "feedback": "Response was unclear. Try giving more structured, specific examples.",
+            "score": 0.0,
+        }
 
-        parsed = parse_json_response(raw_response)
+    # Extract feedback + score safely
+    feedback = str(response.get("feedback", "")).strip()
+    if not feedback:
+        feedback = "Response was unclear. Try giving more structured, specific examples."
 
-        if parsed is None:
-            parsed = {}
+    score_raw = response.get("score", None)
+    try:
+        score = float(score_raw)
+        if not (0 <= score <= 10):
+            print(f"⚠️ Score {score} out of range, resetting to 0.")
+            score = 0.0
+    except (ValueError, TypeError):
+        print(f"⚠️ Invalid score format: {score_raw}, defaulting to 0.")
+        score = 0.0
 
-        print("PARSED RESPONSE:", parsed)
-        return parsed
+    return {"feedback": feedback, "score": score}
 
-    except Exception as e:
-        print(f"⚠️ LLM call failed: {e}")
-        return {}
+
+def _banked_question(
+    previous_question: str,
+    context: str,
+    job_description: str,
+    asked_questions: Sequence[str],
+) -> Optional[str]:
+    """Confident question bank match for this turn that was not asked yet, if any."""
+    if not QUESTION_BANK:
+        return None
+    return question_bank.lookup(
+        job_description, context, exclude=(previous_question, *asked_questions)
+    )
 
 
 async def get_next_question(
     previous_question: str,
     candidate_response: str,
     resume_highlights: str,
-    job_description: str
+    job_description: str,
+    budget: Optional[float] = None,
+    asked_questions: Sequence[str] = ()
 ) -> str:
     """
     Generate next interview question based on previous interaction.
+    ``asked_questions`` (everything asked so far this session) are never
+    served again from the question bank.
     Always returns a safe question string.
     """
+    context = f"{previous_question}\n{candidate_response}"
+    banked = _banked_question(previous_question, context, job_description, asked_questions)
+    if banked:
+        return banked
+
     try:
-        final_prompt = next_question_generation.format(
-            previous_question=previous_question,
-            candidate_response=candidate_response,
-            resume_highlights=resume_highlights,
-            job_description=job_description,
+        final_prompt = build_session_messages(
+            next_question_generation.format(
+                previous_question=previous_question,
+                candidate_response=candidate_response,
+            ),
+            job_description,
+            resume_highlights,
+            query=context,
+        )
+
+        response = await _make_llm_call_async(
+            final_prompt, prompt_type="next_question_generation", budget=budget
         )
+        next_question = _next_question_from_response(response)
+        if QUESTION_BANK and isinstance(response, dict) and response.get("next_question"):
+            question_bank.add(job_description, context, next_question)
+        return next_question
 
-        response = await _make_llm_call_async(final_prompt)
+    except Exception as e:
+        print(f"⚠️ Question generation failed: {e}")
+        return "Could you describe a challenging situation you faced at work and how you handled it?"
 
-        # Fallback if invalid
-        if not response or not isinstance(response, dict):
-            print("⚠️ Invalid response from LLM, using fallback question.")
-            return "Can you tell me more about your problem-solving approach?"
 
-        next_q = response.get("next_question", "").strip()
-        if not next_q:
-            print("⚠️ Missing 'next_question' in LLM response, using fallback.")
-            return "What motivates you to take on challenging projects?"
+async def stream_next_question(
+    previous_question: str,
+    candidate_response: str,
+    resume_highlights: str,
+    job_description: str,
+    asked_questions: Sequence[str] = ()
+) -> AsyncIterator[str]:
+    """
+    Stream the next interview question sentence by sentence.
+
+    The 'next_question' value is decoded from the partial JSON as tokens
+    arrive, so the first sentence can be handed to TTS before the completion
+    finishes. If nothing could be streamed (e.g. a 429 or an open breaker
+    before the first token), the question comes from ``get_next_question``
+    with its retries and model fallbacks, split into sentences. A confident
+    question bank match (never one of ``asked_questions``) is yielded whole
+    without calling the LLM.
+    """
+    context = f"{previous_question}\n{candidate_response}"
+    banked = _banked_question(previous_question, context, job_description, asked_questions)
+    if banked:
+        yield banked
+        return
+
+    final_prompt = build_session_messages(
+        next_question_generation.format(
+            previous_question=previous_question,
+            candidate_response=candidate_response,
+        ),
+        job_description,
+        resume_highlights,
+        query=context,
+    )
 
-        return next_q
+    field = JsonStringFieldStreamer("next_question")
+    splitter = SentenceSplitter()
+    raw_parts = []
+    sentences = []
+    streamed_any = False
+    completed = False
 
+    try:
+        async for delta in stream_response_from_llm_async(
+            final_prompt, prompt_type="next_question_generation"
+        ):
+            raw_parts.append(delta)
+            for sentence in splitter.feed(field.feed(delta)):
+                streamed_any = True
+                sentences.append(sentence)
+                yield sentence
+        completed = True
     except Exception as e:
-        print(f"⚠️ Question generation failed: {e}")
-        return "Could you describe a challenging situation you faced at work and how you handled it?"
+        print(f"⚠️ Streaming question generation failed: {e}")
+
+    for sentence in splitter.flush():
+        streamed_any = True
+        sentences.append(sentence)
+        yield sentence
+
+    if QUESTION_BANK and completed and field.done and sentences:
+        question_bank.add(job_description, context, " ".join(sentences))
+
+    if not streamed_any:
+        response = parse_json_response("".join(raw_parts)) if completed else None
+        if isinstance(response, dict) and str(response.get("next_question", "")).strip():
+            next_question = _next_question_from_response(response)
+        else:
+            next_question = await get_next_question(
+                previous_question, candidate_response, resume_highlights, job_description,
+                asked_questions=asked_questions,
+            )
+        splitter = SentenceSplitter()
+        for sentence in [*splitter.feed(next_question), *splitter.flush()]:
+            yield sentence
 
 
 async def get_feedback_of_candidate_response(
     question: str,
     candidate_response: str,
     job_description: str,
-    resume_highlights: str
+    resume_highlights: str,
+    budget: Optional[float] = None
 ) -> Dict[str, Any]:
     """
     Generate feedback for candidate's response.
     Always returns a feedback dict with feedback + score (0-10).
     """
-    final_prompt = feedback_generation.format(
-        question=question,
-        candidate_response=candidate_response,
-        job_description=job_description,
-        resume_highlights=resume_highlights,
+    final_prompt = build_session_messages(
+        feedback_generation.format(question=question, candidate_response=candidate_response),
+        job_description,
+        resume_highlights,
+        query=f"{question}\n{candidate_response}",
     )
 
     try:
-        response = await _make_llm_call_async(final_prompt)
-
-        # Try to parse JSON
-        if not response or not isinstance(response, dict):
-            print("⚠️ Could not parse feedback JSON, trying fallback extraction.")
-            # Fallback: at least give default
-            return {
-                "feedback": "Response was unclear. Try giving more structured, specific examples.",
-                "score": 0.0,
-            }
-
-        # Extract feedback + score safely
-        feedback = response.get("feedback", "").strip()
-        if not feedback:
-            feedback = "Response was unclear. Try giving more structured, specific examples."
-
-        score_raw = response.get("score", None)
-        try:
-            score = float(score_raw)
-            if not (0 <= score <= 10):
-                print(f"⚠️ Score {score} out of range, resetting to 0.")
-                score = 0.0
-        except (ValueError, TypeError):
-            print(f"⚠️ Invalid score format: {score_raw}, defaulting to 0.")
-            score = 0.0
-
-        return {"feedback": feedback, "score": score}
+        response = await _make_llm_call_async(
+            final_prompt,
+            prompt_type="feedback_generation",
+            priority=PRIORITY_BACKGROUND,
+            budget=budget,
+        )
+        return _feedback_from_response(response)
 
     except Exception as e:
         print(f"⚠️ Feedback generation failed: {e}")
@@ -160,29 +315,97 @@ async def get_feedback_of_candidate_response(
             "score": 0.0,
         }
 
+
+async def get_feedback_and_next_question(
+    question: str,
+    candidate_response: str,
+    job_description: str,
+    resume_highlights: str,
+    budget: Optional[float] = None,
+    asked_questions: Sequence[str] = ()
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Generate feedback and the next question with a single LLM round-trip.
+    The question bank is used as in ``get_next_question``: on a confident
+    match only the feedback prompt is sent, and generated questions are banked.
+    Always returns a safe (next_question, feedback).
+    """
+    context = f"{question}\n{candidate_response}"
+    banked = _banked_question(question, context, job_description, asked_questions)
+    if banked:
+        feedback = await get_feedback_of_candidate_response(
+            question, candidate_response, job_description, resume_highlights, budget=budget
+        )
+        return banked, feedback
+
+    final_prompt = build_session_messages(
+        response_analysis.format(question=question, candidate_response=candidate_response),
+        job_description,
+        resume_highlights,
+        query=context,
+    )
+
+    try:
+        response = await _make_llm_call_async(
+            final_prompt, prompt_type="response_analysis", budget=budget
+        )
+        next_question = _next_question_from_response(response)
+        if QUESTION_BANK and isinstance(response, dict) and response.get("next_question"):
+            question_bank.add(job_description, context, next_question)
+        return next_question, _feedback_from_response(response)
+
+    except Exception as e:
+        print(f"⚠️ Combined analysis failed: {e}")
+        return (
+            "Could you describe a challenging situation you faced at work and how you handled it?",
+            {"feedback": f"Error analyzing response: {str(e)}", "score": 0.0},
+        )
+
+
 async def analyze_candidate_response_and_generate_new_question(
     question: str,
     candidate_response: str,
     job_description: str,
     resume_highlights: str,
-    timeout: float = 30.0
+    timeout: float = 30.0,
+    mode: Optional[str] = None,
+    asked_questions: Sequence[str] = ()
 ) -> Tuple[str, Dict[str, Any]]:
     """
-    Analyze candidate response and generate next question concurrently.
+    Analyze candidate response and generate next question.
+
+    ``mode`` selects "split" (two concurrent prompts) or "combined" (one prompt
+    returning both); it defaults to the ANALYSIS_MODE setting.
+    ``timeout`` is the latency budget for the turn: LLM retries are planned
+    inside it, and the wait_for guard only fires if that somehow overruns.
+    ``asked_questions`` are never served from the question bank.
     Always returns a safe (next_question, feedback).
     """
+    mode = mode or ANALYSIS_MODE
+    guard = timeout + _TIMEOUT_GRACE_SECONDS
     try:
+        if mode == "combined":
+            return await asyncio.wait_for(
+                get_feedback_and_next_question(
+                    question, candidate_response, job_description, resume_highlights,
+                    budget=timeout, asked_questions=asked_questions,
+                ),
+                timeout=guard
+            )
+
         feedback_task = get_feedback_of_candidate_response(
-            question, candidate_response, job_description, resume_highlights
+            question, candidate_response, job_description, resume_highlights,
+            budget=timeout,
         )
 
         next_question_task = get_next_question(
-            question, candidate_response, resume_highlights, job_description
+            question, candidate_response, resume_highlights, job_description,
+            budget=timeout, asked_questions=asked_questions,
         )
 
         feedback, next_question = await asyncio.wait_for(
             asyncio.gather(feedback_task, next_question_task),
-            timeout=timeout
+            timeout=guard
         )
         return next_question, feedback
 
@@ -198,3 +421,129 @@ async def analyze_candidate_response_and_generate_new_question(
             "What motivates you to pursue this role?",
             {"feedback": f"Error analyzing response: {str(e)}", "score": 0.0}
         )
+
+
+def pending_feedback() -> Dict[str, Any]:
+    """Placeholder feedback for an answer that will be scored at interview end."""
+    return {"feedback": None, "score": None}
+
+
+def is_unscored(conversation: Dict[str, Any]) -> bool:
+    """True for a conversation whose answer still awaits deferred scoring."""
+    return conversation.get("Evaluation") is None
+
+
+def _valid_batch_items(response: Dict[str, Any], count: int) -> Dict[int, Dict[str, Any]]:
+    """
+    Schema-check a batch evaluation: keep items with an in-range index, non-empty
+    feedback and a 0-10 score, keyed by 1-based answer number.
+    """
+    items = response.get("evaluations") if isinstance(response, dict) else None
+    valid = {}
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        try:
+            index = int(item.get("index"))
+            score = float(item.get("score"))
+        except (TypeError, ValueError):
+            continue
+        feedback = str(item.get("feedback", "")).strip()
+        if 1 <= index <= count and index not in valid and feedback and 0 <= score <= 10:
+            valid[index] = {"feedback": feedback, "score": score}
+    return valid
+
+
+async def _score_fanout(
+    conversations: List[Dict[str, Any]],
+    job_description: str,
+    resume_highlights: str,
+    concurrency: int,
+    budget: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """One feedback call per answer, at most ``concurrency`` in flight."""
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+
+    async def score(conv):
+        async with semaphore:
+            return await get_feedback_of_candidate_response(
+                conv["Question"], conv["Candidate Answer"], job_description, resume_highlights,
+                budget=budget,
+            )
+
+    return await asyncio.gather(*(score(conv) for conv in conversations))
+
+
+async def _score_batch(
+    conversations: List[Dict[str, Any]],
+    job_description: str,
+    resume_highlights: str,
+    budget: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Score a group of answers in a single call; answers missing from (or
+    invalid in) the batch response are re-scored individually.
+    """
+    final_prompt = build_session_messages(
+        batch_feedback_generation.format(
+            count=len(conversations), answers=format_answers_for_batch(conversations)
+        ),
+        job_description,
+        resume_highlights,
+    )
+    response = await _make_llm_call_async(
+        final_prompt, prompt_type="batch_feedback_generation", budget=budget
+    )
+    valid = _valid_batch_items(response, len(conversations))
+
+    missing = [i for i in range(1, len(conversations) + 1) if i not in valid]
+    if missing:
+        print(f"⚠️ Batch scoring returned {len(valid)}/{len(conversations)} valid items, "
+              f"re-scoring {len(missing)} individually.")
+        rescored = await _score_fanout(
+            [conversations[i - 1] for i in missing],
+            job_description,
+            resume_highlights,
+            SCORING_FANOUT_CONCURRENCY,
+            budget=budget,
+        )
+        valid.update(zip(missing, rescored))
+    return [valid[i] for i in range(1, len(conversations) + 1)]
+
+
+async def score_conversations(
+    conversations: List[Dict[str, Any]],
+    job_description: str,
+    resume_highlights: str,
+    mode: Optional[str] = None,
+    budget: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Fill in "Evaluation" and "Feedback" for every unscored conversation, in place.
+
+    ``mode`` "batch" sends up to SCORING_BATCH_SIZE answers per call (batches run
+    concurrently); "fanout" makes one call per answer with at most
+    SCORING_FANOUT_CONCURRENCY in flight. Defaults to SCORING_MODE, falling back
+    to "batch" when that is "inline". Returns ``conversations``.
+    """
+    mode = mode or SCORING_MODE
+    pending = [conv for conv in conversations if is_unscored(conv)]
+    if not pending:
+        return conversations
+
+    if mode == "fanout":
+        results = await _score_fanout(
+            pending, job_description, resume_highlights, SCORING_FANOUT_CONCURRENCY, budget
+        )
+    else:
+        size = max(SCORING_BATCH_SIZE, 1)
+        groups = [pending[i: i + size] for i in range(0, len(pending), size)]
+        batches = await asyncio.gather(
+            *(_score_batch(group, job_description, resume_highlights, budget) for group in groups)
+        )
+        results = [feedback for batch in batches for feedback in batch]
+
+    for conv, feedback in zip(pending, results):
+        conv["Evaluation"] = feedback["score"]
+        conv["Feedback"] = feedback["feedback"]
+    return conversations
@@ -0,0 +1,131 @@
+"""
+Preallocated int16 buffer for microphone recordings.
+
+The sounddevice callback writes frames in place (no per-callback list
+append, no final concatenate). The buffer is allocated once for
+``max_seconds`` with ``np.zeros`` (calloc), so the OS only commits pages as
+they are written: memory grows with the recording, but nothing is ever
+reallocated or copied on the audio thread. Past ``max_seconds`` new frames
+are dropped (never the start of the answer) and ``write`` returns ``False``
+so the recorder can stop. Consumers read zero-copy views: ``view()`` for the
+whole recording, ``read_from()`` for incremental streaming.
+"""
+import asyncio
+import os
+import threading
+
+import numpy as np
+
+RECORDING_MAX_SECONDS = float(os.environ.get("RECORDING_MAX_SECONDS", 600))
+
+
+class AudioRingBuffer:
+    """
+    Bounded int16 buffer of shape ``(frames, channels)``.
+
+    ``write`` is safe to call from the audio thread while other threads read.
+    Frame positions are absolute (counted since the start of the recording),
+    so a streaming consumer resumes from its own position.
+    """
+
+    def __init__(self, sample_rate=16000, channels=1, max_seconds=RECORDING_MAX_SECONDS):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.capacity = max(1, int(max_seconds * sample_rate))
+        self._data = np.zeros((self.capacity, channels), dtype=np.int16)
+        self._lock = threading.Lock()
+        self.total_frames = 0  # frames written
+        self.dropped_frames = 0  # frames discarded because the buffer was full
+
+    def __len__(self):
+        return self.total_frames
+
+    @property
+    def truncated(self):
+        """Whether the recording hit ``max_seconds`` and its tail was dropped."""
+        return self.dropped_frames > 0
+
+    @property
+    def duration(self):
+        return len(self) / self.sample_rate
+
+    def write(self, frames):
+        """
+        Copy ``frames`` (``(n, channels)`` int16, e.g. ``indata``) into the
+        buffer. Returns ``False`` if the buffer is full and some or all of
+        ``frames`` were dropped; the recorder should stop then.
+        """
+        n = len(frames)
+        with self._lock:
+            start = self.total_frames
+            count = min(n, self.capacity - start)
+            if count > 0:
+                self._data[start:start + count] = frames[:count]
+                self.total_frames += count
+            if count < n:
+                self.dropped_frames += n - count
+                return False
+        return True
+
+    def view(self):
+        """The buffered audio as one zero-copy ``(frames, channels)`` array."""
+        with self._lock:
+            return self._data[:self.total_frames]
+
+    def read_from(self, position, max_frames=None):
+        """
+        Contiguous view of frames from absolute ``position`` onwards (at most
+        ``max_frames``), and the position after it. Returns an empty view when
+        nothing new is available.
+        """
+        with self._lock:
+            end = self.total_frames
+            if max_frames is not None:
+                end = min(end, position + max_frames)
+            data = self._data[position:max(position, end)]
+        return data, position + len(data)
+
+    def peak(self):
+        """Largest absolute sample value, without allocating an ``abs`` copy."""
+        data = self.view()
+        if not len(data):
+            return 0
+        return max(int(data.max()), -int(data.min()))
+
+
+class AudioBufferStream:
+    """
+    Async file-like reader over an ``AudioRingBuffer`` for a real-time
+    transcription session. ``read`` returns zero-copy byte views of frames
+    written since the last read; the audio thread calls ``notify`` after each
+    write and ``close`` ends the stream once everything has been read.
+    """
+
+    def __init__(self, buffer, loop=None):
+        self.buffer = buffer
+        self.position = buffer.total_frames
+        self._loop = loop or asyncio.get_running_loop()
+        self._ready = asyncio.Event()
+        self._closed = False
+
+    def notify(self):
+        self._loop.call_soon_threadsafe(self._ready.set)
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._close)
+
+    def _close(self):
+        self._closed = True
+        self._ready.set()
+
+    async def read(self, size=-1):
+        bytes_per_frame = 2 * self.buffer.channels
+        max_frames = None if size is None or size < 0 else max(1, size // bytes_per_frame)
+        while True:
+            self._ready.clear()
+            data, self.position = self.buffer.read_from(self.position, max_frames)
+            if len(data):
+                return memoryview(data).cast("B")
+            if self._closed:
+                return b""
+            await self._ready.wait()
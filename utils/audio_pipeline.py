@@ -0,0 +1,169 @@
+"""
+Single-pass, in-memory processing of a recorded answer.
+
+``transcribe_answer`` takes a NumPy buffer (e.g. the recorder's ring buffer
+view) or encoded WAV bytes (e.g. a Streamlit recording) and runs
+validate → trim → denoise → validate → encode → transcribe without touching
+disk. The audio is decoded at most once and streamed to the ASR backend from
+memory; the WAV kept under ``audio/`` is written by a background thread.
+"""
+import asyncio
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import noisereduce as nr
+import numpy as np
+from scipy.io.wavfile import write
+
+from utils.denoise import DENOISE_STREAMING, denoise_with_profile
+from utils.transcript_audio import (
+    ASR_STREAMING,
+    TranscriptionResult,
+    decode_wav_bytes,
+    to_pcm16,
+    transcribe_audio_bytes,
+    transcribe_pcm_async,
+)
+from utils.vad import VAD, contains_speech, trim_silence
+
+# Peak amplitude below which a recording is treated as silence.
+SILENCE_PEAK = 100
+
+# One writer keeps saves in order and off the interview's critical path.
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio-writer")
+_pending_lock = threading.Lock()
+_pending = set()
+
+
+def validate_audio_data(data, sample_rate):
+    """True if ``data`` has audible content (and, with VAD, actual speech)."""
+    if data is None or len(data) == 0:
+        return False
+    if max(int(data.max()), -int(data.min())) < SILENCE_PEAK:
+        return False
+    if VAD and not contains_speech(data, sample_rate):
+        return False
+    return True
+
+
+def denoise_audio(data, sample_rate, noise_key=None):
+    """
+    Noise-reduced copy of mono int16 ``data``. With DENOISE_STREAMING this is
+    the stationary gate with ``noise_key``'s cached noise profile.
+    """
+    if len(data) == 0:
+        return data
+    if DENOISE_STREAMING:
+        return denoise_with_profile(data.reshape(-1), sample_rate, noise_key)
+    return nr.reduce_noise(y=data.reshape(-1), sr=sample_rate).astype(np.int16)
+
+
+def encode_wav(data, sample_rate):
+    out = io.BytesIO()
+    write(out, sample_rate, data)
+    return out.getvalue()
+
+
+def _save(filename, audio, sample_rate):
+    if not isinstance(audio, (bytes, bytearray)):
+        audio = encode_wav(audio, sample_rate)
+    directory = os.path.dirname(filename)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(filename, "wb") as f:
+        f.write(audio)
+    return filename
+
+
+def save_audio_async(filename, audio, sample_rate=None):
+    """
+    Write ``audio`` (WAV bytes, or int16 samples plus ``sample_rate``) to
+    ``filename`` on the background writer. Returns the future.
+    """
+    future = _writer.submit(_save, filename, audio, sample_rate)
+    with _pending_lock:
+        _pending.add(future)
+
+    def done(f):
+        with _pending_lock:
+            _pending.discard(f)
+        if f.exception() is not None:
+            print(f"⚠️ Could not save recording to {filename}: {f.exception()}")
+
+    future.add_done_callback(done)
+    return future
+
+
+def wait_for_saves(timeout=None):
+    """Block until every queued recording has been written."""
+    with _pending_lock:
+        pending = list(_pending)
+    for future in pending:
+        try:
+            future.result(timeout)
+        except Exception:
+            pass  # Reported by the done callback.
+
+
+async def transcribe_answer_async(
+    audio,
+    sample_rate=None,
+    filename=None,
+    transcription_language="en",
+    denoise=True,
+    streaming=None,
+    noise_key=None,
+):
+    """
+    Validate, trim, denoise, re-validate and transcribe one answer in memory.
+
+    ``audio`` is WAV bytes, or int16 samples with ``sample_rate``. With
+    ``filename`` the processed audio is also saved in the background.
+    ``noise_key`` (e.g. the candidate) selects the cached noise profile.
+    ``streaming`` (default ``ASR_STREAMING``) sends PCM over a real-time
+    session, falling back to a batch transcription if it fails. Audio that
+    fails validation is never sent; the result's ``rejected`` says why.
+    """
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        try:
+            sample_rate, data = decode_wav_bytes(audio)
+        except Exception as e:
+            return TranscriptionResult(rejected=f"Unreadable audio: {e}")
+    else:
+        data = to_pcm16(np.asarray(audio))
+    streaming = ASR_STREAMING if streaming is None else streaming
+
+    result = None
+    if not validate_audio_data(data, sample_rate):
+        result = TranscriptionResult(rejected="No valid audio recorded")
+    else:
+        if VAD:
+            data = trim_silence(data, sample_rate)
+        if denoise:
+            data = await asyncio.to_thread(denoise_audio, data, sample_rate, noise_key)
+            if not validate_audio_data(data, sample_rate):
+                result = TranscriptionResult(rejected="No valid audio after processing")
+
+    wav_bytes = encode_wav(data, sample_rate)
+    if filename:
+        save_audio_async(filename, wav_bytes)
+    if result is not None:
+        return result
+
+    if streaming:
+        result = await transcribe_pcm_async(data, sample_rate, transcription_language)
+        if result.error is None:
+            return result
+        print(f"⚠️ {result.message}; retrying as a batch transcription")
+    return await asyncio.to_thread(transcribe_audio_bytes, wav_bytes, transcription_language)
+
+
+def transcribe_answer(audio, sample_rate=None, filename=None, transcription_language="en",
+                      denoise=True, streaming=None, noise_key=None):
+    return asyncio.run(
+        transcribe_answer_async(
+            audio, sample_rate, filename, transcription_language, denoise, streaming, noise_key
+        )
+    )
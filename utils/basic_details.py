@@ -1,24 +1,45 @@
+import asyncio
 import random
-from utils.llm_call import get_response_from_llm, parse_json_response
+from utils.json_extract import extract_json_object
+from utils.llm_call import get_response_from_llm_async, parse_json_response
 from utils.prompts import basic_details
+from utils.rate_limiter import PRIORITY_INTERACTIVE
+from utils.telemetry import start_llm_call, record_llm_call
 
 
 def extract_resume_info_using_llm(resume_content):
+    """
+    Extract candidate's name and resume highlights using an LLM.
+    Synchronous entry point for callers without a running event loop.
+    """
+    return asyncio.run(extract_resume_info_using_llm_async(resume_content))
+
+
+def _has_resume_info(content):
+    """LLM cache validator: only completions with resume highlights are replayed."""
+    response = extract_json_object(content)
+    return isinstance(response, dict) and bool(response.get("resume_highlights"))
+
+
+async def extract_resume_info_using_llm_async(resume_content, priority=PRIORITY_INTERACTIVE):
     """
     Extract candidate's name and resume highlights using an LLM.
     This function is resilient to malformed or missing responses.
+    ``priority`` is the rate-limiter priority (bulk screening passes PRIORITY_BATCH).
     """
 
     # Build the LLM prompt
     final_prompt = basic_details.format(resume_content=resume_content)
 
-    # Call the LLM
-    raw_response = get_response_from_llm(final_prompt)
-    print("🔍 RAW LLM RESPONSE:", raw_response)  # Debugging
-
-    # Parse into JSON/dict
-    response = parse_json_response(raw_response)
-    print("🔍 PARSED RESPONSE:", response)  # Debugging
+    # Call the LLM and parse into JSON/dict (both recorded in telemetry)
+    record = start_llm_call("basic_details")
+    try:
+        raw_response = await get_response_from_llm_async(
+            final_prompt, priority=priority, record=record, cache_validator=_has_resume_info
+        )
+        response = parse_json_response(raw_response, record)
+    finally:
+        record_llm_call(record)
 
     # Handle invalid/missing responses
     if not response or not isinstance(response, dict):
@@ -0,0 +1,201 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def make_cache_key(*parts):
+    """
+    Build a stable, content-addressed key from JSON-serializable parts.
+    """
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TieredCache:
+    """
+    Two-tier key/value cache: an in-memory LRU in front of an on-disk SQLite table.
+
+    Values must be JSON-serializable. Entries expire after ``ttl`` seconds
+    (``None`` disables expiry) and each tier is bounded by entry count; the
+    disk tier can additionally be bounded by total payload size in bytes.
+    Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        name,
+        path=None,
+        max_memory_entries=256,
+        max_disk_entries=5000,
+        max_disk_bytes=None,
+        ttl=None,
+    ):
+        self.name = name
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+            "expired": 0,
+        }
+
+        if path:
+            try:
+                self._conn = self._open(path)
+            except sqlite3.Error as e:
+                print(f"⚠️ Could not open {name} cache at {path}: {e}. Using memory only.")
+                self._conn = None
+
+    def _open(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)"
+        )
+        return conn
+
+    def _is_expired(self, created_at, now):
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def get(self, key, default=None):
+        """Return the cached value for ``key``, or ``default`` on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if not self._is_expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+                self._stats["expired"] += 1
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    raw_value, created_at = row
+                    if self._is_expired(created_at, now):
+                        self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                        self._stats["expired"] += 1
+                    else:
+                        self._conn.execute(
+                            "UPDATE entries SET accessed_at = ? WHERE key = ?",
+                            (now, key),
+                        )
+                        value = json.loads(raw_value)
+                        self._remember(key, created_at, value)
+                        self._stats["disk_hits"] += 1
+                        return value
+
+            self._stats["misses"] += 1
+            return default
+
+    def set(self, key, value):
+        """Store ``value`` under ``key`` in both tiers."""
+        now = time.time()
+        raw_value = json.dumps(value)
+        with self._lock:
+            self._remember(key, now, value)
+            self._stats["writes"] += 1
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries "
+                    "(key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, raw_value, len(raw_value), now, now),
+                )
+                self._evict_disk(now)
+
+    def delete(self, key):
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM entries")
+
+    def _remember(self, key, created_at, value):
+        self._memory[key] = (created_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _evict_disk(self, now):
+        if self.ttl is not None:
+            cursor = self._conn.execute(
+                "DELETE FROM entries WHERE created_at < ?", (now - self.ttl,)
+            )
+            self._stats["expired"] += max(cursor.rowcount, 0)
+
+        if self.max_disk_entries is not None:
+            cursor = self._conn.execute(
+                "DELETE FROM entries WHERE key IN ("
+                "SELECT key FROM entries ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_disk_entries,),
+            )
+            self._stats["evictions"] += max(cursor.rowcount, 0)
+
+        if self.max_disk_bytes is not None:
+            total = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()[0]
+            while total > self.max_disk_bytes:
+                row = self._conn.execute(
+                    "SELECT key, size FROM entries ORDER BY accessed_at ASC LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    break
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (row[0],))
+                self._memory.pop(row[0], None)
+                total -= row[1]
+                self._stats["evictions"] += 1
+
+    def stats(self):
+        """Return hit/miss counters and current tier sizes."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["hits"] = stats["memory_hits"] + stats["disk_hits"]
+            lookups = stats["hits"] + stats["misses"]
+            stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+            stats["memory_entries"] = len(self._memory)
+            stats["disk_entries"] = (
+                self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+                if self._conn is not None
+                else 0
+            )
+        return stats
@@ -0,0 +1,82 @@
+import asyncio
+import heapq
+import itertools
+import threading
+
+
+class ConcurrencyLimiter:
+    """
+    Process-wide async semaphore.
+
+    Unlike ``asyncio.Semaphore`` it is not bound to a single event loop, so it
+    can be shared by every Streamlit session (each of which drives its own
+    loop via ``asyncio.run``) and by background threads. Waiters are served
+    by priority (lower first), then first-in, first-out.
+    """
+
+    def __init__(self, limit):
+        if limit < 1:
+            raise ValueError("limit must be >= 1")
+        self.limit = limit
+        self._active = 0
+        self._waiters = []  # heap of (priority, seq, loop, future)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    async def acquire(self, priority=0):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self._active < self.limit and not self._waiters:
+                self._active += 1
+                return
+            waiter = (priority, next(self._seq), loop, loop.create_future())
+            heapq.heappush(self._waiters, waiter)
+
+        try:
+            await waiter[3]
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove(waiter)
+                    heapq.heapify(self._waiters)
+                    handed_over = False
+                except ValueError:
+                    handed_over = True
+            if handed_over:
+                # The slot was passed to us just before cancellation; pass it on.
+                self.release()
+            raise
+
+    def release(self):
+        with self._lock:
+            if not self._waiters:
+                self._active -= 1
+                return
+            _, _, loop, future = heapq.heappop(self._waiters)
+
+        # The slot moves directly to the next waiter, so ``_active`` is unchanged.
+        try:
+            loop.call_soon_threadsafe(self._wake, future)
+        except RuntimeError:
+            # Waiter's loop is already closed; hand the slot to the next one.
+            self.release()
+
+    @staticmethod
+    def _wake(future):
+        if not future.done():
+            future.set_result(None)
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "active": self._active,
+                "waiting": len(self._waiters),
+            }
@@ -0,0 +1,302 @@
+"""
+Streaming stationary noise reduction with a cached per-candidate noise profile.
+
+``noisereduce.reduce_noise`` (non-stationary) runs over the whole answer once
+recording stops, so its cost lands on the turn's critical path and grows with
+the answer. Here the noise profile (per-frequency threshold, as in
+noisereduce's stationary mode) is estimated once from the non-speech frames
+at the start of a candidate's first answer (or from a calibration clip) and
+cached under the candidate's key. ``StreamingDenoiser`` then applies the
+spectral gate chunk by chunk while audio arrives, and ``BackgroundDenoiser``
+runs it on a worker thread next to the recorder, so only the last chunk is
+left to process when the candidate stops talking.
+"""
+import os
+import threading
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from dotenv import load_dotenv
+from scipy.ndimage import convolve1d
+
+from utils.audio_buffer import AudioRingBuffer
+from utils.cache import TieredCache
+from utils.vad import speech_mask
+
+load_dotenv()
+
+DENOISE_STREAMING = os.environ.get("DENOISE_STREAMING", "false").lower() in ("1", "true", "yes")
+# Audio collected before the first profile is estimated (when none is cached).
+DENOISE_CALIBRATION_SECONDS = float(os.environ.get("DENOISE_CALIBRATION_SECONDS", 1.0))
+DENOISE_PROFILE_TTL_SECONDS = float(os.environ.get("DENOISE_PROFILE_TTL_SECONDS", 2 * 3600))
+DENOISE_N_STD = float(os.environ.get("DENOISE_N_STD", 1.5))
+DENOISE_PROP_DECREASE = float(os.environ.get("DENOISE_PROP_DECREASE", 1.0))
+
+# Same STFT and mask smoothing as noisereduce's defaults.
+_N_FFT = 1024
+_HOP = _N_FFT // 4
+_FREQ_SMOOTH_HZ = 500
+_TIME_SMOOTH_MS = 50
+_WINDOW = np.hanning(_N_FFT + 1)[:-1].astype(np.float32)
+# Periodic Hann at 75% overlap: analysis x synthesis windows sum to 1.5.
+_OLA_GAIN = np.float32(1.5)
+
+noise_profiles = TieredCache(
+    "noise_profiles", path=None, max_memory_entries=256, ttl=DENOISE_PROFILE_TTL_SECONDS
+)
+
+
+@dataclass
+class NoiseProfile:
+    """Per-frequency-bin gate threshold (dB) for one microphone / room."""
+
+    sample_rate: int
+    threshold_db: np.ndarray
+
+
+def _to_float(samples):
+    samples = np.asarray(samples)
+    if samples.ndim > 1:
+        samples = samples[:, 0]
+    return samples.astype(np.float32) / 32768.0
+
+
+def _frames(samples):
+    """Windowed STFT frames of ``samples`` (hop ``_HOP``); trailing samples are left out."""
+    count = (len(samples) - _N_FFT) // _HOP + 1
+    if count <= 0:
+        return np.zeros((0, _N_FFT), dtype=np.float32)
+    view = np.lib.stride_tricks.sliding_window_view(samples, _N_FFT)[::_HOP][:count]
+    return view * _WINDOW
+
+
+def _to_db(magnitude):
+    return 20 * np.log10(np.maximum(magnitude, 1e-10))
+
+
+def estimate_noise_profile(samples, sample_rate):
+    """
+    Noise profile from the non-speech frames of ``samples`` (int16). If VAD
+    finds too little silence, the quietest quarter of the frames is used.
+    """
+    audio = _to_float(samples)
+    spectra = np.abs(np.fft.rfft(_frames(audio), axis=1))
+    if len(spectra) == 0:
+        return None
+    level = _to_db(np.sqrt(np.mean(spectra ** 2, axis=1)))
+    quiet = level <= np.percentile(level, 25)
+    speech = speech_mask(samples, sample_rate)
+    if len(speech):
+        # VAD frames are shorter than STFT frames; map each STFT frame to the VAD frame at its centre.
+        centres = (np.arange(len(spectra)) * _HOP + _N_FFT // 2) * len(speech) // max(1, len(audio))
+        silent = ~speech[np.minimum(centres, len(speech) - 1)]
+        if np.count_nonzero(silent) >= max(4, len(spectra) // 4):
+            quiet = silent
+    noise_db = _to_db(spectra[quiet])
+    threshold = noise_db.mean(axis=0) + DENOISE_N_STD * noise_db.std(axis=0)
+    return NoiseProfile(sample_rate=sample_rate, threshold_db=threshold.astype(np.float32))
+
+
+def get_noise_profile(key):
+    if key is None:
+        return None
+    cached = noise_profiles.get(str(key))
+    if cached is None:
+        return None
+    return NoiseProfile(cached["sample_rate"], np.asarray(cached["threshold_db"], dtype=np.float32))
+
+
+def set_noise_profile(key, profile):
+    if key is not None and profile is not None:
+        noise_profiles.set(
+            str(key),
+            {"sample_rate": profile.sample_rate, "threshold_db": profile.threshold_db.tolist()},
+        )
+
+
+def _smoothing_filters(sample_rate):
+    """
+    Triangular mask smoothing as in noisereduce. Its 2-D kernel is an outer
+    product, so it is applied as separate time and frequency passes.
+    """
+    n_freq = max(1, int(_FREQ_SMOOTH_HZ / (sample_rate / _N_FFT)))
+    n_time = max(1, int(_TIME_SMOOTH_MS / (_HOP / sample_rate * 1000)))
+
+    def ramp(n):
+        kernel = np.concatenate([np.linspace(0, 1, n + 1, endpoint=False), np.linspace(1, 0, n + 2)])[1:-1]
+        return (kernel / kernel.sum()).astype(np.float32)
+
+    return ramp(n_time), ramp(n_freq)
+
+
+class StreamingDenoiser:
+    """
+    Stationary spectral gating applied incrementally. ``process(chunk)``
+    takes int16 samples and returns the denoised int16 samples that are
+    final so far (output lags input by about 100 ms); ``flush()`` returns the
+    rest. Without a ``profile``, the first ``DENOISE_CALIBRATION_SECONDS`` are
+    held back, a profile is estimated from them and stored under ``key``.
+    """
+
+    def __init__(self, sample_rate=16000, profile=None, key=None):
+        self.sample_rate = sample_rate
+        self.key = key
+        self.profile = profile
+        if self.profile is not None and self.profile.sample_rate != sample_rate:
+            self.profile = None
+        self._time_kernel, self._freq_kernel = _smoothing_filters(sample_rate)
+        self._n_time = len(self._time_kernel) // 2
+        self._calibration = []
+        self._calibration_frames = 0
+        # Zeros in front so the first frames cover the start of the audio.
+        self._pending = np.zeros(_N_FFT - _HOP, dtype=np.float32)
+        self._skip = _N_FFT - _HOP
+        self._tail = np.zeros(_N_FFT - _HOP, dtype=np.float32)
+        self._spectra = np.zeros((0, _N_FFT // 2 + 1), dtype=np.complex64)
+        # Raw masks of the frames before the pending spectra (time-smoothing context).
+        self._masks = None
+        self._samples_in = 0
+        self._samples_out = 0
+        self.cpu_seconds = 0.0
+
+    def process(self, chunk):
+        start = time.process_time()
+        try:
+            chunk = np.asarray(chunk)
+            if chunk.ndim > 1:
+                chunk = chunk[:, 0]
+            self._samples_in += len(chunk)
+            if self.profile is None:
+                self._calibration.append(np.array(chunk, dtype=np.int16))
+                self._calibration_frames += len(chunk)
+                if self._calibration_frames < DENOISE_CALIBRATION_SECONDS * self.sample_rate:
+                    return np.zeros(0, dtype=np.int16)
+                self._calibrate()
+                chunk = np.concatenate(self._calibration)
+                self._calibration = []
+            return self._run(_to_float(chunk), final=False)
+        finally:
+            self.cpu_seconds += time.process_time() - start
+
+    def flush(self):
+        start = time.process_time()
+        try:
+            if self.profile is None:
+                if not self._calibration:
+                    return np.zeros(0, dtype=np.int16)
+                self._calibrate()
+                pending = _to_float(np.concatenate(self._calibration))
+                self._calibration = []
+            else:
+                pending = np.zeros(0, dtype=np.float32)
+            out = self._run(np.concatenate([pending, np.zeros(_N_FFT, dtype=np.float32)]), final=True)
+            # Drop what the zero padding produced past the end of the input.
+            excess = max(0, self._samples_out - self._samples_in)
+            self._samples_out -= excess
+            return out[: len(out) - excess]
+        finally:
+            self.cpu_seconds += time.process_time() - start
+
+    def _calibrate(self):
+        self.profile = estimate_noise_profile(np.concatenate(self._calibration), self.sample_rate)
+        set_noise_profile(self.key, self.profile)
+
+    def _run(self, samples, final):
+        if self.profile is None:
+            # Nothing usable to estimate from (e.g. too short): pass audio through.
+            threshold = np.full(_N_FFT // 2 + 1, -np.inf, dtype=np.float32)
+        else:
+            threshold = self.profile.threshold_db
+
+        self._pending = np.concatenate([self._pending, samples])
+        frames = _frames(self._pending)
+        self._pending = self._pending[len(frames) * _HOP:]
+        spectra = np.fft.rfft(frames, axis=1).astype(np.complex64)
+        masks = (_to_db(np.abs(spectra)) > threshold).astype(np.float32)
+
+        # Time smoothing looks n_time frames ahead, so that many frames wait for the next chunk.
+        # The recording's first and last masks are repeated past its edges.
+        spectra = np.concatenate([self._spectra, spectra])
+        if self._masks is None:
+            if not len(masks):
+                return np.zeros(0, dtype=np.int16)
+            self._masks = np.repeat(masks[:1], self._n_time, axis=0)
+        masks = np.concatenate([self._masks, masks])
+        if final:
+            masks = np.concatenate([masks, np.repeat(masks[-1:], self._n_time, axis=0)])
+        ready = len(masks) - 2 * self._n_time
+        if ready <= 0:
+            self._spectra, self._masks = spectra, masks
+            return np.zeros(0, dtype=np.int16)
+        smoothed = sum(w * masks[k:k + ready] for k, w in enumerate(self._time_kernel))
+        # Edge padding in frequency so the lowest bins (voice fundamentals) aren't attenuated.
+        smoothed = convolve1d(smoothed, self._freq_kernel, axis=1, mode="nearest")
+        gains = 1.0 - DENOISE_PROP_DECREASE * (1.0 - np.clip(smoothed, 0.0, 1.0))
+        self._spectra, self._masks = spectra[ready:], masks[ready:]
+        if final:
+            self._spectra = self._spectra[:0]
+
+        # Overlap-add the resynthesized frames onto the previous tail.
+        frames = np.fft.irfft(spectra[:ready] * gains, n=_N_FFT, axis=1).astype(np.float32) * _WINDOW
+        out = np.zeros((ready - 1) * _HOP + _N_FFT, dtype=np.float32)
+        out[: len(self._tail)] += self._tail
+        for r in range(_N_FFT // _HOP):
+            out[r * _HOP: r * _HOP + ready * _HOP] += frames[:, r * _HOP:(r + 1) * _HOP].reshape(-1)
+        done, self._tail = out[: ready * _HOP], out[ready * _HOP:]
+
+        done = done[self._skip:]
+        self._skip = max(0, self._skip - ready * _HOP)
+        self._samples_out += len(done)
+        return np.clip(done / _OLA_GAIN * 32768.0, -32768, 32767).astype(np.int16)
+
+
+def denoise_with_profile(samples, sample_rate, key=None):
+    """Denoise a whole recording in one pass, reusing (or estimating and caching) ``key``'s profile."""
+    denoiser = StreamingDenoiser(sample_rate, get_noise_profile(key), key)
+    head = denoiser.process(samples)
+    return np.concatenate([head, denoiser.flush()])
+
+
+class BackgroundDenoiser:
+    """
+    Denoises an ``AudioRingBuffer`` on a worker thread while it is recorded.
+    The audio callback calls ``notify()`` after each write; ``finish()``
+    processes what is left and returns a buffer with the denoised answer.
+    """
+
+    def __init__(self, source, key=None):
+        self.source = source
+        self.denoiser = StreamingDenoiser(source.sample_rate, get_noise_profile(key), key)
+        self.output = AudioRingBuffer(
+            source.sample_rate, max_seconds=source.capacity / source.sample_rate
+        )
+        self.position = source.total_frames
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def notify(self):
+        self._wake.set()
+
+    def _drain(self):
+        while True:
+            data, self.position = self.source.read_from(self.position)
+            if not len(data):
+                return
+            self.output.write(self.denoiser.process(data)[:, None])
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait()
+            self._wake.clear()
+            self._drain()
+
+    def finish(self):
+        self._stopping = True
+        self._wake.set()
+        self._thread.join()
+        self._drain()
+        self.output.write(self.denoiser.flush()[:, None])
+        return self.output
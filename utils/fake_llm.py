@@ -0,0 +1,427 @@
+"""
+Deterministic stand-in for the LLM provider, for offline benchmarks and
+regression runs.
+
+Use it in-process with ``LLM_BACKEND=fake``, or start a localhost server that
+speaks the OpenAI/Mistral chat-completions shape (including SSE streaming):
+
+    python -m utils.fake_llm serve --port 8765
+    LLM_MODEL=openai/fake LLM_API_BASE=http://127.0.0.1:8765/v1 MISTRAL_API_KEY=x ...
+
+Responses are schema-valid JSON for the prompts in ``utils.prompts``: the
+fields listed under "Response Format" are filled in. Content depends only on
+the prompt and seed; latency and injected errors follow a seeded random
+stream.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+from litellm import ModelResponse, ModelResponseStream, RateLimitError, ServiceUnavailableError, Timeout
+from litellm.types.utils import Choices, Delta, Message, StreamingChoices, Usage
+
+FAKE_LLM_SEED = int(os.environ.get("FAKE_LLM_SEED", 0))
+# Time to first token: lognormal with this median (ms) and sigma.
+FAKE_LLM_TTFT_MS = float(os.environ.get("FAKE_LLM_TTFT_MS", 400))
+FAKE_LLM_LATENCY_SIGMA = float(os.environ.get("FAKE_LLM_LATENCY_SIGMA", 0.35))
+# Decode speed after the first token.
+FAKE_LLM_TOKENS_PER_SECOND = float(os.environ.get("FAKE_LLM_TOKENS_PER_SECOND", 80))
+# Fraction of calls failing with a 429/503, and fraction that hang until the timeout.
+FAKE_LLM_ERROR_RATE = float(os.environ.get("FAKE_LLM_ERROR_RATE", 0.0))
+FAKE_LLM_TIMEOUT_RATE = float(os.environ.get("FAKE_LLM_TIMEOUT_RATE", 0.0))
+# Per-model latency multipliers, e.g. "mistral/mistral-small-latest=0.4,mistral/mistral-large-latest=1.5".
+FAKE_LLM_MODEL_LATENCY = os.environ.get("FAKE_LLM_MODEL_LATENCY", "")
+
+_KEY = re.compile(r'"(\w+)"\s*:')
+_WORD = re.compile(r"[A-Za-z][A-Za-z+#.-]{3,}")
+_STOPWORDS = {
+    "about", "after", "again", "also", "been", "being", "could", "from", "have",
+    "into", "just", "more", "most", "that", "their", "them", "then", "there",
+    "they", "this", "what", "when", "where", "which", "while", "with", "would",
+    "your", "were", "will", "tell", "describe",
+}
+
+
+def _terms(text, limit=8):
+    seen = []
+    for word in _WORD.findall(text or ""):
+        word = word.lower().strip(".-")
+        if word not in _STOPWORDS and word not in seen:
+            seen.append(word)
+        if len(seen) >= limit:
+            break
+    return seen or ["experience"]
+
+
+def _field(text, label):
+    match = re.search(rf"- {label}:\s*(.*)", text)
+    return match.group(1).strip() if match else ""
+
+
+def _fake_name(rng, text):
+    match = re.search(r"Resume Content:\s*\n\s*([A-Z][a-z]+ [A-Z][a-z]+)", text)
+    return match.group(1) if match else rng.choice(["Alex Morgan", "Sam Rivera", "Jordan Lee"])
+
+
+def _fake_highlights(rng, text):
+    terms = _terms(text.split("Resume Content:")[-1], limit=12)
+    return [
+        f"Delivered {rng.randint(2, 9)} projects using {term}, improving throughput by {rng.randint(10, 60)}%"
+        for term in terms[: rng.randint(5, 7)]
+    ]
+
+
+def _fake_question(rng, text):
+    topic = rng.choice(_terms(_field(text, "Candidate[’']s Response") or _field(text, "Candidate Response")))
+    return rng.choice([
+        f"Can you walk me through a specific decision you made around {topic}, and what trade-offs you weighed?",
+        f"How would you approach {topic} differently if you had to do it again at twice the scale?",
+        f"What was the hardest problem you hit with {topic}, and how did you resolve it?",
+    ])
+
+
+def _fake_feedback(rng, text):
+    return rng.choice([
+        "Clear structure and a concrete example. Quantify the impact to make it stronger.",
+        "Good technical depth. Tie the answer back to the business outcome.",
+        "Relevant answer, but it stays general. Walk through one situation step by step.",
+    ])
+
+
+def _fake_candidates(rng, text):
+    match = re.search(r"Produce (\d+)", text)
+    count = int(match.group(1)) if match else 3
+    terms = _terms(_field(text, "Current Question"), limit=12)
+    return [
+        {
+            "question": f"You mentioned {terms[i % len(terms)]}; what was your specific contribution there?",
+            "keywords": terms[i % len(terms): i % len(terms) + 3] or terms[:3],
+        }
+        for i in range(count)
+    ]
+
+
+def _fake_evaluations(rng, text):
+    match = re.search(r"Answers to evaluate \((\d+)\)", text)
+    count = int(match.group(1)) if match else 1
+    return [
+        {"index": i, "feedback": _fake_feedback(rng, text), "score": rng.randint(4, 9)}
+        for i in range(1, count + 1)
+    ]
+
+
+def _job_terms(text, limit=12):
+    return _terms(text.split("Job Description:")[-1].split("Instructions:")[0], limit=limit)
+
+
+def _fake_list(start, stop):
+    return lambda rng, text: _job_terms(text, limit=stop)[start:stop]
+
+
+# Top-level response field -> (generator(rng, prompt_text), nested keys it owns).
+FAKE_FIELDS = {
+    "name": (_fake_name, ()),
+    "resume_highlights": (_fake_highlights, ()),
+    "next_question": (_fake_question, ()),
+    "feedback": (_fake_feedback, ()),
+    "score": (lambda rng, text: rng.randint(4, 9), ()),
+    "candidates": (_fake_candidates, ("question", "keywords")),
+    "evaluations": (_fake_evaluations, ("index", "feedback", "score")),
+    "role": (lambda rng, text: " ".join(_job_terms(text, limit=2)).title(), ()),
+    "seniority": (lambda rng, text: rng.choice(["mid", "senior", "staff"]), ()),
+    "required_skills": (_fake_list(0, 8), ()),
+    "nice_to_have": (_fake_list(8, 11), ()),
+    "focus_areas": (_fake_list(11, 15), ()),
+    "responsibilities": (lambda rng, text: [f"Own {t}" for t in _job_terms(text, limit=4)], ()),
+}
+
+
+def fake_response_content(messages, seed=FAKE_LLM_SEED):
+    """Deterministic JSON answer for the task in the last user message."""
+    text = next(
+        (m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), ""
+    )
+    rng = random.Random(hashlib.sha256(f"{seed}\0{text}".encode("utf-8")).digest())
+    response_format = text.split("Response Format:")[-1]
+
+    result, nested = {}, set()
+    for key in _KEY.findall(response_format):
+        if key in result or key in nested:
+            continue
+        generator, owned = FAKE_FIELDS.get(key, (lambda rng, text: "n/a", ()))
+        result[key] = generator(rng, text)
+        nested.update(owned)
+    return json.dumps(result, ensure_ascii=False)
+
+
+def _parse_model_latency(spec):
+    multipliers = {}
+    for item in spec.split(","):
+        model, _, factor = item.partition("=")
+        if model.strip() and factor.strip():
+            multipliers[model.strip()] = float(factor)
+    return multipliers
+
+
+def _count_tokens(text):
+    return max(1, len(text) // 4)
+
+
+@dataclass
+class FakePlan:
+    """What a single fake call will do."""
+
+    content: str
+    ttft: float
+    duration: float
+    prompt_tokens: int
+    completion_tokens: int
+    error: Optional[str] = None  # "rate_limit" | "unavailable" | "timeout"
+
+
+class FakeLLMBackend:
+    """
+    In-process LLM backend with litellm-shaped responses.
+
+    Latency is a lognormal time to first token plus ``completion_tokens /
+    tokens_per_second``; ``error_rate`` and ``timeout_rate`` inject 429/503
+    failures and hangs so retry and breaker paths can be exercised.
+    """
+
+    name = "fake"
+    requires_api_key = False
+
+    def __init__(
+        self,
+        seed=FAKE_LLM_SEED,
+        ttft_ms=FAKE_LLM_TTFT_MS,
+        latency_sigma=FAKE_LLM_LATENCY_SIGMA,
+        tokens_per_second=FAKE_LLM_TOKENS_PER_SECOND,
+        error_rate=FAKE_LLM_ERROR_RATE,
+        timeout_rate=FAKE_LLM_TIMEOUT_RATE,
+        model_latency=None,
+    ):
+        self.seed = seed
+        self.ttft_ms = ttft_ms
+        self.latency_sigma = latency_sigma
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.model_latency = (
+            model_latency if model_latency is not None else _parse_model_latency(FAKE_LLM_MODEL_LATENCY)
+        )
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def plan(self, messages, model=None):
+        content = fake_response_content(messages, self.seed)
+        completion_tokens = _count_tokens(content)
+        scale = self.model_latency.get(model, 1.0)
+        with self._lock:
+            ttft = scale * self.ttft_ms / 1000.0 * math.exp(self._rng.gauss(0.0, self.latency_sigma))
+            roll = self._rng.random()
+        error = None
+        if roll < self.timeout_rate:
+            error = "timeout"
+        elif roll < self.timeout_rate + self.error_rate:
+            error = "rate_limit" if roll < self.timeout_rate + self.error_rate / 2 else "unavailable"
+        return FakePlan(
+            content=content,
+            ttft=ttft,
+            duration=ttft + scale * completion_tokens / max(self.tokens_per_second, 1e-6),
+            prompt_tokens=sum(_count_tokens(str(m.get("content", ""))) for m in messages),
+            completion_tokens=completion_tokens,
+            error=error,
+        )
+
+    @staticmethod
+    def _raise(plan, model):
+        if plan.error == "timeout":
+            raise Timeout("fake backend timed out", model=model, llm_provider="fake")
+        if plan.error == "rate_limit":
+            raise RateLimitError("fake backend rate limit", llm_provider="fake", model=model)
+        raise ServiceUnavailableError("fake backend unavailable", llm_provider="fake", model=model)
+
+    @staticmethod
+    def _response(plan, model):
+        return ModelResponse(
+            model=model,
+            choices=[Choices(message=Message(content=plan.content), finish_reason="stop")],
+            usage=Usage(
+                prompt_tokens=plan.prompt_tokens,
+                completion_tokens=plan.completion_tokens,
+                total_tokens=plan.prompt_tokens + plan.completion_tokens,
+            ),
+        )
+
+    @staticmethod
+    def _chunks(content, size=16):
+        return [content[i: i + size] for i in range(0, len(content), size)]
+
+    def completion(self, model, messages, stream=False, timeout=None, **kwargs):
+        plan = self.plan(messages, model)
+        if plan.error == "timeout":
+            time.sleep(timeout or 60)
+        if plan.error:
+            self._raise(plan, model)
+        time.sleep(plan.duration)
+        return self._response(plan, model)
+
+    async def acompletion(self, model, messages, stream=False, timeout=None, **kwargs):
+        plan = self.plan(messages, model)
+        if plan.error == "timeout":
+            await asyncio.sleep(timeout or 60)
+        if plan.error:
+            await asyncio.sleep(plan.ttft)
+            self._raise(plan, model)
+        if not stream:
+            await asyncio.sleep(plan.duration)
+            return self._response(plan, model)
+        return self._stream(plan, model)
+
+    async def _stream(self, plan, model):
+        chunks = self._chunks(plan.content)
+        await asyncio.sleep(plan.ttft)
+        gap = (plan.duration - plan.ttft) / max(len(chunks), 1)
+        for i, text in enumerate(chunks):
+            if i:
+                await asyncio.sleep(gap)
+            yield ModelResponseStream(model=model, choices=[StreamingChoices(delta=Delta(content=text))])
+
+
+class _FakeChatHandler(BaseHTTPRequestHandler):
+    backend = None  # set by serve()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+            return
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        model = request.get("model", "fake")
+        plan = self.backend.plan(request.get("messages", []), model)
+
+        if plan.error == "timeout":
+            time.sleep(600)
+            return
+        if plan.error:
+            time.sleep(plan.ttft)
+            status = 429 if plan.error == "rate_limit" else 503
+            self._send_json(status, {"error": {"message": f"fake {plan.error}", "type": plan.error}})
+            return
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+        if not request.get("stream"):
+            time.sleep(plan.duration)
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": plan.content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": plan.prompt_tokens,
+                    "completion_tokens": plan.completion_tokens,
+                    "total_tokens": plan.prompt_tokens + plan.completion_tokens,
+                },
+            })
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        chunks = FakeLLMBackend._chunks(plan.content)
+        time.sleep(plan.ttft)
+        gap = (plan.duration - plan.ttft) / max(len(chunks), 1)
+        for i, text in enumerate(chunks + [None]):
+            if i:
+                time.sleep(gap)
+            event = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": text} if text is not None else {},
+                    "finish_reason": None if text is not None else "stop",
+                }],
+            }
+            self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def serve(host="127.0.0.1", port=8765, backend=None):
+    """Run the OpenAI-compatible fake server until interrupted."""
+    handler = type("FakeChatHandler", (_FakeChatHandler,), {"backend": backend or FakeLLMBackend()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    print(f"Fake LLM listening on http://{host}:{port}/v1/chat/completions")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deterministic fake LLM backend")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    server = subcommands.add_parser("serve", help="run the OpenAI-compatible HTTP server")
+    server.add_argument("--host", default="127.0.0.1")
+    server.add_argument("--port", type=int, default=8765)
+    server.add_argument("--seed", type=int, default=FAKE_LLM_SEED)
+    server.add_argument("--ttft-ms", type=float, default=FAKE_LLM_TTFT_MS)
+    server.add_argument("--sigma", type=float, default=FAKE_LLM_LATENCY_SIGMA)
+    server.add_argument("--tokens-per-second", type=float, default=FAKE_LLM_TOKENS_PER_SECOND)
+    server.add_argument("--error-rate", type=float, default=FAKE_LLM_ERROR_RATE)
+    server.add_argument("--timeout-rate", type=float, default=FAKE_LLM_TIMEOUT_RATE)
+    args = parser.parse_args(argv)
+
+    serve(
+        args.host,
+        args.port,
+        FakeLLMBackend(
+            seed=args.seed,
+            ttft_ms=args.ttft_ms,
+            latency_sigma=args.sigma,
+            tokens_per_second=args.tokens_per_second,
+            error_rate=args.error_rate,
+            timeout_rate=args.timeout_rate,
+        ),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+
+LLM_HEDGING_ENABLED = os.environ.get("LLM_HEDGING_ENABLED", "false").lower() in ("1", "true", "yes")
+# Fire the duplicate once the primary is slower than this percentile of recent calls.
+LLM_HEDGE_PERCENTILE = float(os.environ.get("LLM_HEDGE_PERCENTILE", 0.95))
+# Model for the duplicate request; empty means the same model as the primary.
+LLM_HEDGE_MODEL = os.environ.get("LLM_HEDGE_MODEL", "")
+# At most this fraction of calls may be hedged, so spend can't double.
+LLM_HEDGE_BUDGET = float(os.environ.get("LLM_HEDGE_BUDGET", 0.1))
+LLM_HEDGE_MIN_SAMPLES = int(os.environ.get("LLM_HEDGE_MIN_SAMPLES", 20))
+
+
+class HedgePolicy:
+    """
+    Decides when to fire a duplicate request and enforces the hedging budget.
+
+    Latencies of recent successful calls are kept in a sliding window; the
+    hedge delay is the configured percentile of that window. Hedging stays
+    off until ``min_samples`` latencies have been observed.
+    """
+
+    def __init__(
+        self,
+        percentile=LLM_HEDGE_PERCENTILE,
+        budget=LLM_HEDGE_BUDGET,
+        min_samples=LLM_HEDGE_MIN_SAMPLES,
+        min_delay=0.25,
+        window=200,
+    ):
+        self.percentile = percentile
+        self.budget = budget
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._stats = {
+            "calls": 0,
+            "hedges_fired": 0,
+            "hedge_wins": 0,
+            "primary_wins": 0,
+            "budget_denied": 0,
+        }
+
+    def record_latency(self, seconds):
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def hedge_delay(self):
+        """Seconds to wait before hedging, or None if there is too little data."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(self.percentile * len(ordered)))
+        return max(self.min_delay, ordered[index])
+
+    def start_call(self):
+        with self._lock:
+            self._stats["calls"] += 1
+
+    def try_acquire_hedge(self):
+        """Reserve budget for one hedge; False once the cap would be exceeded."""
+        with self._lock:
+            if self._stats["hedges_fired"] + 1 > self.budget * self._stats["calls"]:
+                self._stats["budget_denied"] += 1
+                return False
+            self._stats["hedges_fired"] += 1
+            return True
+
+    def record_winner(self, hedged, winner_is_hedge):
+        if not hedged:
+            return
+        with self._lock:
+            self._stats["hedge_wins" if winner_is_hedge else "primary_wins"] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["hedge_rate"] = stats["hedges_fired"] / stats["calls"] if stats["calls"] else 0.0
+            stats["samples"] = len(self._latencies)
+        stats["current_delay_s"] = self.hedge_delay()
+        return stats
+
+
+hedge_policy = HedgePolicy()
+
+
+def get_hedge_stats():
+    return hedge_policy.stats()
+
+
+async def hedged_call(primary, hedge, is_valid, policy=hedge_policy):
+    """
+    Run ``primary()``; if it is slower than the policy's hedge delay, also run
+    ``hedge()`` and return the first result that passes ``is_valid``.
+
+    ``primary`` and ``hedge`` are zero-argument coroutine factories. The losing
+    request is cancelled. If neither result is valid, the primary's result (or
+    exception) is returned.
+    """
+    policy.start_call()
+    started = time.perf_counter()
+    primary_task = asyncio.ensure_future(primary())
+    tasks = {primary_task: False}  # task -> is_hedge
+
+    try:
+        delay = policy.hedge_delay()
+        if delay is not None:
+            done, _ = await asyncio.wait({primary_task}, timeout=delay)
+            if not done and policy.try_acquire_hedge():
+                tasks[asyncio.ensure_future(hedge())] = True
+
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.cancelled() or task.exception() is not None:
+                    continue
+                result = task.result()
+                if is_valid(result):
+                    policy.record_latency(time.perf_counter() - started)
+                    policy.record_winner(len(tasks) > 1, tasks[task])
+                    return result
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+    # Nothing valid: surface the primary's outcome so normal fallbacks apply.
+    return primary_task.result()
@@ -0,0 +1,203 @@
+"""
+Job description pre-processing shared across candidates.
+
+One job description is typically interviewed against by many candidates.
+Each distinct JD (by SHA-256 of its normalized text) is distilled once into a
+compact structured summary (role, seniority, required skills, focus areas),
+cached in memory and on disk, and the summary is what session prompts embed
+instead of the raw posting.
+
+Warm the cache when a JD is registered:
+
+    python -m utils.jd_analysis register inputs/job_description.txt
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import threading
+
+from dotenv import load_dotenv
+
+from utils.cache import TieredCache, make_cache_key
+from utils.json_extract import extract_json_object
+from utils.llm_call import get_response_from_llm_async, llm_output_version, parse_json_response
+from utils.prompts import job_description_analysis
+from utils.telemetry import record_llm_call, start_llm_call
+
+load_dotenv()
+
+JD_ANALYSIS = os.environ.get("JD_ANALYSIS", "false").lower() in ("1", "true", "yes")
+JD_CACHE_PATH = os.environ.get("JD_CACHE_PATH", ".cache/job_descriptions.sqlite3")
+JD_CACHE_TTL_SECONDS = float(os.environ.get("JD_CACHE_TTL_SECONDS", 30 * 24 * 3600))
+# Postings shorter than this are already compact; they are used as-is.
+JD_SUMMARY_MIN_CHARS = int(os.environ.get("JD_SUMMARY_MIN_CHARS", 800))
+
+jd_cache = TieredCache(
+    "job_descriptions",
+    path=JD_CACHE_PATH,
+    max_memory_entries=128,
+    max_disk_entries=2000,
+    ttl=JD_CACHE_TTL_SECONDS,
+)
+
+_PROMPT_VERSION = make_cache_key(
+    "job_description_analysis",
+    job_description_analysis,
+    llm_output_version("job_description_analysis"),
+)[:12]
+_LIST_FIELDS = ("required_skills", "nice_to_have", "focus_areas", "responsibilities")
+
+_inflight_lock = threading.Lock()
+_inflight = {}  # fingerprint -> threading.Lock
+
+
+def job_description_fingerprint(job_description):
+    """SHA-256 of the JD with whitespace normalized, so re-pasted copies match."""
+    normalized = " ".join(str(job_description).split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _cache_key(fingerprint):
+    return f"{_PROMPT_VERSION}:{fingerprint}"
+
+
+def _clean_summary(response):
+    """Keep only well-formed fields; ``None`` if nothing useful came back."""
+    if not isinstance(response, dict):
+        return None
+    summary = {
+        "role": str(response.get("role") or "").strip(),
+        "seniority": str(response.get("seniority") or "").strip(),
+    }
+    for key in _LIST_FIELDS:
+        value = response.get(key) or []
+        if isinstance(value, str):
+            value = [value]
+        summary[key] = [str(item).strip() for item in value if str(item).strip()]
+    if not summary["required_skills"] and not summary["focus_areas"]:
+        return None
+    return summary
+
+
+def _has_job_summary(content):
+    """LLM cache validator: only completions that yield a usable summary are replayed."""
+    return _clean_summary(extract_json_object(content)) is not None
+
+
+def format_job_summary(summary):
+    """Render a summary as the compact text used in place of the raw JD."""
+    lines = []
+    role = summary.get("role") or "Role"
+    lines.append(f"Role: {role}" + (f" ({summary['seniority']})" if summary.get("seniority") else ""))
+    if summary.get("required_skills"):
+        lines.append("Required skills: " + ", ".join(summary["required_skills"]))
+    if summary.get("nice_to_have"):
+        lines.append("Nice to have: " + ", ".join(summary["nice_to_have"]))
+    if summary.get("focus_areas"):
+        lines.append("Interview focus areas:")
+        lines.extend(f"- {item}" for item in summary["focus_areas"])
+    if summary.get("responsibilities"):
+        lines.append("Key responsibilities:")
+        lines.extend(f"- {item}" for item in summary["responsibilities"])
+    return "\n".join(lines)
+
+
+def get_cached_job_summary(job_description):
+    """Cached summary dict for this JD, without calling the LLM."""
+    return jd_cache.get(_cache_key(job_description_fingerprint(job_description)))
+
+
+async def analyze_job_description_async(job_description, use_cache=True):
+    """
+    Structured summary of ``job_description``, computed at most once per JD.
+    Returns ``None`` if the LLM response was unusable; neither the summary
+    nor the completion behind it is cached then, so the next call retries.
+    ``use_cache=False`` bypasses both caches and re-runs the analysis.
+    """
+    key = _cache_key(job_description_fingerprint(job_description))
+    if use_cache:
+        cached = jd_cache.get(key)
+        if cached is not None:
+            return cached
+
+    record = start_llm_call("job_description_analysis")
+    try:
+        raw_response = await get_response_from_llm_async(
+            job_description_analysis.format(job_description=str(job_description).strip()),
+            use_cache=use_cache,
+            record=record,
+            cache_validator=_has_job_summary,
+        )
+        summary = _clean_summary(parse_json_response(raw_response, record))
+    except Exception as e:
+        print(f"⚠️ Job description analysis failed: {e}")
+        summary = None
+    finally:
+        record_llm_call(record)
+
+    if summary is not None:
+        jd_cache.set(key, summary)
+    return summary
+
+
+def analyze_job_description(job_description, use_cache=True):
+    """
+    Synchronous entry point. Concurrent callers with the same JD (e.g. several
+    sessions registering it at once) share a single LLM call.
+    """
+    fingerprint = job_description_fingerprint(job_description)
+    with _inflight_lock:
+        lock = _inflight.setdefault(fingerprint, threading.Lock())
+    with lock:
+        try:
+            return asyncio.run(analyze_job_description_async(job_description, use_cache))
+        finally:
+            with _inflight_lock:
+                _inflight.pop(fingerprint, None)
+
+
+def prepare_job_description(job_description):
+    """
+    Text to embed in session prompts for this JD: the cached summary when JD
+    analysis is enabled and the posting is long enough, otherwise the raw JD.
+    """
+    if not JD_ANALYSIS or len(str(job_description)) < JD_SUMMARY_MIN_CHARS:
+        return job_description
+    summary = analyze_job_description(job_description)
+    return format_job_summary(summary) if summary else job_description
+
+
+def get_jd_cache_stats():
+    return jd_cache.stats()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Job description analysis cache")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    register = subparsers.add_parser("register", help="analyze JD files and warm the cache")
+    register.add_argument("paths", nargs="+")
+    register.add_argument("--refresh", action="store_true", help="re-analyze even if cached")
+    show = subparsers.add_parser("show", help="print the cached summary of JD files")
+    show.add_argument("paths", nargs="+")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    for path in args.paths:
+        with open(path, "r") as f:
+            job_description = f.read()
+        fingerprint = job_description_fingerprint(job_description)[:12]
+        if args.command == "register":
+            summary = analyze_job_description(job_description, use_cache=not args.refresh)
+        else:
+            summary = get_cached_job_summary(job_description)
+        if summary is None:
+            failed += 1
+            print(f"⚠️ {path} [{fingerprint}]: no summary")
+            continue
+        print(f"{path} [{fingerprint}]\n{format_job_summary(summary)}\n")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,169 @@
+import json
+import re
+
+# Characters that matter outside / inside a JSON string while scanning.
+_STRUCTURAL = re.compile(r'[{}"]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+
+class JsonObjectScanner:
+    """
+    Find the first complete, valid JSON object in text, incrementally.
+
+    Tracks string/escape state and a stack of open-brace offsets in a single
+    forward pass, jumping between structurally significant characters with
+    precompiled regexes, so code fences, leading chatter and trailing prose
+    cost nothing beyond being skipped. ``feed`` can be called with successive
+    chunks of a token stream; it returns the parsed object as soon as it is
+    complete. Chunks are only joined when an outermost object closes, and
+    text before it is dropped once no object is open. Call ``finish`` at the
+    end of the input to also search inside a '{' that never closed.
+    """
+
+    def __init__(self):
+        self._chunks = []  # text fed since self._offset
+        self._offset = 0  # absolute offset of the first kept character
+        self._length = 0  # total characters fed
+        self._stack = []  # absolute offsets of the currently open '{'
+        self._spans = []  # (start, end) of objects closed inside the open candidate
+        self._in_string = False
+        self._escape = False  # a backslash ended the previous chunk
+        self.result = None
+
+    @property
+    def done(self):
+        return self.result is not None
+
+    def feed(self, chunk):
+        """Add text; return the first complete JSON object once found, else None."""
+        if self.result is not None:
+            return self.result
+        if not chunk:
+            return None
+        base = self._length
+        self._chunks.append(chunk)
+        self._length += len(chunk)
+        self._scan(chunk, base)
+        if self.result is None and not self._stack:
+            # Nothing open: the text so far can never be part of the object.
+            self._chunks = []
+            self._offset = self._length
+        return self.result
+
+    def _scan(self, chunk, base):
+        pos = 0
+        end = len(chunk)
+        stack = self._stack
+
+        while pos < end:
+            if self._escape:
+                self._escape = False
+                pos += 1
+                continue
+
+            if not stack:
+                brace = chunk.find("{", pos)
+                if brace < 0:
+                    return
+                stack.append(base + brace)
+                self._in_string = False
+                pos = brace + 1
+                continue
+
+            if self._in_string:
+                match = _STRING_SPECIAL.search(chunk, pos)
+                if match is None:
+                    return
+                pos = match.end()
+                if match.group() == "\\":
+                    self._escape = True
+                else:
+                    self._in_string = False
+                continue
+
+            match = _STRUCTURAL.search(chunk, pos)
+            if match is None:
+                return
+            char = match.group()
+            pos = match.end()
+            if char == '"':
+                self._in_string = True
+            elif char == "{":
+                stack.append(base + match.start())
+            else:
+                start = stack.pop()
+                if stack:
+                    self._spans.append((start, base + pos))
+                    continue
+                parsed = self._first_object(start, base + pos)
+                if parsed is not None:
+                    self.result = parsed
+                    return
+
+    def finish(self):
+        """
+        End of input: if nothing was found yet, return the earliest valid object
+        closed inside a '{' that never closed (e.g. a stray brace in prose).
+        """
+        if self.result is None and self._spans:
+            spans = sorted(self._spans)
+            self._spans = []
+            self.result = self._parse_spans(spans)
+        return self.result
+
+    def _first_object(self, start, end):
+        """
+        The outermost candidate if it parses; otherwise (e.g. a brace in prose)
+        the earliest-starting valid object closed inside it.
+        """
+        spans = [(start, end)] + sorted(self._spans)
+        self._spans = []
+        return self._parse_spans(spans)
+
+    def _parse_spans(self, spans):
+        """First span of the kept text that parses as a JSON object."""
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        text = self._chunks[0]
+        for span_start, span_end in spans:
+            try:
+                parsed = json.loads(text[span_start - self._offset : span_end - self._offset])
+            except json.JSONDecodeError:
+                continue
+            if isinstance(parsed, dict):
+                return parsed
+        return None
+
+
+def extract_json_object_with_fallback(text):
+    """
+    Like ``extract_json_object`` but returns ``(obj, fell_back)``, where
+    ``fell_back`` is True when the response was not a bare JSON object and
+    had to be scanned for one.
+    """
+    if not text or not isinstance(text, str):
+        return None, False
+
+    # Fast path: the whole response is the object.
+    stripped = text.strip()
+    if stripped.startswith("{") and stripped.endswith("}"):
+        try:
+            parsed = json.loads(stripped)
+            if isinstance(parsed, dict):
+                return parsed, False
+        except json.JSONDecodeError:
+            pass
+
+    scanner = JsonObjectScanner()
+    scanner.feed(text)
+    return scanner.finish(), True
+
+
+def extract_json_object(text):
+    """
+    Return the first valid JSON object in ``text`` as a dict, or None.
+
+    Tolerates ```json fences, leading explanations and trailing prose, and
+    handles nested objects and braces inside strings.
+    """
+    return extract_json_object_with_fallback(text)[0]
@@ -0,0 +1,62 @@
+"""
+Pluggable LLM backends behind ``utils.llm_call``.
+
+A backend exposes litellm-shaped ``completion(**kwargs)`` and
+``acompletion(**kwargs)``: same keyword arguments, same response objects
+(``choices[0].message.content``, ``usage``, streamed ``delta`` chunks) and
+litellm exception types. Select one with ``LLM_BACKEND``.
+"""
+import os
+
+import litellm
+
+# Optional override of the provider endpoint (e.g. the fake server in utils.fake_llm).
+LLM_API_BASE = os.environ.get("LLM_API_BASE", "")
+
+
+class LiteLLMBackend:
+    """Real provider calls through litellm (default)."""
+
+    name = "litellm"
+    requires_api_key = True
+
+    def __init__(self, api_base=LLM_API_BASE):
+        self.api_base = api_base or None
+
+    def _kwargs(self, kwargs):
+        if self.api_base and "api_base" not in kwargs:
+            kwargs["api_base"] = self.api_base
+        return kwargs
+
+    def completion(self, **kwargs):
+        return litellm.completion(**self._kwargs(kwargs))
+
+    async def acompletion(self, **kwargs):
+        return await litellm.acompletion(**self._kwargs(kwargs))
+
+
+def _fake_backend():
+    from utils.fake_llm import FakeLLMBackend
+
+    return FakeLLMBackend()
+
+
+_BACKENDS = {
+    "litellm": LiteLLMBackend,
+    "fake": _fake_backend,
+}
+
+
+def register_llm_backend(name, factory):
+    """Make ``factory()`` selectable as ``LLM_BACKEND=<name>``."""
+    _BACKENDS[name] = factory
+
+
+def get_llm_backend(name):
+    try:
+        factory = _BACKENDS[name.lower()]
+    except KeyError:
+        raise ValueError(
+            f"Unknown LLM_BACKEND '{name}' (available: {', '.join(sorted(_BACKENDS))})"
+        ) from None
+    return factory()
@@ -1,34 +1,629 @@
-from litellm import completion
+from litellm import (
+    completion_cost,
+    token_counter,
+    RateLimitError,
+    Timeout,
+    APIConnectionError,
+    InternalServerError,
+    ServiceUnavailableError,
+)
 import os
 import json
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from contextlib import AsyncExitStack, asynccontextmanager
 from dotenv import load_dotenv
 
+from utils.cache import TieredCache, make_cache_key
+from utils.concurrency import ConcurrencyLimiter
+from utils.llm_backend import get_llm_backend
+from utils.json_extract import extract_json_object_with_fallback
+from utils.rate_limiter import RateLimiter, PRIORITY_INTERACTIVE
+from utils.resilience import (
+    BackendError,
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    call_with_retries_async,
+)
+from utils.telemetry import llm_telemetry, start_llm_call, record_llm_call
+from utils.model_router import model_router
+
 # Load environment variables from .env
 load_dotenv()
 
 LLM_MODEL = os.environ.get("LLM_MODEL", "mistral/mistral-large-latest")
 MISTRAL_API_KEY = os.environ.get("MISTRAL_API_KEY")
 
+# "litellm" (real provider) or "fake" (offline, see utils.fake_llm).
+LLM_BACKEND = os.environ.get("LLM_BACKEND", "litellm")
+llm_backend = get_llm_backend(LLM_BACKEND)
+# Backend and endpoint are part of every key that stores LLM output, so fake
+# or local-endpoint completions are never served for the real provider.
+LLM_BACKEND_ID = f"{llm_backend.name}:{getattr(llm_backend, 'api_base', None) or ''}"
+
+# Response cache: byte-identical prompts (re-uploaded resumes, replayed
+# sessions, re-run evaluations) are served without an API round-trip.
+LLM_CACHE_ENABLED = os.environ.get("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", ".cache/llm_responses.sqlite3")
+LLM_CACHE_TTL_SECONDS = float(os.environ.get("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600))
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", 5000))
+
+llm_cache = TieredCache(
+    "llm_responses",
+    path=LLM_CACHE_PATH if LLM_CACHE_ENABLED else None,
+    max_memory_entries=256,
+    max_disk_entries=LLM_CACHE_MAX_ENTRIES,
+    ttl=LLM_CACHE_TTL_SECONDS,
+)
+
+# Upper bound on in-flight async completions across the whole process.
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", 16))
+llm_concurrency = ConcurrencyLimiter(LLM_MAX_CONCURRENCY)
+
+# Provider quota shared by every caller in the process (0 disables a limit).
+LLM_REQUESTS_PER_MINUTE = int(os.environ.get("LLM_REQUESTS_PER_MINUTE", 120))
+LLM_TOKENS_PER_MINUTE = int(os.environ.get("LLM_TOKENS_PER_MINUTE", 500000))
+LLM_COMPLETION_TOKEN_ESTIMATE = int(os.environ.get("LLM_COMPLETION_TOKEN_ESTIMATE", 400))
+LLM_RATE_LIMIT_BACKOFF_SECONDS = float(os.environ.get("LLM_RATE_LIMIT_BACKOFF_SECONDS", 5))
+llm_rate_limiter = RateLimiter(LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE)
+
+# Routing decisions are exported alongside the per-call telemetry.
+llm_telemetry.add_collector(model_router.to_prometheus)
+
+# Retries and circuit breaking: each call gets an overall latency budget that
+# is split across attempts; a model's breaker fails fast while it is down, and
+# the router chain moves on to the next model.
+LLM_CALL_BUDGET_SECONDS = float(os.environ.get("LLM_CALL_BUDGET_SECONDS", 30))
+LLM_MAX_ATTEMPTS = int(os.environ.get("LLM_MAX_ATTEMPTS", 3))
+LLM_BREAKER_FAILURES = int(os.environ.get("LLM_BREAKER_FAILURES", 5))
+LLM_BREAKER_RESET_SECONDS = float(os.environ.get("LLM_BREAKER_RESET_SECONDS", 30))
+llm_retry_policy = RetryPolicy(max_attempts=LLM_MAX_ATTEMPTS)
+_breakers_lock = threading.Lock()
+_breakers = {}  # model -> CircuitBreaker
+
+
+def get_llm_breaker(model):
+    """The circuit breaker of ``model``, created on first use."""
+    with _breakers_lock:
+        breaker = _breakers.get(model)
+        if breaker is None:
+            breaker = _breakers[model] = CircuitBreaker(
+                f"llm:{model}",
+                failure_threshold=LLM_BREAKER_FAILURES,
+                reset_timeout=LLM_BREAKER_RESET_SECONDS,
+            )
+        return breaker
+
+
+_RETRYABLE_LLM_ERRORS = (
+    RateLimitError,
+    Timeout,
+    APIConnectionError,
+    InternalServerError,
+    ServiceUnavailableError,
+)
+
+
+def is_retryable_llm_error(error):
+    return isinstance(error, _RETRYABLE_LLM_ERRORS)
+
+
+def _require_api_key():
+    if llm_backend.requires_api_key and not MISTRAL_API_KEY:
+        raise ValueError("❌ MISTRAL_API_KEY is not set. Please check your .env file.")
+
+
+def as_messages(prompt):
+    """Accept either a plain prompt string or a list of chat messages."""
+    if isinstance(prompt, str):
+        return [{"role": "user", "content": prompt}]
+    return list(prompt)
+
+
+def _prompt_text(prompt):
+    if isinstance(prompt, str):
+        return prompt
+    return json.dumps(prompt, sort_keys=True, ensure_ascii=False)
+
+
+def llm_cache_key(model, prompt, sampling_params):
+    """
+    Content-addressed cache key for a completion: (backend, model, prompt hash,
+    sampling params).
+    """
+    prompt_hash = hashlib.sha256(_prompt_text(prompt).encode("utf-8")).hexdigest()
+    return make_cache_key(LLM_BACKEND_ID, model, prompt_hash, sampling_params)
+
+
+def llm_output_version(prompt_type):
+    """
+    Short key part naming what answers ``prompt_type`` (backend, endpoint and
+    configured model chain), for caches that store parsed LLM output.
+    """
+    if model_router.enabled and prompt_type in model_router.routes:
+        chain = model_router.routes[prompt_type][0]
+    else:
+        chain = [model_router.default_model]
+    return make_cache_key(LLM_BACKEND_ID, chain)[:12]
+
+
+def is_json_response(content):
+    """Default ``cache_validator``: only completions holding a JSON object are cached."""
+    return extract_json_object_with_fallback(content)[0] is not None
+
+
+def _cached_response(key, cache_validator):
+    """Cached completion for ``key`` if it still passes ``cache_validator`` (else dropped)."""
+    cached = llm_cache.get(key)
+    if cached is not None and not cache_validator(cached):
+        llm_cache.delete(key)
+        return None
+    return cached
+
+
+def _cache_response(key, content, cache_validator):
+    if content and cache_validator(content):
+        llm_cache.set(key, content)
+
+
+def estimate_tokens(prompt):
+    """Rough token estimate (prompt + expected completion) used for rate limiting."""
+    length = sum(len(str(m.get("content", ""))) for m in as_messages(prompt))
+    return length // 4 + LLM_COMPLETION_TOKEN_ESTIMATE
+
+
+# Prompt-prefix instrumentation: how many prompt tokens sit in the stable
+# system prefix (reusable by provider-side prefix caching) vs. the per-turn part.
+_prefix_lock = threading.Lock()
+_prefix_token_counts = OrderedDict()  # prefix hash -> token count
+_prefix_stats = {
+    "calls": 0,
+    "calls_with_prefix": 0,
+    "prefix_tokens": 0,
+    "prompt_tokens": 0,
+    "provider_cached_tokens": 0,
+}
 
-def get_response_from_llm(prompt):
+
+def count_prefix_tokens(model, messages):
+    """Token count of the leading system message (0 if there is none); memoized per prefix."""
+    if not messages or messages[0].get("role") != "system":
+        return 0
+    content = messages[0]["content"]
+    key = hashlib.sha256(f"{model}\0{content}".encode("utf-8")).hexdigest()
+    with _prefix_lock:
+        if key in _prefix_token_counts:
+            _prefix_token_counts.move_to_end(key)
+            return _prefix_token_counts[key]
+    try:
+        tokens = token_counter(model=model, messages=[messages[0]])
+    except Exception:
+        tokens = len(content) // 4
+    with _prefix_lock:
+        _prefix_token_counts[key] = tokens
+        while len(_prefix_token_counts) > 512:
+            _prefix_token_counts.popitem(last=False)
+    return tokens
+
+
+def record_prompt_prefix(model, messages, usage=None):
+    """Account prefix vs. total prompt tokens (and provider cache hits, if reported)."""
+    prefix_tokens = count_prefix_tokens(model, messages)
+    prompt_tokens = getattr(usage, "prompt_tokens", None) or 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", None) or 0
+    with _prefix_lock:
+        _prefix_stats["calls"] += 1
+        _prefix_stats["calls_with_prefix"] += 1 if prefix_tokens else 0
+        _prefix_stats["prefix_tokens"] += prefix_tokens
+        _prefix_stats["prompt_tokens"] += prompt_tokens
+        _prefix_stats["provider_cached_tokens"] += cached_tokens
+    return prefix_tokens
+
+
+def get_prompt_prefix_stats():
+    """Totals of stable-prefix tokens, prompt tokens and provider-reported cached tokens."""
+    with _prefix_lock:
+        stats = dict(_prefix_stats)
+    stats["prefix_share"] = (
+        stats["prefix_tokens"] / stats["prompt_tokens"] if stats["prompt_tokens"] else 0.0
+    )
+    return stats
+
+
+@asynccontextmanager
+async def llm_slot(prompt, priority=PRIORITY_INTERACTIVE):
+    """
+    Wait for rate-limit budget and a concurrency slot, in priority order.
+    Yields the token estimate charged to the rate limiter.
+    """
+    estimated_tokens = estimate_tokens(prompt)
+    await llm_rate_limiter.acquire(priority, estimated_tokens)
+    await llm_concurrency.acquire(priority)
+    try:
+        yield estimated_tokens
+    except RateLimitError:
+        # Provider says we're over quota: pause admissions for everyone.
+        print(f"⚠️ LLM rate limited by provider, backing off {LLM_RATE_LIMIT_BACKOFF_SECONDS}s.")
+        llm_rate_limiter.backoff(LLM_RATE_LIMIT_BACKOFF_SECONDS)
+        raise
+    finally:
+        llm_concurrency.release()
+
+
+def get_response_from_llm(
+    prompt, use_cache=True, prompt_type="other", cache_validator=is_json_response, **sampling_params
+):
     """
     Calls the LLM and returns the response.
+
+    ``prompt`` is a string or a list of chat messages. Responses are cached
+    by (model, prompt, sampling params), but only when ``cache_validator``
+    accepts them (by default: they contain a JSON object), so a malformed
+    completion is never replayed; pass
+    ``use_cache=False`` to force a fresh completion. Extra keyword arguments
+    (e.g. ``temperature``) are forwarded to the completion call. The call is
+    recorded in ``utils.telemetry`` under ``prompt_type``.
     """
-    if not MISTRAL_API_KEY:
-        raise ValueError("❌ MISTRAL_API_KEY is not set. Please check your .env file.")
+    _require_api_key()
+
+    model = model_router.route(prompt_type)[0]
+    record = start_llm_call(prompt_type, model=model)
+    use_cache = use_cache and LLM_CACHE_ENABLED
+    cache_key = llm_cache_key(model, prompt, sampling_params)
+    try:
+        if use_cache:
+            cached = _cached_response(cache_key, cache_validator)
+            if cached is not None:
+                record.cache_hit = True
+                return cached
+
+        messages = as_messages(prompt)
+        response = llm_backend.completion(
+            model=model,
+            messages=messages,
+            api_key=MISTRAL_API_KEY,  # use API key safely
+            **sampling_params,
+        )
+        content = response.choices[0].message.content
+        _record_usage(record, messages, response=response)
+    except BaseException as e:
+        record.error = str(e) or type(e).__name__
+        raise
+    finally:
+        record_llm_call(record)
+
+    if use_cache:
+        _cache_response(cache_key, content, cache_validator)
+    return content
+
+
+async def get_response_from_llm_async(
+    prompt,
+    use_cache=True,
+    priority=PRIORITY_INTERACTIVE,
+    budget=None,
+    model=None,
+    prompt_type="other",
+    record=None,
+    cache_validator=is_json_response,
+    **sampling_params,
+):
+    """
+    Async counterpart of ``get_response_from_llm``.
+
+    Uses the backend's native ``acompletion`` (pooled keep-alive HTTP client), so
+    no worker thread is held while waiting on the provider. Calls are admitted
+    through the process-wide rate limiter and ``LLM_MAX_CONCURRENCY`` slots in
+    ``priority`` order (see ``utils.rate_limiter``).
+
+    Transient provider errors are retried with jittered backoff within
+    ``budget`` seconds (default ``LLM_CALL_BUDGET_SECONDS``); failures raise
+    ``utils.resilience.BackendError``.
+
+    Without an explicit ``model``, the model chain for ``prompt_type`` comes
+    from ``utils.model_router``: if a model fails after its retries, or its
+    circuit breaker is open, the next one in the chain gets the remaining budget.
 
-    response = completion(
-        model=LLM_MODEL,
-        messages=[{"role": "user", "content": prompt}],
-        api_key=MISTRAL_API_KEY,  # use API key safely
+    The call is recorded in ``utils.telemetry`` under ``prompt_type``. A
+    caller that wants to add parse results passes its own ``record`` (from
+    ``start_llm_call``) and submits it with ``record_llm_call`` afterwards.
+    """
+    _require_api_key()
+
+    owns_record = record is None
+    if owns_record:
+        record = start_llm_call(prompt_type)
+    chain = [model] if model else model_router.route(record.prompt_type)
+    record.model = chain[0]
+    try:
+        return await _get_response_async(
+            prompt, use_cache, priority, budget, chain, record, cache_validator, sampling_params
+        )
+    except BaseException as e:
+        record.error = str(e) or type(e).__name__
+        raise
+    finally:
+        if owns_record:
+            record_llm_call(record)
+
+
+async def _get_response_async(
+    prompt, use_cache, priority, budget, chain, record, cache_validator, sampling_params
+):
+    use_cache = use_cache and LLM_CACHE_ENABLED
+    if use_cache:
+        for model in chain:
+            cached = _cached_response(llm_cache_key(model, prompt, sampling_params), cache_validator)
+            if cached is not None:
+                record.model = model
+                record.cache_hit = True
+                return cached
+
+    messages = as_messages(prompt)
+    deadline = time.monotonic() + (budget or LLM_CALL_BUDGET_SECONDS)
+    error = None
+    for position, model in enumerate(chain):
+        remaining = deadline - time.monotonic()
+        if position and remaining < llm_retry_policy.min_attempt_timeout:
+            break
+        record.model = model
+        started = time.monotonic()
+        try:
+            content = await _complete_with_retries(
+                model, messages, priority, remaining, record, sampling_params
+            )
+        except BackendError as e:
+            if not isinstance(e, CircuitOpenError):
+                model_router.record(
+                    record.prompt_type, model, time.monotonic() - started, ok=False, fallback=position > 0
+                )
+            error = e
+            if position + 1 < len(chain):
+                print(f"⚠️ {model} failed ({e.message}), falling back to {chain[position + 1]}.")
+                record.fallbacks += 1
+            continue
+
+        model_router.record(
+            record.prompt_type, model, time.monotonic() - started, ok=True, fallback=position > 0
+        )
+        if use_cache:
+            _cache_response(llm_cache_key(model, prompt, sampling_params), content, cache_validator)
+        return content
+
+    raise error
+
+
+async def _complete_with_retries(model, messages, priority, budget, record, sampling_params):
+    async def attempt(timeout):
+        async with llm_slot(messages, priority) as estimated_tokens:
+            response = await llm_backend.acompletion(
+                model=model,
+                messages=messages,
+                api_key=MISTRAL_API_KEY,
+                timeout=timeout,
+                **sampling_params,
+            )
+        usage = getattr(response, "usage", None)
+        if usage is not None and getattr(usage, "total_tokens", None):
+            llm_rate_limiter.adjust_tokens(usage.total_tokens - estimated_tokens)
+        record_prompt_prefix(model, messages, usage)
+        _record_usage(record, messages, response=response)
+        return response.choices[0].message.content
+
+    def on_retry(attempt_number, error):
+        record.retries += 1
+
+    return await call_with_retries_async(
+        "llm",
+        attempt,
+        budget=budget,
+        policy=llm_retry_policy,
+        breaker=get_llm_breaker(model),
+        is_retryable=is_retryable_llm_error,
+        on_retry=on_retry,
     )
-    return response.choices[0].message.content
 
 
-def parse_json_response(response):
-    # Parse the JSON response
+async def _open_stream(model, messages, priority, budget, record, sampling_params):
+    """
+    Start a streamed completion on ``model`` and wait for its first text delta,
+    retrying within ``budget`` like ``_complete_with_retries``. Returns
+    ``(slot, chunks, first_delta)``: the caller owns the rate/concurrency
+    ``slot`` (an ``AsyncExitStack``) until the stream ends. ``first_delta`` is
+    empty if the completion had no text.
+    """
+    async def attempt(timeout):
+        slot = AsyncExitStack()
+        try:
+            await slot.enter_async_context(llm_slot(messages, priority))
+            response = await llm_backend.acompletion(
+                model=model,
+                messages=messages,
+                api_key=MISTRAL_API_KEY,
+                stream=True,
+                timeout=LLM_CALL_BUDGET_SECONDS,
+                **sampling_params,
+            )
+            chunks = response.__aiter__()
+            while True:
+                try:
+                    chunk = await chunks.__anext__()
+                except StopAsyncIteration:
+                    return slot, chunks, ""
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    return slot, chunks, delta
+        except BaseException as e:
+            await slot.__aexit__(type(e), e, e.__traceback__)
+            raise
+
+    def on_retry(attempt_number, error):
+        record.retries += 1
+
+    return await call_with_retries_async(
+        "llm",
+        attempt,
+        budget=budget,
+        policy=llm_retry_policy,
+        breaker=get_llm_breaker(model),
+        is_retryable=is_retryable_llm_error,
+        on_retry=on_retry,
+    )
+
+
+async def stream_response_from_llm_async(
+    prompt,
+    use_cache=True,
+    priority=PRIORITY_INTERACTIVE,
+    prompt_type="other",
+    record=None,
+    model=None,
+    cache_validator=is_json_response,
+    **sampling_params,
+):
+    """
+    Stream the LLM completion as text deltas.
+
+    A cached response is yielded as a single chunk; a freshly streamed one is
+    cached once complete if ``cache_validator`` accepts it. Until the first
+    delta arrives a failed stream is retried, and then moves down the routed
+    model chain, exactly like ``get_response_from_llm_async`` (same retry
+    policy and per-model breakers); once text has been yielded it is never
+    retried. Telemetry (including time to first token) is recorded as for
+    ``get_response_from_llm_async``.
+    """
+    _require_api_key()
+
+    owns_record = record is None
+    if owns_record:
+        record = start_llm_call(prompt_type)
+    chain = [model] if model else model_router.route(record.prompt_type)
+    record.model = chain[0]
+    record.streamed = True
     try:
-        response = response.strip("```json").strip("```")
-        return json.loads(response)
-    except json.JSONDecodeError:
-        return None
+        use_cache = use_cache and LLM_CACHE_ENABLED
+        if use_cache:
+            cached = _cached_response(llm_cache_key(chain[0], prompt, sampling_params), cache_validator)
+            if cached is not None:
+                record.cache_hit = True
+                record.mark_first_token()
+                yield cached
+                return
+
+        messages = as_messages(prompt)
+        deadline = time.monotonic() + LLM_CALL_BUDGET_SECONDS
+        opened = error = None
+        for position, model in enumerate(chain):
+            remaining = deadline - time.monotonic()
+            if position and remaining < llm_retry_policy.min_attempt_timeout:
+                break
+            record.model = model
+            started = time.monotonic()
+            try:
+                opened = await _open_stream(model, messages, priority, remaining, record, sampling_params)
+            except BackendError as e:
+                if not isinstance(e, CircuitOpenError):
+                    model_router.record(
+                        record.prompt_type, model, time.monotonic() - started, ok=False, fallback=position > 0
+                    )
+                error = e
+                if position + 1 < len(chain):
+                    print(f"⚠️ {model} failed ({e.message}), falling back to {chain[position + 1]}.")
+                    record.fallbacks += 1
+                continue
+            fallback = position > 0
+            break
+        if opened is None:
+            raise error
+
+        slot, chunks, delta = opened
+        record_prompt_prefix(model, messages)
+        parts = []
+        try:
+            while True:
+                if delta:
+                    record.mark_first_token()
+                    parts.append(delta)
+                    yield delta
+                try:
+                    chunk = await chunks.__anext__()
+                except StopAsyncIteration:
+                    break
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+        except BaseException as e:
+            if isinstance(e, Exception):
+                # Output may already be consumed: the error ends the stream.
+                if is_retryable_llm_error(e):
+                    get_llm_breaker(model).record_failure()
+                model_router.record(record.prompt_type, model, record.elapsed(), ok=False, fallback=fallback)
+            await slot.__aexit__(type(e), e, e.__traceback__)
+            raise
+        await slot.aclose()
+        model_router.record(record.prompt_type, model, record.elapsed(), ok=True, fallback=fallback)
+
+        content = "".join(parts)
+        _record_usage(record, messages, content=content)
+        if use_cache:
+            _cache_response(llm_cache_key(model, prompt, sampling_params), content, cache_validator)
+    except BaseException as e:
+        record.error = str(e) or type(e).__name__
+        raise
+    finally:
+        if owns_record:
+            record_llm_call(record)
+
+
+def get_llm_cache_stats():
+    """Hit/miss counters and tier sizes of the LLM response cache."""
+    return llm_cache.stats()
+
+
+def get_llm_limiter_stats():
+    """Queue depth, wait times and remaining budget of the LLM rate/concurrency governor."""
+    stats = llm_rate_limiter.stats()
+    stats["concurrency"] = llm_concurrency.stats()
+    with _breakers_lock:
+        breakers = list(_breakers.items())
+    stats["breakers"] = {model: breaker.stats() for model, breaker in breakers}
+    return stats
+
+
+def _record_usage(record, messages, response=None, content=None):
+    """Fill token counts and estimated cost from the response usage (or by counting)."""
+    usage = getattr(response, "usage", None)
+    if usage is not None and getattr(usage, "prompt_tokens", None) is not None:
+        record.prompt_tokens = usage.prompt_tokens or 0
+        record.completion_tokens = usage.completion_tokens or 0
+    else:
+        # Streams carry no usage block: count locally.
+        try:
+            record.prompt_tokens = token_counter(model=record.model, messages=messages)
+            record.completion_tokens = token_counter(model=record.model, text=content or "")
+        except Exception:
+            record.prompt_tokens = estimate_tokens(messages) - LLM_COMPLETION_TOKEN_ESTIMATE
+            record.completion_tokens = len(content or "") // 4
+    try:
+        if response is not None:
+            record.cost_usd = completion_cost(completion_response=response)
+        else:
+            record.cost_usd = completion_cost(
+                model=record.model, messages=messages, completion=content or ""
+            )
+    except Exception:
+        record.cost_usd = 0.0  # model missing from litellm's price map
+
+
+def parse_json_response(response, record=None):
+    """
+    Parse the first JSON object out of an LLM response (None if there is none).
+    Whether lenient extraction was needed is noted on the telemetry ``record``.
+    """
+    parsed, fell_back = extract_json_object_with_fallback(response)
+    if record is not None:
+        record.parse_fallback = fell_back and parsed is not None
+        record.parse_failed = parsed is None
+    return parsed
@@ -1,15 +1,120 @@
+import io
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
 from pypdf import PdfReader
-import PyPDF2
+
+# Caps so an oversized upload (e.g. a 200-page portfolio) can't stall a session.
+PDF_MAX_PAGES = int(os.environ.get("PDF_MAX_PAGES", 40))
+PDF_MAX_CHARS = int(os.environ.get("PDF_MAX_CHARS", 100000))
+# Documents with at least this many pages are extracted across a process pool.
+PDF_PARALLEL_MIN_PAGES = int(os.environ.get("PDF_PARALLEL_MIN_PAGES", 16))
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", min(4, os.cpu_count() or 1)))
+
+_pool = None
+_pool_size = 0
+_pool_lock = threading.Lock()
+
+
+def _get_pool(workers):
+    """Shared process pool, grown if a caller asks for more workers."""
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is None or _pool_size < workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers)
+            _pool_size = workers
+        return _pool
+
+
+def read_pdf_bytes(source):
+    """Raw bytes of a PDF given as a path or a file-like object (e.g. a Streamlit upload)."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return f.read()
+    if hasattr(source, "getvalue"):
+        return source.getvalue()
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return source.read()
+
+
+def _page_text(page):
+    try:
+        return page.extract_text() or ""
+    except Exception as e:
+        print(f"⚠️ Could not extract text from PDF page: {e}")
+        return ""
+
+
+def _extract_page_range(data, start, stop):
+    """Worker: text of pages [start, stop) of the PDF in ``data``."""
+    reader = PdfReader(io.BytesIO(data))
+    return [_page_text(reader.pages[i]) for i in range(start, stop)]
+
+
+def iter_pdf_pages(source, max_pages=PDF_MAX_PAGES, workers=PDF_WORKERS):
+    """
+    Yield the text of each page, in order, up to ``max_pages``.
+
+    ``source`` is a path or a file-like object. Large documents are split
+    into page ranges extracted in parallel by a process pool; pages are still
+    yielded in order as soon as their range is done. Closing the generator
+    early cancels ranges that have not started.
+    """
+    data = read_pdf_bytes(source)
+    reader = PdfReader(io.BytesIO(data))
+    total = len(reader.pages)
+    count = min(total, max_pages) if max_pages else total
+    if count < total:
+        print(f"⚠️ PDF has {total} pages; only the first {count} are read.")
+
+    if workers <= 1 or count < PDF_PARALLEL_MIN_PAGES:
+        for i in range(count):
+            yield _page_text(reader.pages[i])
+        return
+
+    chunk = max(4, -(-count // (workers * 2)))
+    starts = list(range(0, count, chunk))
+    results = _get_pool(workers).map(
+        _extract_page_range,
+        [data] * len(starts),
+        starts,
+        [min(start + chunk, count) for start in starts],
+    )
+    for pages in results:
+        yield from pages
+
+
+def extract_pdf_text(source, max_pages=PDF_MAX_PAGES, max_chars=PDF_MAX_CHARS, workers=PDF_WORKERS):
+    """Text of a PDF (path or file-like), with page and character caps applied (0 disables a cap)."""
+    try:
+        parts = []
+        length = 0
+        pages = iter_pdf_pages(source, max_pages=max_pages, workers=workers)
+        try:
+            for text in pages:
+                parts.append(text)
+                length += len(text) + 1
+                if max_chars and length >= max_chars:
+                    print(f"⚠️ PDF text truncated at {max_chars} characters.")
+                    break
+        finally:
+            pages.close()
+    except Exception as e:
+        print(f"⚠️ Could not read PDF: {e}")
+        return ""
+
+    text = "\n".join(parts)
+    return text[:max_chars] if max_chars else text
 
 
 def load_content(file_path):
     # check if pdf then below code will be executed else add read txt file
     if file_path.endswith(".pdf"):
-        pdf = PdfReader(file_path)
-        text = ""
-        for page in pdf.pages:
-            text += page.extract_text()
-        return text
+        return extract_pdf_text(file_path)
     elif file_path.endswith(".txt"):
         with open(file_path, "r") as file:
             return file.read()
@@ -20,10 +125,4 @@ def load_content(file_path):
 
 def load_content_streamlit(upload_file):
     if upload_file is not None:
-        # Read the PDF file
-        pdf_reader = PyPDF2.PdfReader(upload_file)
-        # Extract the content
-        content = ""
-        for page in pdf_reader.pages:
-            content += page.extract_text()
-        return content
\ No newline at end of file
+        return extract_pdf_text(upload_file)
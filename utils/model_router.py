@@ -0,0 +1,228 @@
+"""
+Per-prompt-type model routing with fallback chains and latency-based demotion.
+
+Each prompt type maps to an ordered chain of models. Calls try the chain in
+order; when the rolling latency percentile of a chain's primary model exceeds
+the prompt type's SLO, the primary is demoted behind the next model for a
+cool-down period. Every decision is counted and exported as metrics.
+
+Routes can be overridden per prompt type with environment variables, e.g.
+
+    LLM_ROUTE_NEXT_QUESTION_GENERATION="mistral/mistral-small-latest,mistral/mistral-large-latest"
+    LLM_SLO_NEXT_QUESTION_GENERATION="2.5"
+"""
+import os
+import threading
+import time
+from collections import deque
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+LLM_MODEL = os.environ.get("LLM_MODEL", "mistral/mistral-large-latest")
+LLM_MODEL_FAST = os.environ.get("LLM_MODEL_FAST", "mistral/mistral-small-latest")
+LLM_ROUTING_ENABLED = os.environ.get("LLM_ROUTING_ENABLED", "false").lower() in ("1", "true", "yes")
+LLM_ROUTER_PERCENTILE = float(os.environ.get("LLM_ROUTER_PERCENTILE", 0.9))
+LLM_ROUTER_WINDOW = int(os.environ.get("LLM_ROUTER_WINDOW", 50))
+LLM_ROUTER_MIN_SAMPLES = int(os.environ.get("LLM_ROUTER_MIN_SAMPLES", 10))
+LLM_ROUTER_COOLDOWN_SECONDS = float(os.environ.get("LLM_ROUTER_COOLDOWN_SECONDS", 120))
+
+# prompt type -> (model chain, latency SLO in seconds or None)
+DEFAULT_ROUTES = {
+    # Latency-critical: the candidate is waiting for the next question.
+    "next_question_generation": ([LLM_MODEL_FAST, LLM_MODEL], 3.0),
+    "speculative_question_generation": ([LLM_MODEL_FAST, LLM_MODEL], None),
+    # Quality-critical and off the critical path.
+    "feedback_generation": ([LLM_MODEL, LLM_MODEL_FAST], 20.0),
+    "batch_feedback_generation": ([LLM_MODEL, LLM_MODEL_FAST], 30.0),
+    "response_analysis": ([LLM_MODEL, LLM_MODEL_FAST], 6.0),
+    "basic_details": ([LLM_MODEL, LLM_MODEL_FAST], 15.0),
+    "job_description_analysis": ([LLM_MODEL, LLM_MODEL_FAST], 20.0),
+}
+
+
+def _dedupe(models):
+    chain = []
+    for model in models:
+        model = model.strip()
+        if model and model not in chain:
+            chain.append(model)
+    return chain
+
+
+def load_routes(defaults=DEFAULT_ROUTES):
+    """Default routes with ``LLM_ROUTE_<TYPE>`` / ``LLM_SLO_<TYPE>`` overrides applied."""
+    routes = {}
+    for prompt_type, (chain, slo) in defaults.items():
+        suffix = prompt_type.upper()
+        chain_env = os.environ.get(f"LLM_ROUTE_{suffix}")
+        slo_env = os.environ.get(f"LLM_SLO_{suffix}")
+        routes[prompt_type] = (
+            _dedupe(chain_env.split(",") if chain_env else chain),
+            float(slo_env) if slo_env else slo,
+        )
+    return routes
+
+
+class ModelRouter:
+    """
+    Chooses the model chain for a prompt type and demotes slow primaries.
+
+    Latencies are tracked per (prompt type, model) in a sliding window. A
+    demoted primary is moved behind the next model in its chain; after
+    ``cooldown`` seconds it is restored with a fresh window, so it has to be
+    slow again (over ``min_samples`` calls) to be demoted again.
+    """
+
+    def __init__(
+        self,
+        routes=None,
+        default_model=LLM_MODEL,
+        enabled=LLM_ROUTING_ENABLED,
+        percentile=LLM_ROUTER_PERCENTILE,
+        window=LLM_ROUTER_WINDOW,
+        min_samples=LLM_ROUTER_MIN_SAMPLES,
+        cooldown=LLM_ROUTER_COOLDOWN_SECONDS,
+    ):
+        self.routes = routes if routes is not None else load_routes()
+        self.default_model = default_model
+        self.enabled = enabled
+        self.percentile = percentile
+        self.window = window
+        self.min_samples = min_samples
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._latencies = {}  # (prompt_type, model) -> deque of seconds
+        self._demoted_until = {}  # prompt_type -> monotonic deadline
+        self._decisions = {}  # (prompt_type, model, reason) -> count
+        self._outcomes = {}  # (prompt_type, model, "ok"|"error") -> count
+        self._demotions = {}  # prompt_type -> count
+
+    def route(self, prompt_type):
+        """Ordered list of models to try for ``prompt_type``."""
+        if not self.enabled or prompt_type not in self.routes:
+            chain, reason = [self.default_model], "default"
+        else:
+            chain = list(self.routes[prompt_type][0]) or [self.default_model]
+            reason = "primary"
+            with self._lock:
+                until = self._demoted_until.get(prompt_type)
+                if until is not None and time.monotonic() >= until:
+                    # Cool-down over: give the primary a fresh window.
+                    del self._demoted_until[prompt_type]
+                    self._latencies.pop((prompt_type, chain[0]), None)
+                    until = None
+            if until is not None and len(chain) > 1:
+                chain[0], chain[1] = chain[1], chain[0]
+                reason = "demoted"
+        self._count(self._decisions, (prompt_type, chain[0], reason))
+        return chain
+
+    def record(self, prompt_type, model, latency, ok=True, fallback=False):
+        """Feed back the outcome of a call made on ``model``."""
+        self._count(self._outcomes, (prompt_type, model, "ok" if ok else "error"))
+        if fallback:
+            self._count(self._decisions, (prompt_type, model, "fallback"))
+        if not self.enabled or prompt_type not in self.routes:
+            return
+
+        chain, slo = self.routes[prompt_type]
+        with self._lock:
+            samples = self._latencies.setdefault(
+                (prompt_type, model), deque(maxlen=self.window)
+            )
+            samples.append(latency)
+            if (
+                slo is None
+                or len(chain) < 2
+                or model != chain[0]
+                or prompt_type in self._demoted_until
+                or len(samples) < self.min_samples
+            ):
+                return
+            rolling = self._rolling(samples)
+            if rolling <= slo:
+                return
+            self._demoted_until[prompt_type] = time.monotonic() + self.cooldown
+            self._demotions[prompt_type] = self._demotions.get(prompt_type, 0) + 1
+        print(
+            f"⚠️ {model} p{int(self.percentile * 100)} latency {rolling:.2f}s exceeds the "
+            f"{slo:.2f}s SLO for {prompt_type}; routing to {chain[1]} for {self.cooldown:.0f}s."
+        )
+
+    def _rolling(self, samples):
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(self.percentile * len(ordered)))]
+
+    def _count(self, counters, key):
+        with self._lock:
+            counters[key] = counters.get(key, 0) + 1
+
+    def stats(self):
+        with self._lock:
+            now = time.monotonic()
+            routes = {}
+            for prompt_type, (chain, slo) in self.routes.items():
+                primary = self._latencies.get((prompt_type, chain[0])) if chain else None
+                until = self._demoted_until.get(prompt_type)
+                routes[prompt_type] = {
+                    "chain": list(chain),
+                    "slo_s": slo,
+                    "rolling_latency_s": round(self._rolling(primary), 4) if primary else None,
+                    "demoted_for_s": round(until - now, 1) if until is not None else 0.0,
+                    "demotions": self._demotions.get(prompt_type, 0),
+                }
+            return {
+                "enabled": self.enabled,
+                "routes": routes,
+                "decisions": {"/".join(key): count for key, count in self._decisions.items()},
+                "outcomes": {"/".join(key): count for key, count in self._outcomes.items()},
+            }
+
+    def to_prometheus(self):
+        """Routing decisions, outcomes, demotions and current state in Prometheus text format."""
+        with self._lock:
+            decisions = dict(self._decisions)
+            outcomes = dict(self._outcomes)
+            demotions = dict(self._demotions)
+            demoted = {
+                prompt_type: 1 if prompt_type in self._demoted_until else 0
+                for prompt_type in self.routes
+            }
+        lines = [
+            "# HELP llm_route_decisions_total Models chosen by the router, by reason.",
+            "# TYPE llm_route_decisions_total counter",
+        ]
+        for (prompt_type, model, reason), count in sorted(decisions.items()):
+            lines.append(
+                f'llm_route_decisions_total{{prompt_type="{prompt_type}",model="{model}",reason="{reason}"}} {count}'
+            )
+        lines += [
+            "# HELP llm_route_outcomes_total Outcomes of routed calls per model.",
+            "# TYPE llm_route_outcomes_total counter",
+        ]
+        for (prompt_type, model, outcome), count in sorted(outcomes.items()):
+            lines.append(
+                f'llm_route_outcomes_total{{prompt_type="{prompt_type}",model="{model}",outcome="{outcome}"}} {count}'
+            )
+        lines += [
+            "# HELP llm_route_demotions_total Times a primary model was demoted for breaching its SLO.",
+            "# TYPE llm_route_demotions_total counter",
+        ]
+        for prompt_type, count in sorted(demotions.items()):
+            lines.append(f'llm_route_demotions_total{{prompt_type="{prompt_type}"}} {count}')
+        lines += [
+            "# HELP llm_route_demoted Whether the prompt type's primary model is currently demoted.",
+            "# TYPE llm_route_demoted gauge",
+        ]
+        for prompt_type, value in sorted(demoted.items()):
+            lines.append(f'llm_route_demoted{{prompt_type="{prompt_type}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+model_router = ModelRouter()
+
+
+def get_model_router_stats():
+    return model_router.stats()
@@ -1,3 +1,10 @@
+from utils.retrieval import (
+    CONTEXT_RETRIEVAL,
+    SOURCE_JOB_DESCRIPTION,
+    SOURCE_RESUME,
+    retrieve_context,
+)
+
 basic_details = """
 Task: Act as an expert resume parser and talent acquisition specialist. Your role is to meticulously analyze resumes and extract critical information with precision and accuracy.
 
@@ -39,8 +46,7 @@ Task: Act as an expert interviewer. Generate the next interview question that bu
 Context:
 - Previous Question: {previous_question}
 - Candidate’s Response: {candidate_response}
-- Job Description: {job_description}
-- Resume Highlights: {resume_highlights}
+- Job Description and Resume Highlights: see the session context
 
 Guidelines:
 1. Analyze the candidate’s previous response:
@@ -79,8 +85,7 @@ Be encouraging while also pointing out specific areas for improvement.
 Context:
 - Interview Question: {question}
 - Candidate Response: {candidate_response}
-- Job Description: {job_description}
-- Resume Highlights: {resume_highlights}
+- Job Description and Resume Highlights: see the session context
 
 Evaluation Rules:
 1. Focus on BOTH **content quality** (technical depth, relevance, examples) 
@@ -107,3 +112,235 @@ Response Format:
   "score": <integer 1–10>
 }}
 """
+
+
+response_analysis = """
+Task: You are acting as a professional technical interviewer and career coach.
+In a single pass, (a) evaluate the candidate's response to the current question and
+(b) generate the next interview question that builds naturally from the conversation.
+
+Context:
+- Interview Question: {question}
+- Candidate Response: {candidate_response}
+- Job Description and Resume Highlights: see the session context
+
+Evaluation Rules:
+1. Focus on BOTH **content quality** (technical depth, relevance, examples)
+   AND **communication clarity** (structure, flow, confidence).
+2. Do NOT dismiss a response as simply "unclear" if technical details are present.
+   Highlight strengths and give **specific, actionable advice** for improvement.
+3. Keep feedback **balanced**: always mention at least one strength.
+4. Feedback length: max 80 words.
+5. Scoring (0–10):
+   - 9–10: Excellent (strong technical + strong clarity)
+   - 7–8: Good (technical strong, minor clarity issues OR vice versa)
+   - 5–6: Adequate (basic attempt, some missing depth/clarity)
+   - 3–4: Weak (minimal structure, lacks depth)
+   - 1–2: Very poor (off-topic or irrelevant)
+
+Next Question Guidelines:
+1. Explore strong points worth deeper discussion or follow up on gaps in the response.
+2. Open-ended (no yes/no), clear and concise, relevant to the role and candidate background.
+3. Encourage storytelling with examples.
+4. Avoid repeating previous questions, leading or biased phrasing, and overly personal topics.
+
+Output Requirements:
+- Return ONLY valid JSON, nothing else.
+- Ensure proper JSON syntax with double quotes.
+
+Response Format:
+{{
+  "feedback": "<short, constructive feedback with strengths and improvements>",
+  "score": <integer 1–10>,
+  "next_question": "<Thoughtfully crafted open-ended question>"
+}}
+"""
+
+
+speculative_question_generation = """
+Task: Act as an expert interviewer. The candidate is currently answering the question below.
+Before hearing the answer, anticipate the most likely directions the answer will take and
+prepare one strong follow-up question for each direction.
+
+Context:
+- Current Question: {question}
+- Job Description and Resume Highlights: see the session context
+
+Guidelines:
+1. Produce {num_candidates} distinct follow-up questions covering different likely answer topics.
+2. Each question must be open-ended, clear, concise and relevant to the role and candidate background.
+3. For each question, list 3-8 lowercase keywords that the candidate's answer would need to
+   mention for the question to be a natural follow-up (tools, projects, skills, concepts).
+
+Output Requirements:
+- Respond ONLY in valid JSON
+- No extra text
+- Strict syntax
+
+Response Format:
+{{
+    "candidates": [
+        {{"question": "<follow-up question>", "keywords": ["<keyword>", "<keyword>"]}}
+    ]
+}}
+"""
+
+
+batch_feedback_generation = """
+Task: You are acting as a professional technical interviewer and career coach.
+The interview is over. Evaluate EACH of the candidate's answers below in a fair and
+constructive way, independently of the others. Be encouraging while also pointing out
+specific areas for improvement.
+
+Context:
+- Job Description and Resume Highlights: see the session context
+
+Answers to evaluate ({count}):
+{answers}
+
+Evaluation Rules:
+1. Focus on BOTH **content quality** (technical depth, relevance, examples)
+   AND **communication clarity** (structure, flow, confidence).
+2. Do NOT dismiss a response as simply "unclear" if technical details are present.
+   Instead, highlight strengths (e.g., problem-solving method, tools mentioned)
+   and give **specific, actionable advice** for improvement (e.g., "Provide a real project example").
+3. Keep feedback **balanced**: always mention at least one strength.
+4. Feedback length: max 80 words per answer.
+5. Scoring (0–10):
+   - 9–10: Excellent (strong technical + strong clarity)
+   - 7–8: Good (technical strong, minor clarity issues OR vice versa)
+   - 5–6: Adequate (basic attempt, some missing depth/clarity)
+   - 3–4: Weak (minimal structure, lacks depth)
+   - 1–2: Very poor (off-topic or irrelevant)
+
+Output Requirements:
+- Return ONLY valid JSON, nothing else.
+- Ensure proper JSON syntax with double quotes.
+- Exactly one entry per answer, using the answer's number as "index".
+
+Response Format:
+{{
+  "evaluations": [
+    {{"index": <answer number>, "feedback": "<short, constructive feedback>", "score": <integer 1–10>}}
+  ]
+}}
+"""
+
+
+job_description_analysis = """
+Task: Act as an experienced technical recruiter. Distill the job description below into a
+compact structured summary that an interviewer can use instead of the full posting.
+
+Job Description:
+{job_description}
+
+Instructions:
+1. Identify the role title and seniority level (e.g. junior, mid, senior, staff, lead).
+2. List the required skills and technologies (at most 12), most important first.
+3. List nice-to-have skills (at most 6).
+4. List 3-6 focus areas the interview should probe (e.g. system design, incident response, mentoring).
+5. Summarize the key responsibilities in at most 5 short items.
+6. Use short phrases, not sentences. Leave out benefits, company boilerplate and legal text.
+
+Output Requirements:
+- Respond ONLY in valid JSON
+- No extra text or explanation
+- Ensure proper JSON syntax
+
+Response Format:
+{{
+    "role": "<role title>",
+    "seniority": "<seniority level>",
+    "required_skills": ["<skill>", "<skill>"],
+    "nice_to_have": ["<skill>"],
+    "focus_areas": ["<focus area>"],
+    "responsibilities": ["<responsibility>"]
+}}
+"""
+
+
+def format_answers_for_batch(conversations):
+    """Numbered question/answer block for ``batch_feedback_generation``."""
+    return "\n\n".join(
+        f"[{i}] Interview Question: {conv['Question']}\n    Candidate Response: {conv['Candidate Answer']}"
+        for i, conv in enumerate(conversations, 1)
+    )
+
+
+# Session-scoped prompts are sent as two chat messages: a system message that
+# is byte-identical for every call in an interview (interviewer role, job
+# description, resume highlights) followed by the per-turn task prompt. Keeping
+# the large static part first lets providers reuse their prefix/KV cache.
+session_context = """
+You are an expert technical interviewer and career coach running a structured interview
+for the role below. You will receive a series of tasks for this candidate, such as
+generating interview questions and evaluating answers. Follow each task's output
+requirements exactly and respond only with the JSON it asks for.
+
+Job Description:
+{job_description}
+
+Resume Highlights:
+{resume_highlights}
+"""
+
+
+def format_resume_highlights(resume_highlights):
+    """Render highlights deterministically so the session prefix stays byte-stable."""
+    if isinstance(resume_highlights, (list, tuple)):
+        return "\n".join(f"- {str(item).strip()}" for item in resume_highlights)
+    return str(resume_highlights).strip()
+
+
+# With context retrieval (utils.retrieval) the system prefix carries only the
+# interviewer role, and each turn appends the excerpts relevant to it.
+session_context_retrieval = """
+You are an expert technical interviewer and career coach running a structured interview.
+You will receive a series of tasks for this candidate, such as generating interview
+questions and evaluating answers. Each task ends with the excerpts of the job description
+and resume highlights that are relevant to it. Follow each task's output requirements
+exactly and respond only with the JSON it asks for.
+"""
+
+
+context_excerpts = """
+Session context (relevant excerpts):
+
+Job Description:
+{job_description}
+
+Resume Highlights:
+{resume_highlights}
+"""
+
+
+def build_session_messages(task_prompt, job_description, resume_highlights, query=None):
+    """
+    Chat messages for a session-scoped task: stable system prefix + per-turn user message.
+
+    When ``query`` is given and context retrieval is enabled, only the job
+    description and resume chunks relevant to it are sent, after the task.
+    """
+    if query is not None and CONTEXT_RETRIEVAL:
+        excerpts = retrieve_context(query, job_description, resume_highlights)
+        if excerpts is not None:
+            return [
+                {"role": "system", "content": session_context_retrieval},
+                {
+                    "role": "user",
+                    "content": task_prompt + context_excerpts.format(
+                        job_description="\n".join(excerpts[SOURCE_JOB_DESCRIPTION]) or "(none relevant)",
+                        resume_highlights=format_resume_highlights(excerpts[SOURCE_RESUME]) or "(none relevant)",
+                    ),
+                },
+            ]
+    return [
+        {
+            "role": "system",
+            "content": session_context.format(
+                job_description=str(job_description).strip(),
+                resume_highlights=format_resume_highlights(resume_highlights),
+            ),
+        },
+        {"role": "user", "content": task_prompt},
+    ]
@@ -0,0 +1,241 @@
+"""
+Persistent bank of generated interview questions with similarity lookup.
+
+Follow-up questions for the same job description repeat heavily across
+candidates. Every generated question is stored with the JD's hash (scoped to
+the LLM backend and model chain that produced it) and a compact context
+vector of the turn that produced it (previous question + candidate answer,
+as signed hashed word and character n-gram features).
+Before calling the LLM, ``get_next_question`` looks up the nearest banked
+context for the same JD; a match above ``QUESTION_BANK_MIN_SIMILARITY`` is
+served instantly. ``QUESTION_BANK_MAX_HIT_RATIO`` caps the share of lookups
+served from the bank so the bank keeps growing and interviews stay varied.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+import numpy as np
+from dotenv import load_dotenv
+
+from utils.jd_analysis import job_description_fingerprint
+from utils.llm_call import llm_output_version
+from utils.telemetry import llm_telemetry
+
+load_dotenv()
+
+QUESTION_BANK = os.environ.get("QUESTION_BANK", "false").lower() in ("1", "true", "yes")
+QUESTION_BANK_PATH = os.environ.get("QUESTION_BANK_PATH", ".cache/question_bank.sqlite3")
+QUESTION_BANK_MIN_SIMILARITY = float(os.environ.get("QUESTION_BANK_MIN_SIMILARITY", 0.8))
+QUESTION_BANK_MAX_HIT_RATIO = float(os.environ.get("QUESTION_BANK_MAX_HIT_RATIO", 0.5))
+QUESTION_BANK_DIM = int(os.environ.get("QUESTION_BANK_DIM", 1024))
+QUESTION_BANK_MAX_PER_JD = int(os.environ.get("QUESTION_BANK_MAX_PER_JD", 500))
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]")
+
+
+def _features(text):
+    words = _WORD.findall(str(text).lower())
+    features = list(words)
+    features += [f"{a} {b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"<{word}>"
+        features += [padded[i:i + 3] for i in range(len(padded) - 2)]
+    return features
+
+
+def context_vector(text, dim=QUESTION_BANK_DIM):
+    """L2-normalized signed feature-hashing vector of ``text`` (float32, ``dim``)."""
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature in _features(text):
+        h = zlib.crc32(feature.encode("utf-8"))
+        vector[h % dim] += 1.0 if (h >> 31) & 1 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class QuestionBank:
+    """
+    Banked questions per JD hash: SQLite for persistence, with each JD's
+    context vectors held in memory as one matrix for a single matmul lookup.
+    Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        path=QUESTION_BANK_PATH,
+        min_similarity=QUESTION_BANK_MIN_SIMILARITY,
+        max_hit_ratio=QUESTION_BANK_MAX_HIT_RATIO,
+        dim=QUESTION_BANK_DIM,
+        max_per_jd=QUESTION_BANK_MAX_PER_JD,
+        namespace=None,
+    ):
+        self.path = path
+        # Questions from another backend / model chain are never served.
+        self.namespace = namespace or llm_output_version("next_question_generation")
+        self.min_similarity = min_similarity
+        self.max_hit_ratio = max_hit_ratio
+        self.dim = dim
+        self.max_per_jd = max_per_jd
+        self._lock = threading.Lock()
+        self._conn = None
+        self._banks = {}  # jd hash -> (ids, questions, matrix)
+        self._stats = {"lookups": 0, "hits": 0, "misses": 0, "capped": 0, "added": 0}
+
+        if path:
+            try:
+                self._conn = self._open(path)
+            except sqlite3.Error as e:
+                print(f"⚠️ Could not open question bank at {path}: {e}. Using memory only.")
+
+    def _open(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS questions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                jd_hash TEXT NOT NULL,
+                question TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                served INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS questions_jd_hash ON questions (jd_hash)")
+        return conn
+
+    def _bank(self, jd_hash):
+        """(ids, questions, matrix) for a JD, loaded from disk on first use. Caller holds the lock."""
+        bank = self._banks.get(jd_hash)
+        if bank is not None:
+            return bank
+        ids, questions, vectors = [], [], []
+        if self._conn is not None:
+            rows = self._conn.execute(
+                "SELECT id, question, vector FROM questions WHERE jd_hash = ? ORDER BY id",
+                (jd_hash,),
+            ).fetchall()
+            for row_id, question, blob in rows:
+                vector = np.frombuffer(blob, dtype=np.float32)
+                if vector.shape[0] == self.dim:
+                    ids.append(row_id)
+                    questions.append(question)
+                    vectors.append(vector)
+        matrix = np.vstack(vectors) if vectors else np.zeros((0, self.dim), dtype=np.float32)
+        bank = (ids, questions, matrix)
+        self._banks[jd_hash] = bank
+        return bank
+
+    def _jd_hash(self, job_description):
+        return f"{self.namespace}:{job_description_fingerprint(job_description)}"
+
+    def lookup(self, job_description, context, exclude=()):
+        """
+        Banked question whose context is most similar to ``context`` for this
+        JD, or ``None`` if there is no confident match (or the hit-ratio cap
+        says this lookup should go to the LLM).
+        """
+        jd_hash = self._jd_hash(job_description)
+        query = context_vector(context, self.dim)
+        excluded = {str(q).strip() for q in exclude}
+        with self._lock:
+            self._stats["lookups"] += 1
+            ids, questions, matrix = self._bank(jd_hash)
+            if not questions:
+                self._stats["misses"] += 1
+                return None
+            similarities = matrix @ query
+            match = None
+            for i in np.argsort(-similarities):
+                if similarities[i] < self.min_similarity:
+                    break
+                if questions[i] not in excluded:
+                    match = i
+                    break
+            if match is None:
+                self._stats["misses"] += 1
+                return None
+            if self._stats["hits"] + 1 > self.max_hit_ratio * self._stats["lookups"]:
+                self._stats["capped"] += 1
+                return None
+            self._stats["hits"] += 1
+            if self._conn is not None and ids[match] is not None:
+                self._conn.execute(
+                    "UPDATE questions SET served = served + 1 WHERE id = ?", (ids[match],)
+                )
+            return questions[match]
+
+    def add(self, job_description, context, question):
+        """Bank a freshly generated question for this JD and turn context."""
+        question = str(question).strip()
+        if not question:
+            return
+        jd_hash = self._jd_hash(job_description)
+        vector = context_vector(context, self.dim)
+        with self._lock:
+            ids, questions, matrix = self._bank(jd_hash)
+            row_id = None
+            if self._conn is not None:
+                row_id = self._conn.execute(
+                    "INSERT INTO questions (jd_hash, question, vector, created_at) VALUES (?, ?, ?, ?)",
+                    (jd_hash, question, vector.tobytes(), time.time()),
+                ).lastrowid
+            ids, questions = ids + [row_id], questions + [question]
+            matrix = np.vstack([matrix, vector[None, :]])
+            if len(questions) > self.max_per_jd:
+                # Drop the oldest entries for this JD.
+                drop = len(questions) - self.max_per_jd
+                if self._conn is not None:
+                    self._conn.executemany(
+                        "DELETE FROM questions WHERE id = ?",
+                        [(i,) for i in ids[:drop] if i is not None],
+                    )
+                ids, questions, matrix = ids[drop:], questions[drop:], matrix[drop:]
+            self._banks[jd_hash] = (ids, questions, matrix)
+            self._stats["added"] += 1
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["hit_ratio"] = stats["hits"] / stats["lookups"] if stats["lookups"] else 0.0
+            stats["banked"] = (
+                self._conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+                if self._conn is not None
+                else sum(len(bank[1]) for bank in self._banks.values())
+            )
+        return stats
+
+    def to_prometheus(self):
+        stats = self.stats()
+        lines = [
+            "# HELP question_bank_lookups_total Question bank lookups by outcome.",
+            "# TYPE question_bank_lookups_total counter",
+        ]
+        for outcome in ("hits", "misses", "capped"):
+            lines.append(f'question_bank_lookups_total{{outcome="{outcome}"}} {stats[outcome]}')
+        lines += [
+            "# HELP question_bank_hit_ratio Share of lookups served from the bank.",
+            "# TYPE question_bank_hit_ratio gauge",
+            f"question_bank_hit_ratio {stats['hit_ratio']:.4f}",
+            "# HELP question_bank_questions Questions currently banked.",
+            "# TYPE question_bank_questions gauge",
+            f"question_bank_questions {stats['banked']}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+question_bank = QuestionBank(path=QUESTION_BANK_PATH if QUESTION_BANK else None)
+if QUESTION_BANK:
+    llm_telemetry.add_collector(question_bank.to_prometheus)
+
+
+def get_question_bank_stats():
+    return question_bank.stats()
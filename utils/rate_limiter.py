@@ -0,0 +1,180 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+
+# Priority classes: lower value is served first.
+PRIORITY_INTERACTIVE = 0  # next-question generation, resume parsing on submit
+PRIORITY_BACKGROUND = 1  # per-answer feedback, speculative questions
+PRIORITY_BATCH = 2  # bulk screening and re-scoring
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_BACKGROUND: "background",
+    PRIORITY_BATCH: "batch",
+}
+
+
+class TokenBucket:
+    """Classic token bucket; ``rate_per_minute`` of 0 or None means unlimited."""
+
+    def __init__(self, rate_per_minute):
+        self.unlimited = not rate_per_minute
+        self.capacity = float(rate_per_minute or 0)
+        self.level = self.capacity
+        self._refill_per_second = self.capacity / 60.0
+        self._updated = time.monotonic()
+
+    def refill(self, now):
+        if self.unlimited:
+            return
+        elapsed = now - self._updated
+        self._updated = now
+        self.level = min(self.capacity, self.level + elapsed * self._refill_per_second)
+
+    def seconds_until(self, amount):
+        """Time until ``amount`` can be taken (0 if available now)."""
+        if self.unlimited:
+            return 0.0
+        # Requests larger than the bucket are admitted once it is full.
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self._refill_per_second
+
+    def take(self, amount):
+        if not self.unlimited:
+            self.level -= amount
+
+
+class RateLimiter:
+    """
+    Process-wide requests/min + tokens/min limiter with priority classes.
+
+    Callers ``await acquire(priority, tokens)`` before hitting the provider.
+    Waiters are admitted strictly by (priority, arrival order), so an
+    interactive call queued behind background work jumps ahead of it. Like
+    ``ConcurrencyLimiter`` it is not bound to one event loop.
+    """
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None, wait_window=512):
+        self._requests = TokenBucket(requests_per_minute)
+        self._tokens = TokenBucket(tokens_per_minute)
+        self._lock = threading.Lock()
+        self._waiters = []  # heap of [priority, seq, loop, future, tokens, enqueued_at]
+        self._seq = itertools.count()
+        self._blocked_until = 0.0
+        self._waits = {p: deque(maxlen=wait_window) for p in PRIORITY_NAMES}
+        self._admitted = {p: 0 for p in PRIORITY_NAMES}
+
+    def _delay_for(self, tokens, now):
+        return max(
+            self._blocked_until - now,
+            self._requests.seconds_until(1),
+            self._tokens.seconds_until(tokens),
+            0.0,
+        )
+
+    def _admit(self, priority, tokens, enqueued_at, now):
+        self._requests.take(1)
+        self._tokens.take(tokens)
+        self._waits[priority].append(now - enqueued_at)
+        self._admitted[priority] += 1
+
+    def _dispatch(self):
+        """Admit as many queued waiters as the buckets allow; return the next poll delay."""
+        with self._lock:
+            now = time.monotonic()
+            self._requests.refill(now)
+            self._tokens.refill(now)
+            while self._waiters:
+                priority, _, loop, future, tokens, enqueued_at = self._waiters[0]
+                if future.done():
+                    heapq.heappop(self._waiters)
+                    continue
+                delay = self._delay_for(tokens, now)
+                if delay > 0:
+                    return delay
+                heapq.heappop(self._waiters)
+                self._admit(priority, tokens, enqueued_at, now)
+                try:
+                    loop.call_soon_threadsafe(_resolve, future)
+                except RuntimeError:
+                    pass
+            return None
+
+    async def acquire(self, priority=PRIORITY_INTERACTIVE, tokens=0):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            now = time.monotonic()
+            self._requests.refill(now)
+            self._tokens.refill(now)
+            if not self._waiters and self._delay_for(tokens, now) == 0:
+                self._admit(priority, tokens, now, now)
+                return
+            future = loop.create_future()
+            heapq.heappush(
+                self._waiters,
+                [priority, next(self._seq), loop, future, tokens, now],
+            )
+
+        delay = self._dispatch()
+        try:
+            while not future.done():
+                try:
+                    await asyncio.wait_for(
+                        asyncio.shield(future), timeout=max(delay or 0.05, 0.01)
+                    )
+                except asyncio.TimeoutError:
+                    delay = self._dispatch()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
+    def adjust_tokens(self, delta):
+        """Correct the token bucket once actual usage is known (positive = used more)."""
+        with self._lock:
+            self._tokens.take(delta)
+
+    def backoff(self, seconds):
+        """Stop admitting requests for ``seconds`` (e.g. after a provider 429)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+    def stats(self):
+        with self._lock:
+            queued = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _, _, future, _, _ in self._waiters:
+                if not future.done():
+                    queued[PRIORITY_NAMES.get(priority, str(priority))] += 1
+            waits = {}
+            for priority, samples in self._waits.items():
+                ordered = sorted(samples)
+                waits[PRIORITY_NAMES[priority]] = {
+                    "admitted": self._admitted[priority],
+                    "p50_wait_s": _percentile(ordered, 0.50),
+                    "p95_wait_s": _percentile(ordered, 0.95),
+                    "max_wait_s": round(ordered[-1], 4) if ordered else 0.0,
+                }
+            return {
+                "queue_depth": sum(queued.values()),
+                "queued": queued,
+                "waits": waits,
+                "requests_available": None if self._requests.unlimited else round(self._requests.level, 2),
+                "tokens_available": None if self._tokens.unlimited else round(self._tokens.level),
+                "blocked_for_s": max(0.0, round(self._blocked_until - time.monotonic(), 3)),
+            }
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+def _percentile(ordered, q):
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return round(ordered[index], 4)
@@ -1,82 +1,205 @@
+import asyncio
+import sys
 import sounddevice as sd
 from scipy.io.wavfile import write, read
-import noisereduce as nr
-import numpy as np
 import threading
+import time
+
+from utils.audio_buffer import AudioBufferStream, AudioRingBuffer
+from utils.audio_pipeline import denoise_audio, save_audio_async, validate_audio_data
+from utils.denoise import DENOISE_STREAMING, BackgroundDenoiser
+from utils.resilience import BackendError
+from utils.transcript_audio import (
+    ASR_STREAM_FINAL_TIMEOUT,
+    TranscriptionResult,
+    transcribe_stream_async,
+)
+from utils.vad import VAD, VAD_AUTO_STOP, EndOfAnswerDetector, trim_silence
 
 
 def validate_audio_file(filename):
     """Validate audio file has actual content"""
     try:
         rate, data = read(filename)
+        return validate_audio_data(data, rate)
+    except Exception as e:
+        return False
 
-        # Check if data exists and has audio content
-        if data is None or len(data) == 0:
-            return False
 
-        # Check if audio has actual sound (not just silence)
-        if np.max(np.abs(data)) < 100:  # Very quiet threshold
-            return False
+def _recording(buffer):
+    """The buffered audio, without leading/trailing silence when VAD found speech."""
+    data = buffer.view()
+    if VAD:
+        trimmed = trim_silence(data, buffer.sample_rate)
+        if len(trimmed):
+            data = trimmed
+    return data
 
-        return True
 
-    except Exception as e:
-        return False
+def write_audio_buffer(filename, buffer):
+    """Write a recording to a WAV file straight from the buffer's view."""
+    write(filename, buffer.sample_rate, _recording(buffer))
+    return filename
+
+
+class _EnterKey:
+    """
+    Single daemon thread reading stdin for every recording. A recording that
+    ends on silence must not leave a blocked ``input()`` behind to swallow the
+    Enter meant for the next answer.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._thread = None
+        self._event = threading.Event()
+
+    def arm(self):
+        """Event set by the next Enter press; recorders may also set it themselves."""
+        with self._lock:
+            self._event = threading.Event()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            return self._event
+
+    def _run(self):
+        while True:
+            line = sys.stdin.readline()
+            with self._lock:
+                self._event.set()
+            if not line:  # stdin closed
+                return
+
+
+enter_key = _EnterKey()
+
+
+def _start_message():
+    if VAD_AUTO_STOP:
+        return "Recording... Press Enter to stop, or just stop talking."
+    return "Recording... Press Enter to stop recording."
+
+
+def _stop_message(buffer, detector):
+    if not len(buffer):
+        return "No audio recorded."
+    if buffer.truncated:
+        return f"⚠️ Recording stopped at the {buffer.duration:.0f}s limit (RECORDING_MAX_SECONDS)."
+    if detector is not None and detector.ended:
+        return "Recording stopped after silence."
+    return "Recording stopped."
 
 
 def record_audio_with_interrupt(filename="recorded.wav", fs=16000):
-    """Record audio until user presses Enter to stop"""
-    print("Recording... Press Enter to stop recording.")
+    """Record audio until user presses Enter (or, with VAD_AUTO_STOP, stops talking)"""
+    buffer = record_audio(fs)
+
+    # Write the buffered audio (an empty file if nothing was recorded)
+    write_audio_buffer(filename, buffer)
+
+    return filename, fs
+
+
+def record_audio(fs=16000, noise_key=None):
+    """
+    Record until the user presses Enter (or, with VAD_AUTO_STOP, stops
+    talking) and return the ``AudioRingBuffer`` holding the answer.
 
-    # Flag to control recording
-    recording = threading.Event()
-    recording.set()
+    With DENOISE_STREAMING, noise is removed on a worker thread while the
+    candidate speaks (using ``noise_key``'s cached noise profile) and the
+    returned buffer holds the denoised answer.
+    """
+    print(_start_message())
+
+    # Set by Enter or by the end-of-answer detector
+    stop = enter_key.arm()
 
-    # Audio data list
-    audio_chunks = []
+    # Preallocated buffer; frames are copied in place on the audio thread
+    buffer = AudioRingBuffer(sample_rate=fs)
+    detector = EndOfAnswerDetector(fs) if VAD_AUTO_STOP else None
+    denoiser = BackgroundDenoiser(buffer, noise_key) if DENOISE_STREAMING else None
 
     def audio_callback(indata, frames, time, status):
-        if recording.is_set():
-            audio_chunks.append(indata.copy())
+        if stop.is_set():
+            return
+        # A full buffer drops the new frames; stop rather than lose more.
+        if not buffer.write(indata):
+            stop.set()
+        if denoiser is not None:
+            denoiser.notify()
+        if detector is not None and detector.update(buffer):
+            stop.set()
+
+    # Record until stopped
+    with sd.InputStream(samplerate=fs, channels=1, dtype="int16", callback=audio_callback):
+        stop.wait()
+
+    print(_stop_message(buffer, detector))
+    return denoiser.finish() if denoiser is not None else buffer
+
+
+def record_and_transcribe_live(
+    filename="recorded.wav", fs=16000, transcription_language="en", on_partial=None
+):
+    """
+    Record until the user presses Enter (or, with VAD_AUTO_STOP, stops
+    talking) while streaming the audio to a real-time transcription session.
+    The recording is saved to ``filename`` in the background. Returns
+    ``(AudioRingBuffer, TranscriptionResult)``.
+    """
+    return asyncio.run(
+        _record_and_transcribe_live(filename, fs, transcription_language, on_partial)
+    )
+
 
-    # Start recording stream
-    stream = sd.InputStream(
-        samplerate=fs, channels=1, dtype="int16", callback=audio_callback
+async def _record_and_transcribe_live(filename, fs, transcription_language, on_partial):
+    loop = asyncio.get_running_loop()
+    buffer = AudioRingBuffer(sample_rate=fs)
+    # The session reads zero-copy views of new frames straight from the buffer.
+    audio_stream = AudioBufferStream(buffer, loop)
+    transcription = asyncio.create_task(
+        transcribe_stream_async(audio_stream, fs, transcription_language, on_partial)
     )
 
-    # Thread to listen for Enter key
-    def wait_for_enter():
-        input()  # Wait for Enter key
-        recording.clear()
-        stream.stop()
-
-    enter_thread = threading.Thread(target=wait_for_enter)
-    enter_thread.daemon = True
-    enter_thread.start()
-
-    # Start recording
-    with stream:
-        enter_thread.join()
-
-    # Combine all audio chunks
-    if audio_chunks:
-        audio_data = np.concatenate(audio_chunks, axis=0)
-        write(filename, fs, audio_data)
-        print("Recording stopped.")
-    else:
-        # Create empty audio file if no data
-        write(filename, fs, np.array([], dtype="int16").reshape(0, 1))
-        print("No audio recorded.")
+    stop = enter_key.arm()
+    detector = EndOfAnswerDetector(fs) if VAD_AUTO_STOP else None
+
+    def audio_callback(indata, frames, time_info, status):
+        if stop.is_set():
+            return
+        # A full buffer drops the new frames; stop rather than lose more.
+        if not buffer.write(indata):
+            stop.set()
+        # Runs on the PortAudio thread; notify() wakes the reader on the event loop.
+        audio_stream.notify()
+        if detector is not None and detector.update(buffer):
+            stop.set()
+
+    print(_start_message())
+    with sd.InputStream(samplerate=fs, channels=1, dtype="int16", callback=audio_callback):
+        await loop.run_in_executor(None, stop.wait)
+    audio_stream.close()
+    stopped = time.perf_counter()
+
+    print(_stop_message(buffer, detector))
+    save_audio_async(filename, _recording(buffer), fs)
 
-    return filename, fs
+    try:
+        result = await asyncio.wait_for(transcription, ASR_STREAM_FINAL_TIMEOUT)
+    except asyncio.TimeoutError:
+        result = TranscriptionResult(
+            error=BackendError("asr", "Timed out waiting for the final transcript")
+        )
+    print(f"Transcript ready {time.perf_counter() - stopped:.2f}s after recording stopped.")
+    return buffer, result
 
 
 def reduce_noise(filename, fs):
     """Reduce noise from audio file"""
     rate, data = read(filename)
     if len(data) > 0:
-        reduced_noise = nr.reduce_noise(y=data.flatten(), sr=rate)
-        write(filename, fs, reduced_noise.astype(np.int16))
+        write(filename, fs, denoise_audio(data, rate))
     return filename
 
 
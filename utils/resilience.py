@@ -0,0 +1,223 @@
+import asyncio
+import random
+import threading
+import time
+
+
+class BackendError(Exception):
+    """
+    Structured failure of an external backend (LLM, ASR).
+
+    ``retryable`` tells whether trying again could help; ``attempts`` is how
+    many calls were made before giving up.
+    """
+
+    def __init__(self, backend, message, retryable=False, attempts=0, cause=None):
+        super().__init__(f"{backend}: {message}")
+        self.backend = backend
+        self.message = message
+        self.retryable = retryable
+        self.attempts = attempts
+        self.cause = cause
+
+    def to_dict(self):
+        return {
+            "backend": self.backend,
+            "message": self.message,
+            "retryable": self.retryable,
+            "attempts": self.attempts,
+        }
+
+
+class CircuitOpenError(BackendError):
+    """Raised without calling the backend while its circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Fail fast when a backend is down.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls are rejected for ``reset_timeout`` seconds. Then a single trial call
+    is let through (half-open): success closes the circuit, failure re-opens it.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now):
+        if self._opened_at is None:
+            return "closed"
+        if now - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        """Return True if a call may proceed now."""
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def abandon(self):
+        """Forget an in-flight half-open trial whose outcome will never be known."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                "name": self.name,
+                "state": self._state(time.monotonic()),
+                "consecutive_failures": self._failures,
+            }
+
+
+class RetryPolicy:
+    """
+    Attempts, per-attempt deadlines and jittered exponential backoff.
+
+    Each attempt gets an equal share of the remaining latency budget (but at
+    least ``min_attempt_timeout``), so a hung first attempt cannot consume the
+    whole budget.
+    """
+
+    def __init__(self, max_attempts=3, base_delay=0.25, max_delay=4.0, min_attempt_timeout=1.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.min_attempt_timeout = min_attempt_timeout
+
+    def attempt_timeout(self, remaining, attempts_left):
+        share = remaining / max(attempts_left, 1)
+        return min(remaining, max(share, self.min_attempt_timeout))
+
+    def backoff(self, attempt):
+        """Full-jitter delay before retry number ``attempt`` (1-based)."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+def _as_backend_error(backend, error, is_retryable, attempts):
+    if isinstance(error, BackendError):
+        error.attempts = attempts
+        return error
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return BackendError(backend, "attempt timed out", True, attempts, error)
+    return BackendError(backend, str(error) or type(error).__name__, is_retryable(error), attempts, error)
+
+
+async def call_with_retries_async(
+    backend, fn, *, budget, policy, breaker=None, is_retryable=lambda e: False, on_retry=None
+):
+    """
+    Await ``fn(attempt_timeout)`` with retries inside an overall ``budget`` (seconds).
+
+    Returns the first successful result or raises ``BackendError``. Attempts
+    that exceed their deadline are cancelled and count as retryable failures.
+    ``on_retry(attempt, error)`` is called before each retry.
+    """
+    deadline = time.monotonic() + budget
+    attempt = 0
+    while True:
+        if breaker is not None and not breaker.allow():
+            raise CircuitOpenError(backend, "circuit open, failing fast", False, attempt)
+
+        attempt += 1
+        remaining = deadline - time.monotonic()
+        timeout = policy.attempt_timeout(remaining, policy.max_attempts - attempt + 1)
+        try:
+            result = await asyncio.wait_for(fn(timeout), timeout=timeout)
+        except asyncio.CancelledError:
+            if breaker is not None:
+                breaker.abandon()
+            raise
+        except Exception as e:
+            error = _as_backend_error(backend, e, is_retryable, attempt)
+            if breaker is not None:
+                # Non-retryable errors (bad request, auth) mean the backend answered.
+                if error.retryable:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            delay = policy.backoff(attempt)
+            out_of_time = deadline - time.monotonic() - delay < policy.min_attempt_timeout
+            if not error.retryable or attempt >= policy.max_attempts or out_of_time:
+                raise error
+            if on_retry is not None:
+                on_retry(attempt, error)
+            await asyncio.sleep(delay)
+            continue
+
+        if breaker is not None:
+            breaker.record_success()
+        return result
+
+
+def call_with_retries(
+    backend, fn, *, budget, policy, breaker=None, is_retryable=lambda e: False, on_retry=None
+):
+    """
+    Blocking counterpart of ``call_with_retries_async``.
+
+    ``fn(attempt_timeout)`` is responsible for honouring its deadline (e.g. by
+    passing it to the client's own timeout option).
+    """
+    deadline = time.monotonic() + budget
+    attempt = 0
+    while True:
+        if breaker is not None and not breaker.allow():
+            raise CircuitOpenError(backend, "circuit open, failing fast", False, attempt)
+
+        attempt += 1
+        remaining = deadline - time.monotonic()
+        timeout = policy.attempt_timeout(remaining, policy.max_attempts - attempt + 1)
+        try:
+            result = fn(timeout)
+        except Exception as e:
+            error = _as_backend_error(backend, e, is_retryable, attempt)
+            if breaker is not None:
+                # Non-retryable errors (bad request, auth) mean the backend answered.
+                if error.retryable:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+            delay = policy.backoff(attempt)
+            out_of_time = deadline - time.monotonic() - delay < policy.min_attempt_timeout
+            if not error.retryable or attempt >= policy.max_attempts or out_of_time:
+                raise error
+            if on_retry is not None:
+                on_retry(attempt, error)
+            time.sleep(delay)
+            continue
+
+        if breaker is not None:
+            breaker.record_success()
+        return result
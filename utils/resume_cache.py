@@ -0,0 +1,113 @@
+"""
+Cache of parsed resumes keyed by the SHA-256 of the uploaded bytes.
+
+Candidates often submit the same file several times (pressing Submit again,
+refreshing, retrying). The extracted text and the ``basic_details`` result
+(name, resume highlights) are stored per fingerprint, so a repeat upload
+skips both the PDF parser and the LLM call.
+"""
+import asyncio
+import hashlib
+import io
+import os
+
+from dotenv import load_dotenv
+
+from utils.basic_details import extract_resume_info_using_llm_async
+from utils.cache import TieredCache, make_cache_key
+from utils.llm_call import llm_output_version
+from utils.load_content import PDF_MAX_CHARS, PDF_MAX_PAGES, read_pdf_bytes, extract_pdf_text
+from utils.prompts import basic_details
+from utils.rate_limiter import PRIORITY_INTERACTIVE
+
+load_dotenv()
+
+RESUME_CACHE_ENABLED = os.environ.get("RESUME_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+RESUME_CACHE_PATH = os.environ.get("RESUME_CACHE_PATH", ".cache/resumes.sqlite3")
+RESUME_CACHE_MAX_BYTES = int(os.environ.get("RESUME_CACHE_MAX_BYTES", 50 * 1024 * 1024))
+RESUME_CACHE_TTL_SECONDS = float(os.environ.get("RESUME_CACHE_TTL_SECONDS", 30 * 24 * 3600))
+
+resume_cache = TieredCache(
+    "resumes",
+    path=RESUME_CACHE_PATH if RESUME_CACHE_ENABLED else None,
+    max_memory_entries=64,
+    max_disk_entries=None,
+    max_disk_bytes=RESUME_CACHE_MAX_BYTES,
+    ttl=RESUME_CACHE_TTL_SECONDS,
+)
+
+# Extraction settings, the prompt and the LLM backend/models are part of the
+# keys, so changing the caps, editing the prompt or switching backends
+# doesn't serve stale results.
+_TEXT_VERSION = make_cache_key("resume_text", PDF_MAX_PAGES, PDF_MAX_CHARS)[:12]
+_INFO_VERSION = make_cache_key(
+    "resume_info", basic_details, llm_output_version("basic_details")
+)[:12]
+
+
+def resume_fingerprint(data):
+    """SHA-256 hex digest of the raw uploaded bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _extract_text(data):
+    if data.startswith(b"%PDF"):
+        return extract_pdf_text(io.BytesIO(data))
+    return data.decode("utf-8", errors="replace")
+
+
+def load_resume(source):
+    """
+    Return ``(fingerprint, text)`` for a resume given as a path or an upload.
+
+    PDFs are parsed once per fingerprint; anything else is read as UTF-8 text.
+    """
+    data = read_pdf_bytes(source)
+    fingerprint = resume_fingerprint(data)
+    key = f"text:{_TEXT_VERSION}:{fingerprint}"
+    if RESUME_CACHE_ENABLED:
+        text = resume_cache.get(key)
+        if text is not None:
+            return fingerprint, text
+
+    text = _extract_text(data)
+    if RESUME_CACHE_ENABLED and text:
+        resume_cache.set(key, text)
+    return fingerprint, text
+
+
+async def extract_resume_info_cached_async(fingerprint, resume_content, priority=PRIORITY_INTERACTIVE):
+    """``extract_resume_info_using_llm_async`` memoized per resume fingerprint."""
+    key = f"info:{_INFO_VERSION}:{fingerprint}"
+    if RESUME_CACHE_ENABLED:
+        cached = resume_cache.get(key)
+        if cached is not None:
+            return cached["name"], cached["resume_highlights"]
+
+    name, resume_highlights = await extract_resume_info_using_llm_async(resume_content, priority)
+    # The fallback result means the call failed. Neither it nor the completion
+    # behind it is cached (see basic_details), so the next upload retries it.
+    if RESUME_CACHE_ENABLED and resume_highlights:
+        resume_cache.set(key, {"name": name, "resume_highlights": resume_highlights})
+    return name, resume_highlights
+
+
+def extract_resume_info_cached(fingerprint, resume_content):
+    return asyncio.run(extract_resume_info_cached_async(fingerprint, resume_content))
+
+
+async def process_resume_async(source):
+    """Parse a resume and extract ``(resume_content, name, resume_highlights)``, cached."""
+    fingerprint, resume_content = load_resume(source)
+    if not resume_content:
+        return resume_content, "Candidate", []
+    name, resume_highlights = await extract_resume_info_cached_async(fingerprint, resume_content)
+    return resume_content, name, resume_highlights
+
+
+def process_resume(source):
+    return asyncio.run(process_resume_async(source))
+
+
+def get_resume_cache_stats():
+    return resume_cache.stats()
@@ -0,0 +1,185 @@
+"""
+Local BM25 retrieval over the job description and resume highlights.
+
+Per-turn prompts normally embed the full job description and every resume
+highlight. With retrieval enabled, both are chunked and indexed once per
+session, and each turn only gets the chunks most relevant to the current
+question and answer, up to a token budget.
+"""
+import math
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+
+CONTEXT_RETRIEVAL = os.environ.get("CONTEXT_RETRIEVAL", "false").lower() in ("1", "true", "yes")
+# Approximate prompt tokens (chars / 4) allowed for retrieved excerpts per turn.
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("CONTEXT_TOKEN_BUDGET", 400))
+CONTEXT_TOP_K = int(os.environ.get("CONTEXT_TOP_K", 8))
+CONTEXT_CHUNK_TOKENS = int(os.environ.get("CONTEXT_CHUNK_TOKENS", 60))
+
+SOURCE_JOB_DESCRIPTION = "job_description"
+SOURCE_RESUME = "resume"
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]")
+_SENTENCE = re.compile(r"(?<=[.!?;])\s+")
+_STOPWORDS = frozenset(
+    """
+    a an and are as at be been but by can could did do does for from had has have how i
+    in into is it its me my of on or our so that the their them then there these they this
+    to was we were what when where which who why will with would you your about also just
+    more most some such than very tell describe walk through
+    """.split()
+)
+
+
+def tokenize(text):
+    return [
+        w for w in _WORD.findall(str(text).lower())
+        if len(w) > 1 and w not in _STOPWORDS
+    ]
+
+
+def count_tokens(text):
+    """Same chars/4 approximation as ``llm_call.estimate_tokens``."""
+    return max(1, len(text) // 4)
+
+
+def chunk_text(text, max_tokens=CONTEXT_CHUNK_TOKENS):
+    """
+    Split text into chunks of at most ~``max_tokens``, breaking on lines and
+    then sentences so list items and short paragraphs stay whole.
+    """
+    chunks = []
+    for block in re.split(r"\n\s*\n|\n(?=\s*[-*•\d])", str(text)):
+        block = " ".join(block.split())
+        if not block:
+            continue
+        if count_tokens(block) <= max_tokens:
+            chunks.append(block)
+            continue
+        current = ""
+        for sentence in _SENTENCE.split(block):
+            candidate = f"{current} {sentence}".strip()
+            if current and count_tokens(candidate) > max_tokens:
+                chunks.append(current)
+                current = sentence
+            else:
+                current = candidate
+        if current:
+            chunks.append(current)
+    return chunks
+
+
+class BM25Index:
+    """Okapi BM25 over a small in-memory list of documents."""
+
+    def __init__(self, documents, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.term_counts = [Counter(tokenize(doc)) for doc in documents]
+        self.lengths = [sum(counts.values()) for counts in self.term_counts]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+        document_frequency = Counter()
+        for counts in self.term_counts:
+            document_frequency.update(counts.keys())
+        n = len(documents)
+        self.idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+    def scores(self, query):
+        terms = [t for t in set(tokenize(query)) if t in self.idf]
+        results = []
+        for counts, length in zip(self.term_counts, self.lengths):
+            norm = self.k1 * (1 - self.b + self.b * length / (self.avg_length or 1))
+            score = 0.0
+            for term in terms:
+                tf = counts.get(term)
+                if tf:
+                    score += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            results.append(score)
+        return results
+
+
+class SessionContextIndex:
+    """Chunks of one session's job description and resume highlights, indexed with BM25."""
+
+    def __init__(self, job_description, resume_highlights, chunk_tokens=CONTEXT_CHUNK_TOKENS):
+        self.chunks = [
+            (SOURCE_JOB_DESCRIPTION, chunk)
+            for chunk in chunk_text(job_description, chunk_tokens)
+        ]
+        highlights = (
+            resume_highlights
+            if isinstance(resume_highlights, (list, tuple))
+            else str(resume_highlights).splitlines()
+        )
+        for item in highlights:
+            self.chunks.extend(
+                (SOURCE_RESUME, chunk) for chunk in chunk_text(str(item), chunk_tokens)
+            )
+        self.total_tokens = sum(count_tokens(chunk) for _, chunk in self.chunks)
+        self.index = BM25Index([chunk for _, chunk in self.chunks])
+
+    def select(self, query, token_budget=None, top_k=None):
+        """
+        Top-scoring chunks for ``query`` that fit in ``token_budget``, returned
+        in document order as ``{source: [chunk, ...]}``. Chunks that share no
+        terms with the query are only used to fill a budget nothing else used.
+        """
+        token_budget = CONTEXT_TOKEN_BUDGET if token_budget is None else token_budget
+        top_k = CONTEXT_TOP_K if top_k is None else top_k
+        scores = self.index.scores(query)
+        ranked = sorted(range(len(self.chunks)), key=lambda i: (-scores[i], i))
+        chosen, used = [], 0
+        for i in ranked:
+            if len(chosen) >= top_k:
+                break
+            if scores[i] <= 0 and chosen:
+                break
+            tokens = count_tokens(self.chunks[i][1])
+            if used + tokens > token_budget:
+                continue
+            chosen.append(i)
+            used += tokens
+
+        selected = {SOURCE_JOB_DESCRIPTION: [], SOURCE_RESUME: []}
+        for i in sorted(chosen):
+            source, chunk = self.chunks[i]
+            selected[source].append(chunk)
+        return selected
+
+
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+_MAX_INDEXES = 32
+
+
+def get_session_index(job_description, resume_highlights):
+    """Index for a session, built on first use and kept in a small LRU."""
+    key = (str(job_description), repr(resume_highlights))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+            return index
+    index = SessionContextIndex(job_description, resume_highlights)
+    with _indexes_lock:
+        _indexes[key] = index
+        while len(_indexes) > _MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
+
+
+def retrieve_context(query, job_description, resume_highlights, token_budget=None):
+    """
+    Excerpts of the session context relevant to ``query``, or ``None`` when
+    the full context already fits in the budget and should be sent as-is.
+    """
+    token_budget = CONTEXT_TOKEN_BUDGET if token_budget is None else token_budget
+    index = get_session_index(job_description, resume_highlights)
+    if index.total_tokens <= token_budget:
+        return None
+    return index.select(query, token_budget=token_budget)
@@ -0,0 +1,192 @@
+import asyncio
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from utils.analyze_candidate import _make_llm_call_async
+from utils.prompts import speculative_question_generation, build_session_messages
+from utils.rate_limiter import PRIORITY_BACKGROUND
+
+SPECULATIVE_QUESTIONS = os.environ.get("SPECULATIVE_QUESTIONS", "false").lower() in ("1", "true", "yes")
+SPECULATIVE_CANDIDATES = int(os.environ.get("SPECULATIVE_CANDIDATES", 3))
+# Fraction of a candidate's keywords that must appear in the transcript.
+SPECULATIVE_MIN_RELEVANCE = float(os.environ.get("SPECULATIVE_MIN_RELEVANCE", 0.35))
+
+_WORD = re.compile(r"[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]")
+_STOPWORDS = frozenset(
+    """
+    a an and are as at be been but by can could did do does for from had has have how i
+    in into is it its me my of on or our so that the their them then there these they this
+    to was we were what when where which who why will with would you your about also just
+    more most some such than very tell describe walk through
+    """.split()
+)
+
+
+def _terms(text: str) -> set:
+    return {
+        w for w in _WORD.findall(str(text).lower())
+        if len(w) > 2 and w not in _STOPWORDS
+    }
+
+
+def relevance(candidate: Dict[str, Any], transcript_terms: set) -> float:
+    """
+    Cheap local relevance of a speculative question to the actual answer:
+    the share of its keywords (falling back to question terms) found in the
+    transcript.
+    """
+    keywords = set()
+    for keyword in candidate.get("keywords") or []:
+        keywords |= _terms(keyword)
+    if not keywords:
+        keywords = _terms(candidate.get("question", ""))
+    if not keywords:
+        return 0.0
+    return len(keywords & transcript_terms) / len(keywords)
+
+
+class SpeculationMetrics:
+    """Process-wide counters for speculative question generation."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.not_ready = 0
+        self.latency_saved = 0.0
+
+    def record(self, outcome: str, latency_saved: float = 0.0):
+        with self._lock:
+            if outcome == "hit":
+                self.hits += 1
+                # A hit hides the whole generation time of the speculative call.
+                self.latency_saved += latency_saved
+            elif outcome == "not_ready":
+                self.not_ready += 1
+                self.misses += 1
+            elif outcome == "miss":
+                self.misses += 1
+            elif outcome == "started":
+                self.started += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            resolved = self.hits + self.misses
+            return {
+                "started": self.started,
+                "hits": self.hits,
+                "misses": self.misses,
+                "not_ready": self.not_ready,
+                "hit_rate": self.hits / resolved if resolved else 0.0,
+                "latency_saved_seconds": round(self.latency_saved, 3),
+            }
+
+
+speculation_metrics = SpeculationMetrics()
+
+
+def get_speculation_stats() -> Dict[str, Any]:
+    return speculation_metrics.snapshot()
+
+
+class SpeculativeQuestionEngine:
+    """
+    Pre-generates follow-up questions while the candidate is answering.
+
+    Call ``start`` once the question has been spoken; generation runs on a
+    background thread with its own event loop, so it survives Streamlit
+    reruns. When the transcript arrives, ``take`` returns the best speculative
+    question if it passes the relevance check; on a miss the caller generates
+    the next question as usual.
+    """
+
+    def __init__(self, min_relevance: float = SPECULATIVE_MIN_RELEVANCE,
+                 num_candidates: int = SPECULATIVE_CANDIDATES):
+        self.min_relevance = min_relevance
+        self.num_candidates = num_candidates
+        self._question = None
+        self._candidates: List[Dict[str, Any]] = []
+        self._generation_seconds = 0.0
+        self._ready = threading.Event()
+
+    def start(self, question: str, resume_highlights, job_description: str):
+        """Begin speculating follow-ups for ``question`` (idempotent per question)."""
+        if question == self._question:
+            return
+        self._question = question
+        self._candidates = []
+        ready = self._ready = threading.Event()
+        speculation_metrics.record("started")
+
+        def run():
+            try:
+                start = time.perf_counter()
+                candidates = asyncio.run(
+                    self._generate(question, resume_highlights, job_description)
+                )
+                self._store_candidates(
+                    question, ready, candidates, time.perf_counter() - start
+                )
+            except Exception as e:
+                print(f"⚠️ Speculative question generation failed: {e}")
+            finally:
+                ready.set()
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _store_candidates(self, question, ready, candidates, seconds):
+        # Ignore results of a speculation that has since been superseded.
+        if ready is self._ready and question == self._question:
+            self._candidates = candidates
+            self._generation_seconds = seconds
+
+    async def _generate(self, question, resume_highlights, job_description):
+        final_prompt = build_session_messages(
+            speculative_question_generation.format(
+                question=question,
+                num_candidates=self.num_candidates,
+            ),
+            job_description,
+            resume_highlights,
+        )
+        response = await _make_llm_call_async(
+            final_prompt,
+            prompt_type="speculative_question_generation",
+            priority=PRIORITY_BACKGROUND,
+        )
+        candidates = response.get("candidates") if isinstance(response, dict) else None
+        return [
+            c for c in candidates or []
+            if isinstance(c, dict) and str(c.get("question", "")).strip()
+        ]
+
+    def take(self, question: str, transcript: str, wait: float = 0.0) -> Optional[str]:
+        """
+        Return a speculative follow-up for ``transcript``, or None on a miss.
+        Records hit/miss metrics.
+        """
+        if question != self._question:
+            speculation_metrics.record("miss")
+            return None
+        if not self._ready.wait(wait):
+            speculation_metrics.record("not_ready")
+            return None
+
+        transcript_terms = _terms(transcript)
+        best, best_score = None, 0.0
+        for candidate in self._candidates:
+            score = relevance(candidate, transcript_terms)
+            if score > best_score:
+                best, best_score = candidate, score
+
+        self._question = None
+        if best is None or best_score < self.min_relevance:
+            speculation_metrics.record("miss")
+            return None
+
+        speculation_metrics.record("hit", latency_saved=self._generation_seconds)
+        return str(best["question"]).strip()
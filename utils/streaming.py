@@ -0,0 +1,106 @@
+import re
+
+_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*(?=\s)|\n+")
+
+
+class JsonStringFieldStreamer:
+    """
+    Incrementally decode one string field from a JSON object that is still
+    being generated.
+
+    Feed raw completion chunks with ``feed``; each call returns the newly
+    decoded characters of ``field``'s value (possibly empty). Escape sequences
+    split across chunks are handled. ``done`` becomes True once the closing
+    quote of the value has been seen.
+    """
+
+    def __init__(self, field):
+        self._key_pattern = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self._buffer = ""
+        self._pos = None  # index of the next undecoded value character
+        self.done = False
+
+    def feed(self, chunk):
+        if self.done or not chunk:
+            return ""
+        self._buffer += chunk
+
+        if self._pos is None:
+            match = self._key_pattern.search(self._buffer)
+            if not match:
+                return ""
+            self._pos = match.end()
+
+        out = []
+        buffer, pos, end = self._buffer, self._pos, len(self._buffer)
+        while pos < end:
+            char = buffer[pos]
+            if char == '"':
+                self.done = True
+                pos += 1
+                break
+            if char != "\\":
+                out.append(char)
+                pos += 1
+                continue
+
+            # Escape sequence: wait for more input if it is incomplete.
+            if pos + 1 >= end:
+                break
+            code = buffer[pos + 1]
+            if code == "u":
+                if pos + 6 > end:
+                    break
+                try:
+                    out.append(chr(int(buffer[pos + 2 : pos + 6], 16)))
+                except ValueError:
+                    pass
+                pos += 6
+            else:
+                out.append(_ESCAPES.get(code, code))
+                pos += 2
+
+        self._pos = pos
+        return "".join(out)
+
+
+class SentenceSplitter:
+    """
+    Accumulate streamed text and emit complete sentences.
+
+    Sentences shorter than ``min_chars`` are held back and merged with the
+    next one so that TTS is not asked to synthesize fragments like "Great.".
+    """
+
+    def __init__(self, min_chars=24):
+        self.min_chars = min_chars
+        self._pending = ""
+
+    def feed(self, text):
+        self._pending += text
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END.finditer(self._pending):
+            candidate = self._pending[start : match.end()].strip()
+            if len(candidate) >= self.min_chars:
+                sentences.append(candidate)
+                start = match.end()
+        self._pending = self._pending[start:]
+        return sentences
+
+    def flush(self):
+        remainder = self._pending.strip()
+        self._pending = ""
+        return [remainder] if remainder else []
+
@@ -0,0 +1,355 @@
+"""
+Per-call LLM telemetry.
+
+Every completion produces an ``LLMCallRecord`` (tokens, latency, time to
+first token, model, cache hit, retries, parse fallback, cost). Records are
+kept in an in-process ring buffer and optionally appended to a JSONL file
+(by a background writer, rotated at ``LLM_TELEMETRY_JSONL_MAX_BYTES``) and
+summarised into a Prometheus text-format file.
+
+Report percentiles per prompt type from the JSONL file:
+
+    python -m utils.telemetry report [--file .cache/llm_telemetry.jsonl]
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Optional
+
+LLM_TELEMETRY_BUFFER = int(os.environ.get("LLM_TELEMETRY_BUFFER", 2000))
+# Append every record here as one JSON line (empty disables, the default).
+LLM_TELEMETRY_JSONL = os.environ.get("LLM_TELEMETRY_JSONL", "")
+# Past this size the file is rotated to "<path>.1" (one old file is kept).
+LLM_TELEMETRY_JSONL_MAX_BYTES = int(os.environ.get("LLM_TELEMETRY_JSONL_MAX_BYTES", 50 * 1024 * 1024))
+# Periodically rewrite this file in Prometheus text format (empty disables).
+LLM_TELEMETRY_PROMETHEUS = os.environ.get("LLM_TELEMETRY_PROMETHEUS", "")
+LLM_TELEMETRY_PROMETHEUS_INTERVAL = float(os.environ.get("LLM_TELEMETRY_PROMETHEUS_INTERVAL", 15))
+
+_QUANTILES = (0.50, 0.95, 0.99)
+_DEFAULT_JSONL = ".cache/llm_telemetry.jsonl"
+
+
+@dataclass
+class LLMCallRecord:
+    """Telemetry for a single LLM completion (or cache hit)."""
+
+    prompt_type: str = "other"
+    model: str = ""
+    timestamp: float = field(default_factory=time.time)
+    latency_s: Optional[float] = None
+    ttft_s: Optional[float] = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    cache_hit: bool = False
+    retries: int = 0
+    fallbacks: int = 0
+    streamed: bool = False
+    hedge: bool = False
+    parse_fallback: bool = False
+    parse_failed: bool = False
+    error: Optional[str] = None
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+
+    def elapsed(self):
+        return time.perf_counter() - self._started
+
+    def mark_first_token(self):
+        if self.ttft_s is None:
+            self.ttft_s = round(self.elapsed(), 4)
+
+    def to_dict(self):
+        return {k: v for k, v in asdict(self).items() if not k.startswith("_")}
+
+
+def _percentile(ordered, q):
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))
+    return round(ordered[index], 4)
+
+
+def summarize(records):
+    """
+    Aggregate record dicts per prompt type: call/error counts, latency and TTFT
+    percentiles, mean tokens, cache-hit / retry / parse-fallback rates, cost.
+    """
+    groups = {}
+    for record in records:
+        groups.setdefault(record.get("prompt_type") or "other", []).append(record)
+
+    summary = {}
+    for prompt_type, group in sorted(groups.items()):
+        calls = len(group)
+        latencies = sorted(r["latency_s"] for r in group if r.get("latency_s") is not None)
+        ttfts = sorted(r["ttft_s"] for r in group if r.get("ttft_s") is not None)
+        entry = {
+            "calls": calls,
+            "errors": sum(1 for r in group if r.get("error")),
+            "cache_hit_rate": sum(1 for r in group if r.get("cache_hit")) / calls,
+            "retries": sum(r.get("retries", 0) for r in group),
+            "parse_fallback_rate": sum(1 for r in group if r.get("parse_fallback")) / calls,
+            "parse_failure_rate": sum(1 for r in group if r.get("parse_failed")) / calls,
+            "mean_prompt_tokens": sum(r.get("prompt_tokens", 0) for r in group) / calls,
+            "mean_completion_tokens": sum(r.get("completion_tokens", 0) for r in group) / calls,
+            "cost_usd": round(sum(r.get("cost_usd") or 0.0 for r in group), 6),
+        }
+        for q in _QUANTILES:
+            entry[f"p{int(q * 100)}_latency_s"] = _percentile(latencies, q)
+            entry[f"p{int(q * 100)}_ttft_s"] = _percentile(ttfts, q) if ttfts else None
+        summary[prompt_type] = entry
+    return summary
+
+
+def format_report(summary):
+    """Render ``summarize()`` output as a fixed-width table."""
+    header = (
+        f"{'prompt type':<34}{'calls':>7}{'err':>5}{'p50 s':>8}{'p95 s':>8}{'p99 s':>8}"
+        f"{'ttft p50':>10}{'prompt tok':>12}{'compl tok':>11}{'cache':>7}{'fallbk':>8}{'cost $':>10}"
+    )
+    lines = [header, "-" * len(header)]
+    for prompt_type, s in summary.items():
+        ttft = f"{s['p50_ttft_s']:.2f}" if s["p50_ttft_s"] is not None else "-"
+        lines.append(
+            f"{prompt_type:<34}{s['calls']:>7}{s['errors']:>5}"
+            f"{s['p50_latency_s']:>8.2f}{s['p95_latency_s']:>8.2f}{s['p99_latency_s']:>8.2f}"
+            f"{ttft:>10}{s['mean_prompt_tokens']:>12.0f}{s['mean_completion_tokens']:>11.0f}"
+            f"{s['cache_hit_rate']:>7.0%}{s['parse_fallback_rate']:>8.0%}{s['cost_usd']:>10.4f}"
+        )
+    return "\n".join(lines)
+
+
+class LLMTelemetry:
+    """
+    Ring buffer of recent ``LLMCallRecord``s plus monotonic counters.
+
+    Percentiles are computed over the buffer; counters (calls, tokens, cost,
+    retries, ...) cover the whole process lifetime, as Prometheus expects.
+    """
+
+    def __init__(
+        self,
+        capacity=LLM_TELEMETRY_BUFFER,
+        jsonl_path=LLM_TELEMETRY_JSONL,
+        prometheus_path=LLM_TELEMETRY_PROMETHEUS,
+        prometheus_interval=LLM_TELEMETRY_PROMETHEUS_INTERVAL,
+        jsonl_max_bytes=LLM_TELEMETRY_JSONL_MAX_BYTES,
+    ):
+        self._records = deque(maxlen=capacity)
+        self._totals = {}  # (prompt_type, model) -> counters
+        self._lock = threading.Lock()
+        self.jsonl_path = jsonl_path or None
+        self.jsonl_max_bytes = jsonl_max_bytes
+        self._jsonl_lines = []  # serialized records waiting for the writer
+        self._jsonl_flush = None  # the writer's pending flush, if any
+        self._writer = None
+        self.prometheus_path = prometheus_path or None
+        self.prometheus_interval = prometheus_interval
+        self._prometheus_written_at = 0.0
+        self._collectors = []
+
+    def add_collector(self, collector):
+        """Append ``collector()``'s Prometheus text to every export."""
+        self._collectors.append(collector)
+
+    def record(self, record):
+        if record.latency_s is None:
+            record.latency_s = round(record.elapsed(), 4)
+        data = record.to_dict()
+        with self._lock:
+            self._records.append(data)
+            totals = self._totals.setdefault(
+                (record.prompt_type, record.model),
+                {
+                    "calls": 0, "errors": 0, "cache_hits": 0, "retries": 0,
+                    "parse_fallbacks": 0, "prompt_tokens": 0, "completion_tokens": 0,
+                    "cost_usd": 0.0,
+                },
+            )
+            totals["calls"] += 1
+            totals["errors"] += 1 if record.error else 0
+            totals["cache_hits"] += 1 if record.cache_hit else 0
+            totals["retries"] += record.retries
+            totals["parse_fallbacks"] += 1 if record.parse_fallback else 0
+            totals["prompt_tokens"] += record.prompt_tokens
+            totals["completion_tokens"] += record.completion_tokens
+            totals["cost_usd"] += record.cost_usd or 0.0
+            write_prometheus = (
+                self.prometheus_path is not None
+                and time.monotonic() - self._prometheus_written_at >= self.prometheus_interval
+            )
+            if write_prometheus:
+                self._prometheus_written_at = time.monotonic()
+            if self.jsonl_path:
+                self._queue_jsonl(data)
+
+        if write_prometheus:
+            self.write_prometheus()
+
+    def _queue_jsonl(self, data):
+        """Hand a record to the background writer (called under the lock)."""
+        self._jsonl_lines.append(json.dumps(data) + "\n")
+        if self._jsonl_flush is None:
+            if self._writer is None:
+                self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="telemetry-writer")
+            self._jsonl_flush = self._writer.submit(self._write_jsonl)
+
+    def _write_jsonl(self):
+        with self._lock:
+            lines, self._jsonl_lines = self._jsonl_lines, []
+            self._jsonl_flush = None
+            path = self.jsonl_path
+        if not path or not lines:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            if self.jsonl_max_bytes and os.path.exists(path) and os.path.getsize(path) >= self.jsonl_max_bytes:
+                os.replace(path, f"{path}.1")
+            with open(path, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+        except OSError as e:
+            print(f"⚠️ Could not write LLM telemetry to {path}: {e}")
+            self.jsonl_path = None
+
+    def flush(self):
+        """Wait until every queued record has been written to the JSONL file."""
+        if self._writer is not None:
+            # One worker runs jobs in order, so an empty job finishes last.
+            self._writer.submit(lambda: None).result()
+
+    def records(self, prompt_type=None):
+        with self._lock:
+            records = list(self._records)
+        if prompt_type is not None:
+            records = [r for r in records if r["prompt_type"] == prompt_type]
+        return records
+
+    def summary(self):
+        return summarize(self.records())
+
+    def to_prometheus(self):
+        """Prometheus text exposition of counters and per-type latency quantiles."""
+        with self._lock:
+            totals = {key: dict(value) for key, value in self._totals.items()}
+        summary = self.summary()
+
+        counters = (
+            ("llm_calls_total", "calls", "LLM calls (including cache hits)."),
+            ("llm_call_errors_total", "errors", "LLM calls that failed."),
+            ("llm_cache_hits_total", "cache_hits", "LLM calls served from the response cache."),
+            ("llm_retries_total", "retries", "LLM retry attempts."),
+            ("llm_parse_fallbacks_total", "parse_fallbacks", "Responses that needed lenient JSON extraction."),
+            ("llm_prompt_tokens_total", "prompt_tokens", "Prompt tokens sent."),
+            ("llm_completion_tokens_total", "completion_tokens", "Completion tokens received."),
+            ("llm_cost_usd_total", "cost_usd", "Estimated LLM spend in USD."),
+        )
+        lines = []
+        for metric, key, help_text in counters:
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            for (prompt_type, model), values in sorted(totals.items()):
+                lines.append(
+                    f'{metric}{{prompt_type="{prompt_type}",model="{model}"}} {values[key]}'
+                )
+
+        for metric, key, help_text in (
+            ("llm_call_latency_seconds", "latency_s", "LLM call latency over recent calls."),
+            ("llm_time_to_first_token_seconds", "ttft_s", "Time to first streamed token over recent calls."),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} gauge")
+            for prompt_type, s in summary.items():
+                for q in _QUANTILES:
+                    value = s[f"p{int(q * 100)}_{key}"]
+                    if value is not None:
+                        lines.append(
+                            f'{metric}{{prompt_type="{prompt_type}",quantile="{q}"}} {value}'
+                        )
+        text = "\n".join(lines) + "\n"
+        return text + "".join(collector() for collector in self._collectors)
+
+    def write_prometheus(self, path=None):
+        """Atomically rewrite ``path`` (e.g. for node_exporter's textfile collector)."""
+        path = path or self.prometheus_path
+        if not path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Could not write Prometheus metrics to {path}: {e}")
+
+
+llm_telemetry = LLMTelemetry()
+
+
+def start_llm_call(prompt_type="other", **fields):
+    """Begin timing a call; pass the record to ``record_llm_call`` when done."""
+    return LLMCallRecord(prompt_type=prompt_type, **fields)
+
+
+def record_llm_call(record):
+    llm_telemetry.record(record)
+
+
+def get_llm_telemetry_stats():
+    """Per-prompt-type summary of the calls in the in-process ring buffer."""
+    return llm_telemetry.summary()
+
+
+def load_jsonl(path):
+    """Records from ``path``, preceded by those in its rotated ``<path>.1``."""
+    records = []
+    for name in (f"{path}.1", path):
+        if not os.path.exists(name):
+            continue
+        with open(name, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LLM call telemetry")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    report = subcommands.add_parser("report", help="latency/token percentiles per prompt type")
+    report.add_argument("--file", default=LLM_TELEMETRY_JSONL or _DEFAULT_JSONL)
+    report.add_argument("--last", type=int, default=0, help="only the last N records")
+    prometheus = subcommands.add_parser("prometheus", help="print Prometheus text for a JSONL file")
+    prometheus.add_argument("--file", default=LLM_TELEMETRY_JSONL or _DEFAULT_JSONL)
+    args = parser.parse_args(argv)
+
+    if not (os.path.exists(args.file) or os.path.exists(f"{args.file}.1")):
+        print(f"⚠️ No telemetry file at {args.file}")
+        return 1
+    records = load_jsonl(args.file)
+
+    if args.command == "report":
+        if args.last:
+            records = records[-args.last:]
+        print(f"{len(records)} calls from {args.file}\n")
+        print(format_report(summarize(records)))
+    else:
+        telemetry = LLMTelemetry(capacity=max(len(records), 1), jsonl_path=None, prometheus_path=None)
+        for data in records:
+            known = {k: v for k, v in data.items() if k in LLMCallRecord.__dataclass_fields__}
+            telemetry.record(LLMCallRecord(**known))
+        print(telemetry.to_prometheus(), end="")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -23,12 +23,7 @@ async def speak_edge_tts(text, voice="en-US-AriaNeural", rate="+0%", pitch="+0Hz
 
             # Play using pygame
             pygame.mixer.init()
-            pygame.mixer.music.load(tmp_file.name)
-            pygame.mixer.music.play()
-
-            while pygame.mixer.music.get_busy():
-                pygame.time.wait(100)
-
+            _play_audio_file(tmp_file.name)
             pygame.mixer.quit()
 
         os.unlink(tmp_file.name)
@@ -38,6 +33,74 @@ async def speak_edge_tts(text, voice="en-US-AriaNeural", rate="+0%", pitch="+0Hz
         print("Text:", text)
 
 
+def _play_audio_file(path):
+    """Play an audio file on an initialized pygame mixer, blocking until done."""
+    pygame.mixer.music.load(path)
+    pygame.mixer.music.play()
+
+    while pygame.mixer.music.get_busy():
+        pygame.time.wait(100)
+
+    pygame.mixer.music.unload()
+
+
+async def _synthesize_to_file(text, voice, rate, pitch):
+    communicate = edge_tts.Communicate(text, voice, rate=rate, pitch=pitch)
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as tmp_file:
+        path = tmp_file.name
+    await communicate.save(path)
+    return path
+
+
+async def speak_text_stream(sentences, voice="en-US-GuyNeural", rate="+0%", pitch="+0Hz"):
+    """
+    Speak sentences from an async iterator as they arrive.
+
+    Synthesis of each sentence overlaps playback of the previous one, so the
+    first sentence is heard while later ones are still being generated.
+    Returns the full text that was received.
+    """
+    received = []
+    queue = asyncio.Queue()
+
+    async def synthesize():
+        try:
+            async for sentence in sentences:
+                received.append(sentence)
+                try:
+                    await queue.put(await _synthesize_to_file(sentence, voice, rate, pitch))
+                except Exception as e:
+                    print(f"Edge-TTS Error: {e}")
+                    print("Text:", sentence)
+        finally:
+            await queue.put(None)
+
+    producer = asyncio.create_task(synthesize())
+
+    mixer_ready = False
+    try:
+        pygame.mixer.init()
+        mixer_ready = True
+    except Exception as e:
+        print(f"Audio playback unavailable: {e}")
+
+    try:
+        while (path := await queue.get()) is not None:
+            try:
+                if mixer_ready:
+                    await asyncio.to_thread(_play_audio_file, path)
+            except Exception as e:
+                print(f"Audio playback error: {e}")
+            finally:
+                os.unlink(path)
+    finally:
+        if mixer_ready:
+            pygame.mixer.quit()
+        await producer
+
+    return " ".join(received)
+
+
 def speak_text(text, voice="en-US-GuyNeural", rate="+0%", pitch="+0Hz"):
     """Synchronous wrapper for Edge-TTS"""
     asyncio.run(speak_edge_tts(text, voice, rate, pitch))
\ No newline at end of file
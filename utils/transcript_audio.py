@@ -1,17 +1,165 @@
+import asyncio
+import contextlib
+import io
 import os
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+from scipy.io.wavfile import read
 from speechmatics.models import *
 import speechmatics
 import threading
+import websockets
+
+from utils.resilience import (
+    BackendError,
+    CircuitBreaker,
+    RetryPolicy,
+    call_with_retries,
+    call_with_retries_async,
+)
+
+# Retries and circuit breaking for the Speechmatics backend.
+ASR_BUDGET_SECONDS = float(os.environ.get("ASR_BUDGET_SECONDS", 45))
+ASR_MAX_ATTEMPTS = int(os.environ.get("ASR_MAX_ATTEMPTS", 3))
+asr_retry_policy = RetryPolicy(max_attempts=ASR_MAX_ATTEMPTS, min_attempt_timeout=5.0)
+asr_breaker = CircuitBreaker(
+    "asr",
+    failure_threshold=int(os.environ.get("ASR_BREAKER_FAILURES", 3)),
+    reset_timeout=float(os.environ.get("ASR_BREAKER_RESET_SECONDS", 30)),
+)
+
+# Real-time sessions: audio is sent while the candidate is still speaking.
+ASR_STREAMING = os.environ.get("ASR_STREAMING", "false").lower() in ("1", "true", "yes")
+# Longest answer a single real-time session may cover.
+ASR_STREAM_MAX_SECONDS = float(os.environ.get("ASR_STREAM_MAX_SECONDS", 600))
+# How long the server may hold back a final transcript (lower = faster finals).
+ASR_STREAM_MAX_DELAY = float(os.environ.get("ASR_STREAM_MAX_DELAY", 1.0))
+ASR_STREAM_CHUNK_BYTES = int(os.environ.get("ASR_STREAM_CHUNK_BYTES", 3200))  # 100 ms at 16 kHz
+# Wait for the final transcript after the last audio frame.
+ASR_STREAM_FINAL_TIMEOUT = float(os.environ.get("ASR_STREAM_FINAL_TIMEOUT", 10))
+asr_stream_policy = RetryPolicy(max_attempts=1, min_attempt_timeout=5.0)
+
+
+@dataclass
+class TranscriptionResult:
+    """
+    Outcome of a transcription. ``text`` is empty when nothing was recognised;
+    ``error`` is set when the backend (or the input) failed; ``rejected`` says
+    why audio was never sent (e.g. silent recording).
+    """
+
+    text: str = ""
+    error: Optional[BackendError] = None
+    rejected: str = ""
+
+    @property
+    def ok(self):
+        return self.error is None and bool(self.text.strip())
+
+    @property
+    def message(self):
+        """Human-readable reason when not ``ok``."""
+        if self.error is not None:
+            return self.error.message
+        if self.rejected:
+            return self.rejected
+        if not self.text.strip():
+            return "No speech detected in audio"
+        return ""
+
+
+def is_retryable_asr_error(error):
+    status = getattr(error, "status_code", None)
+    if status is None and getattr(error, "response", None) is not None:
+        status = getattr(error.response, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(
+        error, (websockets.exceptions.ConnectionClosed, ConnectionError, OSError, TimeoutError)
+    )
+
+
+def message_text(message):
+    """Text of an AddTranscript / AddPartialTranscript message ("" if none)."""
+    sentence_parts = []
+    for result in message.get("results", []):
+        if "alternatives" in result:
+            if result["type"] == "word":
+                content = result["alternatives"][0]["content"]
+                # Add space before word if not first word
+                if sentence_parts:
+                    sentence_parts.append(" ")
+                sentence_parts.append(content)
+            elif result["type"] == "punctuation":
+                content = result["alternatives"][0]["content"]
+                sentence_parts.append(content)
+    return "".join(sentence_parts)
+
+
+class BytesAudioStream:
+    """
+    Async reader over in-memory audio. The Speechmatics client runs each
+    synchronous ``read`` in a fresh thread pool; an async reader avoids that
+    and hands out zero-copy slices.
+    """
+
+    def __init__(self, data):
+        self._view = memoryview(data).cast("B")
+        self._position = 0
+
+    async def read(self, size=-1):
+        start = self._position
+        end = len(self._view) if size is None or size < 0 else min(len(self._view), start + size)
+        self._position = end
+        return self._view[start:end]
 
 
 def transcribe_with_speechmatics(audio_path, transcription_language="en"):
     """Transcribe audio using Speechmatics WebSocket client"""
+    if not os.environ.get("SPEECHMATICS_API_KEY"):
+        return TranscriptionResult(error=BackendError("asr", "No API key"))
+
+    # Check if file exists and has content
+    if not os.path.exists(audio_path):
+        return TranscriptionResult(
+            error=BackendError("asr", f"Audio file not found: {audio_path}")
+        )
+
+    file_size = os.path.getsize(audio_path)
+    if file_size == 0:
+        return TranscriptionResult(error=BackendError("asr", "No audio recorded"))
+
+    return _transcribe_file(lambda: open(audio_path, "rb"), transcription_language)
+
+
+def transcribe_audio_bytes(audio_bytes, transcription_language="en"):
+    """
+    Same as ``transcribe_with_speechmatics`` for an encoded file (e.g. WAV)
+    held in memory, streamed to the backend without touching disk.
+    """
+    if not os.environ.get("SPEECHMATICS_API_KEY"):
+        return TranscriptionResult(error=BackendError("asr", "No API key"))
+    if not audio_bytes:
+        return TranscriptionResult(error=BackendError("asr", "No audio recorded"))
+    return _transcribe_file(
+        lambda: contextlib.nullcontext(BytesAudioStream(audio_bytes)), transcription_language
+    )
+
+
+def _transcribe_file(open_audio, transcription_language):
+    """Batch-style session over a whole file; ``open_audio()`` is called per attempt."""
     api_key = os.environ.get("SPEECHMATICS_API_KEY")
 
-    if not api_key:
-        return "Transcription failed: No API key"
+    # Configure transcription
+    conf = TranscriptionConfig(
+        language=transcription_language,
+        enable_partials=False,  # Disable partials to reduce logs
+        max_delay=5,
+    )
 
-    try:
+    def attempt(timeout):
         # Create transcription client
         sm_client = speechmatics.client.WebsocketClient(api_key)
 
@@ -21,26 +169,10 @@ def transcribe_with_speechmatics(audio_path, transcription_language="en"):
 
         # Handler for processing transcript additions
         def process_transcript(message):
-            if "results" in message:
+            sentence = message_text(message)
+            if sentence:
                 with transcript_lock:
-                    sentence_parts = []
-
-                    for result in message["results"]:
-                        if "alternatives" in result:
-                            if result["type"] == "word":
-                                content = result["alternatives"][0]["content"]
-                                # Add space before word if not first word
-                                if sentence_parts:
-                                    sentence_parts.append(" ")
-                                sentence_parts.append(content)
-                            elif result["type"] == "punctuation":
-                                content = result["alternatives"][0]["content"]
-                                sentence_parts.append(content)
-
-                    # Join the sentence parts and add to results
-                    if sentence_parts:
-                        sentence = "".join(sentence_parts)
-                        transcription_results.append(sentence)
+                    transcription_results.append(sentence)
 
         # Add event handler (no partial transcript handler to reduce logs)
         sm_client.add_event_handler(
@@ -48,32 +180,148 @@ def transcribe_with_speechmatics(audio_path, transcription_language="en"):
             event_handler=process_transcript,
         )
 
-        # Configure transcription
-        conf = TranscriptionConfig(
-            language=transcription_language,
-            enable_partials=False,  # Disable partials to reduce logs
-            max_delay=5,
+        # Run transcription
+        with open_audio() as audio_file:
+            sm_client.run_synchronously(audio_file, conf, timeout=timeout)
+
+        return transcription_results
+
+    try:
+        transcription_results = call_with_retries(
+            "asr",
+            attempt,
+            budget=ASR_BUDGET_SECONDS,
+            policy=asr_retry_policy,
+            breaker=asr_breaker,
+            is_retryable=is_retryable_asr_error,
+            on_retry=lambda n, e: print(f"⚠️ Transcription attempt {n} failed ({e}), retrying..."),
         )
+    except BackendError as e:
+        print(f"⚠️ Transcription failed after {e.attempts} attempt(s): {e}")
+        return TranscriptionResult(error=e)
 
-        # Check if file exists and has content
-        if not os.path.exists(audio_path):
-            return f"Audio file not found: {audio_path}"
+    # Join all transcript segments
+    full_transcript = " ".join(transcription_results).strip()
+    if full_transcript:
+        print(f"Transcript: {full_transcript}")
+    return TranscriptionResult(text=full_transcript)
 
-        file_size = os.path.getsize(audio_path)
-        if file_size == 0:
-            return "No audio recorded"
 
-        # Run transcription
-        with open(audio_path, "rb") as audio_file:
-            sm_client.run_synchronously(audio_file, conf)
-
-        # Join all transcript segments
-        if transcription_results:
-            full_transcript = " ".join(transcription_results)
-            print(f"Transcript: {full_transcript}")
-            return full_transcript.strip()
-        else:
-            return "No speech detected in audio"
+async def transcribe_stream_async(
+    stream, sample_rate=16000, transcription_language="en", on_partial=None
+):
+    """
+    Transcribe raw 16-bit mono PCM from ``stream`` over one real-time session.
+
+    ``stream`` is typically an ``AudioBufferStream`` read while the candidate
+    speaks, so the final transcript arrives shortly after the audio ends.
+    ``on_partial(text)`` receives the running transcript (finals + current
+    partial) as it changes. Live audio can't be replayed, so there is a
+    single attempt; callers fall back to a batch transcription of the
+    recording if this fails.
+    """
+    api_key = os.environ.get("SPEECHMATICS_API_KEY")
+    if not api_key:
+        return TranscriptionResult(error=BackendError("asr", "No API key"))
+
+    conf = TranscriptionConfig(
+        language=transcription_language,
+        enable_partials=on_partial is not None,
+        max_delay=ASR_STREAM_MAX_DELAY,
+    )
+    settings = AudioSettings(
+        encoding="pcm_s16le", sample_rate=sample_rate, chunk_size=ASR_STREAM_CHUNK_BYTES
+    )
+
+    async def attempt(timeout):
+        sm_client = speechmatics.client.WebsocketClient(api_key)
+        finals = []
+
+        def add_transcript(message):
+            sentence = message_text(message)
+            if sentence:
+                finals.append(sentence)
+                if on_partial is not None:
+                    on_partial(" ".join(finals))
+
+        def add_partial(message):
+            partial = message_text(message)
+            if partial:
+                on_partial(" ".join(finals + [partial]))
+
+        sm_client.add_event_handler(
+            event_name=ServerMessageType.AddTranscript, event_handler=add_transcript
+        )
+        if on_partial is not None:
+            sm_client.add_event_handler(
+                event_name=ServerMessageType.AddPartialTranscript, event_handler=add_partial
+            )
+        await sm_client.run(stream, conf, settings)
+        return finals
 
+    try:
+        transcription_results = await call_with_retries_async(
+            "asr",
+            attempt,
+            budget=ASR_STREAM_MAX_SECONDS,
+            policy=asr_stream_policy,
+            breaker=asr_breaker,
+            is_retryable=is_retryable_asr_error,
+        )
+    except BackendError as e:
+        print(f"⚠️ Real-time transcription failed: {e}")
+        return TranscriptionResult(error=e)
+
+    full_transcript = " ".join(transcription_results).strip()
+    if full_transcript:
+        print(f"Transcript: {full_transcript}")
+    return TranscriptionResult(text=full_transcript)
+
+
+def to_pcm16(data):
+    """Mono int16 samples from a decoded WAV array of any common sample format."""
+    if data.ndim > 1:
+        data = data[:, 0]
+    if data.dtype.kind == "f":
+        data = (data * 32767).clip(-32768, 32767).astype("int16")
+    elif data.dtype == "int32":
+        data = (data >> 16).astype("int16")
+    elif data.dtype == "uint8":
+        data = ((data.astype("int16") - 128) << 8).astype("int16")
+    return data
+
+
+def decode_wav_bytes(wav_bytes):
+    """``(sample_rate, mono int16 samples)`` of an in-memory WAV. Raises on unreadable input."""
+    sample_rate, data = read(io.BytesIO(wav_bytes))
+    return int(sample_rate), to_pcm16(data)
+
+
+async def transcribe_pcm_async(pcm, sample_rate=16000, transcription_language="en", on_partial=None):
+    """
+    Transcribe in-memory 16-bit mono PCM (bytes or int16 array) over a
+    real-time session, sending it as fast as the server accepts it.
+    """
+    if len(pcm) == 0:
+        return TranscriptionResult(error=BackendError("asr", "No audio recorded"))
+    if isinstance(pcm, np.ndarray):
+        pcm = np.ascontiguousarray(pcm, dtype=np.int16)
+    return await transcribe_stream_async(
+        BytesAudioStream(pcm), int(sample_rate), transcription_language, on_partial=on_partial
+    )
+
+
+async def transcribe_wav_bytes_async(wav_bytes, transcription_language="en", on_partial=None):
+    """
+    Transcribe an in-memory WAV (e.g. a Streamlit recording) over a real-time
+    session, sending its PCM as fast as the server accepts it.
+    """
+    try:
+        sample_rate, data = decode_wav_bytes(wav_bytes)
     except Exception as e:
-        return f"Transcription failed: {str(e)}"
\ No newline at end of file
+        return TranscriptionResult(error=BackendError("asr", f"Unreadable audio: {e}"))
+    return await transcribe_pcm_async(data, sample_rate, transcription_language, on_partial)
+
+
+def transcribe_wav_bytes(wav_bytes, transcription_language="en", on_partial=None):
+    return asyncio.run(transcribe_wav_bytes_async(wav_bytes, transcription_language, on_partial))
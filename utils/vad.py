@@ -0,0 +1,168 @@
+"""
+Voice-activity detection on frame energy and zero-crossing rate (NumPy only).
+
+Audio is cut into ``VAD_FRAME_MS`` frames. A frame counts as speech when its
+RMS level is above both ``VAD_THRESHOLD_DBFS`` and the estimated noise floor
+plus ``VAD_NOISE_MARGIN_DB``; weak frames with a high zero-crossing rate
+(hiss, fan noise) do not count. Offline helpers (``speech_bounds``,
+``trim_silence``, ``contains_speech``) work on a whole recording;
+``EndOfAnswerDetector`` runs incrementally on the recording buffer and
+reports when the candidate has been silent for ``VAD_TRAILING_SILENCE_SECONDS``
+after speaking.
+"""
+import os
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Trim leading/trailing silence and reject answers without speech before upload.
+VAD = os.environ.get("VAD", "false").lower() in ("1", "true", "yes")
+# End the recording automatically after trailing silence (CLI recorder).
+VAD_AUTO_STOP = os.environ.get("VAD_AUTO_STOP", "false").lower() in ("1", "true", "yes")
+VAD_TRAILING_SILENCE_SECONDS = float(os.environ.get("VAD_TRAILING_SILENCE_SECONDS", 2.0))
+VAD_FRAME_MS = float(os.environ.get("VAD_FRAME_MS", 30))
+VAD_THRESHOLD_DBFS = float(os.environ.get("VAD_THRESHOLD_DBFS", -45))
+VAD_NOISE_MARGIN_DB = float(os.environ.get("VAD_NOISE_MARGIN_DB", 8))
+# An answer needs at least this much speech to be sent for transcription.
+VAD_MIN_SPEECH_MS = float(os.environ.get("VAD_MIN_SPEECH_MS", 300))
+# Silence kept around the speech when trimming, so word edges are not clipped.
+VAD_PADDING_MS = float(os.environ.get("VAD_PADDING_MS", 250))
+
+# Frames with more zero crossings than this are only speech if clearly loud.
+_MAX_ZCR = 0.3
+_LOUD_MARGIN_DB = 6
+# Shortest run of speech frames that counts (shorter runs are clicks / bumps).
+_MIN_RUN_FRAMES = 3
+
+
+def _as_float(samples):
+    """Mono float32 in [-1, 1] for int16/int32/uint8/float input."""
+    samples = np.asarray(samples)
+    if samples.ndim > 1:
+        samples = samples[:, 0]
+    if samples.dtype.kind == "f":
+        return samples.astype(np.float32, copy=False)
+    if samples.dtype.kind == "u":
+        return (samples.astype(np.float32) - 128.0) / 128.0
+    return samples.astype(np.float32) / float(2 ** (8 * samples.dtype.itemsize - 1))
+
+
+def frame_length(sample_rate, frame_ms=VAD_FRAME_MS):
+    return max(1, int(sample_rate * frame_ms / 1000))
+
+
+def frame_features(samples, sample_rate, frame_ms=VAD_FRAME_MS):
+    """Per-frame RMS level (dBFS) and zero-crossing rate. A partial last frame is dropped."""
+    length = frame_length(sample_rate, frame_ms)
+    samples = _as_float(samples)
+    count = len(samples) // length
+    frames = samples[: count * length].reshape(count, length)
+    rms = np.sqrt(np.einsum("ij,ij->i", frames, frames) / length)
+    level = 20 * np.log10(rms + 1e-10)
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / max(1, length - 1)
+    return level, zcr
+
+
+def _speech_frames(level, zcr, noise_floor):
+    threshold = max(VAD_THRESHOLD_DBFS, noise_floor + VAD_NOISE_MARGIN_DB)
+    return (level > threshold) & ((zcr < _MAX_ZCR) | (level > threshold + _LOUD_MARGIN_DB))
+
+
+def _drop_short_runs(mask, min_run=_MIN_RUN_FRAMES):
+    """Keep only speech frames that belong to a run of at least ``min_run`` frames."""
+    if len(mask) < min_run:
+        return np.zeros_like(mask)
+    window = np.ones(min_run, dtype=np.int32)
+    full = np.convolve(mask.astype(np.int32), window, mode="valid") == min_run
+    return np.convolve(full.astype(np.int32), window, mode="full") > 0
+
+
+def speech_mask(samples, sample_rate, frame_ms=VAD_FRAME_MS):
+    """Boolean speech/non-speech decision per frame."""
+    level, zcr = frame_features(samples, sample_rate, frame_ms)
+    if len(level) == 0:
+        return np.zeros(0, dtype=bool)
+    # The quietest tenth of the recording approximates the room noise.
+    noise_floor = float(np.percentile(level, 10))
+    return _drop_short_runs(_speech_frames(level, zcr, noise_floor))
+
+
+def speech_bounds(samples, sample_rate, padding_ms=VAD_PADDING_MS, min_speech_ms=VAD_MIN_SPEECH_MS):
+    """
+    ``(start, end)`` sample indices of the speech in ``samples`` including
+    ``padding_ms`` on each side, or ``None`` if there is less than
+    ``min_speech_ms`` of speech.
+    """
+    mask = speech_mask(samples, sample_rate)
+    length = frame_length(sample_rate)
+    if np.count_nonzero(mask) * length < min_speech_ms * sample_rate / 1000:
+        return None
+    speech = np.flatnonzero(mask)
+    padding = int(padding_ms * sample_rate / 1000)
+    start = max(0, speech[0] * length - padding)
+    end = min(len(samples), (speech[-1] + 1) * length + padding)
+    return start, end
+
+
+def contains_speech(samples, sample_rate):
+    return speech_bounds(samples, sample_rate) is not None
+
+
+def trim_silence(samples, sample_rate):
+    """View of ``samples`` without leading/trailing silence; empty if there is no speech."""
+    bounds = speech_bounds(samples, sample_rate)
+    if bounds is None:
+        return samples[:0]
+    return samples[bounds[0]:bounds[1]]
+
+
+class EndOfAnswerDetector:
+    """
+    Incremental end-of-answer detection over an ``AudioRingBuffer``. Call
+    ``update(buffer)`` after each write (it is cheap enough for the audio
+    callback); it returns ``True`` once the candidate has spoken and then been
+    silent for ``trailing_silence`` seconds. Silence before the first words
+    never ends the recording.
+    """
+
+    def __init__(self, sample_rate, trailing_silence=VAD_TRAILING_SILENCE_SECONDS):
+        self.sample_rate = sample_rate
+        self.frame_length = frame_length(sample_rate)
+        frame_seconds = self.frame_length / sample_rate
+        self.trailing_frames = max(1, int(round(trailing_silence / frame_seconds)))
+        self.min_speech_frames = max(1, int(round(VAD_MIN_SPEECH_MS / 1000 / frame_seconds)))
+        self.position = None
+        self.noise_floor = None
+        self.speech_frames = 0
+        self.silent_frames = 0  # consecutive non-speech frames since the last speech
+        self.ended = False
+
+    def update(self, buffer):
+        if self.position is None:
+            self.position = 0
+        available = (buffer.total_frames - self.position) // self.frame_length
+        if available > 0:
+            # Whole frames only; a partial frame is picked up by the next update.
+            data, self.position = buffer.read_from(self.position, available * self.frame_length)
+            self._process(data)
+        return self.ended
+
+    def _process(self, data):
+        level, zcr = frame_features(data, self.sample_rate)
+        if self.noise_floor is None:
+            self.noise_floor = float(level.min())
+        speech = _speech_frames(level, zcr, self.noise_floor)
+        quiet = level[~speech]
+        if len(quiet):
+            # Track the room noise slowly so one loud breath does not move it.
+            self.noise_floor = 0.9 * self.noise_floor + 0.1 * float(quiet.mean())
+        if speech.any():
+            self.speech_frames += int(np.count_nonzero(speech))
+            self.silent_frames = len(speech) - 1 - int(np.flatnonzero(speech)[-1])
+        else:
+            self.silent_frames += len(speech)
+        if self.speech_frames >= self.min_speech_frames and self.silent_frames >= self.trailing_frames:
+            self.ended = True